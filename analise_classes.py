@@ -1,55 +1,117 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import pandas as pd
 import scipy.stats as stats
-import seaborn as sns
-import matplotlib.pyplot as plt
 import numpy as np
 from utils import find_java_files
+from class_index import CLASS_TABLE_COLUMNS, load_class_index
+from analysis_store import (
+    ANALYSIS_STORE,
+    connect,
+    finding_totals,
+    load_class_table,
+    stored_projects,
+)
+from results_manifest import incremental_results, project_key
+from profiling import StageProfiler, stage, write_profile_report
+from project_registry import (
+    INPUT_KEYS,
+    PROJECT_MANIFEST,
+    load_registry,
+    select_projects,
+    validate_projects,
+)
 from ocurrence_analysis import analyze_occurrence
 from chi_squared_test_by_design_smell import chi_square_test_analysis, combine_p_values
+from meta_analysis import meta_analysis, p_value_matrix
+from pooled_analysis import pooled_cmh_analysis, pooled_columns, pooled_frame
+from bootstrap import class_level_intervals, project_level_intervals
+from figure_rendering import (
+    FIGURE_FORMATS,
+    corpus_figures,
+    project_figures,
+    render_figures,
+    show_figures,
+)
 from generic_chi_squared_test import chi_square_test_any_smell
 from data_manipulation import (
     get_design_smells_not_related_to_vulnerabilities,
-    get_design_smells_related_to_vulnerabilities,
-    get_smells_result_manipulation,
-    semgrep_result_manipulation,
     java_class_name_manipulation,
 )
 
 
-def data_analysis_visualization(get_smells_input_csv, semgrep_input_csv, scanned_files):
-    get_smells_df = get_smells_result_manipulation(get_smells_input_csv)
-
-    semgrep_df, semgrep_df_without_duplicates = semgrep_result_manipulation(
-        semgrep_input_csv
-    )
-
-    scanned_df, _ = semgrep_result_manipulation(scanned_files)
-
-    merged_scanned_df = pd.merge(scanned_df, get_smells_df, on="Name", how="inner")
-
-    merged_design_code_smells = pd.merge(
-        merged_scanned_df, semgrep_df_without_duplicates, on="Name", how="left"
-    )
-
-    number_of_classes = len(merged_scanned_df)
-
-    flawed_classes, number_of_vulnerable_flawed_classes = (
-        get_design_smells_related_to_vulnerabilities(merged_scanned_df)
-    )
-
-    code_smells_df = pd.merge(
-        semgrep_df, flawed_classes.drop_duplicates(), on="Name", how="inner"
-    )
+def data_analysis_visualization(
+    get_smells_input_csv,
+    semgrep_input_csv,
+    scanned_files,
+    cache_dir=None,
+    test="chi2",
+    permutation_options=None,
+    chunksize=None,
+    bootstrap_options=None,
+    store=None,
+    project=None,
+    resolve_names=False,
+    count_jobs=1,
+    pooled=False,
+):
+    if store is None:
+        class_index, semgrep_df_without_duplicates = load_class_index(
+            get_smells_input_csv,
+            semgrep_input_csv,
+            scanned_files,
+            cache_dir,
+            chunksize,
+            resolve_names=resolve_names,
+        )
+        number_of_findings = len(class_index.semgrep_df)
+        number_of_vulnerable_classes = len(semgrep_df_without_duplicates)
+
+        # Scanned classes known to GetSmells, the former scanned x smells merge
+        with stage("merge_scanned_smells", len(class_index.scanned_ids)) as record:
+            class_ids = class_index.scanned_class_ids()
+            record["rows_out"] = len(class_ids)
+
+        with stage("merge_findings", len(class_ids)) as record:
+            class_table = class_index.class_table(class_ids)
+            record["rows_out"] = len(class_table)
+    else:
+        # The class table was materialized by analysis_store ingest
+        conn = connect(store)
+        try:
+            with stage("load_class_table") as record:
+                class_table = load_class_table(conn, project)
+                record["rows_out"] = len(class_table)
+            number_of_findings, number_of_vulnerable_classes = finding_totals(
+                conn, project
+            )
+        finally:
+            conn.close()
+
+    merged_design_code_smells = class_table.drop(columns=CLASS_TABLE_COLUMNS)
+    number_of_classes = len(class_table)
+
+    # Findings located in a scanned class with design smells; each class counts
+    # its findings once, on its first scanned row
+    with stage("merge_flawed_findings", number_of_findings) as record:
+        flawed_classes = class_table["flawed"].to_numpy()
+        findings = np.where(class_table["first_row"], class_table["finding_count"], 0)
+        number_of_vulnerable_flawed_classes = flawed_classes.sum()
+        number_of_flawed_findings = findings[flawed_classes].sum()
+        record["rows_out"] = int(number_of_flawed_findings)
 
     classes_code_smells_percentage = (
-        len(semgrep_df_without_duplicates) / number_of_classes
+        number_of_vulnerable_classes / number_of_classes
     ) * 100
 
     flawed_classes_percentage = (
         number_of_vulnerable_flawed_classes / number_of_classes
     ) * 100
 
-    vulnerable_flawed_classes_percentage = (len(code_smells_df) / len(semgrep_df)) * 100
+    vulnerable_flawed_classes_percentage = (
+        number_of_flawed_findings / number_of_findings
+    ) * 100
 
     print(f"Classes vulneraveis: {classes_code_smells_percentage}%")
     print(
@@ -61,9 +123,29 @@ def data_analysis_visualization(get_smells_input_csv, semgrep_input_csv, scanned
 
     print(f"Numero de classes: {number_of_classes}")
 
-    design_count, code_count = analyze_occurrence(merged_design_code_smells)
-
-    chi_squared_result_p_values = chi_square_test_analysis(merged_design_code_smells)
+    if bootstrap_options:
+        with stage("bootstrap", number_of_classes):
+            intervals = class_level_intervals(
+                findings > 0,
+                flawed_classes,
+                findings,
+                number_of_vulnerable_classes,
+                number_of_findings,
+                **bootstrap_options,
+            )
+        print("Intervalos de confiança (bootstrap):")
+        print(intervals)
+
+    with stage("analyze_occurrence", number_of_classes):
+        design_count, code_count = analyze_occurrence(merged_design_code_smells)
+
+    with stage("chi_square_test_analysis", number_of_classes):
+        chi_squared_result_p_values = chi_square_test_analysis(
+            merged_design_code_smells,
+            test=test,
+            count_jobs=count_jobs,
+            **(permutation_options or {}),
+        )
 
     return (
         design_count,
@@ -72,103 +154,43 @@ def data_analysis_visualization(get_smells_input_csv, semgrep_input_csv, scanned
         flawed_classes_percentage,
         vulnerable_flawed_classes_percentage,
         number_of_classes,
-        len(semgrep_df),
+        number_of_findings,
         chi_squared_result_p_values,  # Return p-values dictionary
+        # Class frame of the pooled analysis, kept instead of re-reading inputs
+        pooled_columns(merged_design_code_smells) if pooled else None,
     )
 
 
 def plot_graphs(
-    design_smell_analysis, partial_code_smell_df, class_counter, code_smell_counter
+    design_smell_analysis,
+    partial_code_smell_df,
+    class_counter,
+    code_smell_counter,
+    output_dir=None,
+    per_project=(),
+    formats=("png",),
+    jobs=1,
 ):
-    # Ensure partial_code_smell_df is sorted correctly
-    partial_code_smell_df_sorted = partial_code_smell_df.sort_index(ascending=False)
-
-    # Plot for Design Smells
-    plt.figure(figsize=(10, 6))
-    ax = sns.barplot(
-        x=design_smell_analysis["Design Smell"],
-        y=design_smell_analysis["Número de Ocorrências"],
-        palette="viridis",
-    )
-    plt.xlabel("Design Smells")
-    plt.ylabel("Number of Occurrences")
-    plt.title("Total Occurrences of Design Smells")
-    plt.xticks(rotation=45)
-
-    # Add values on top of the bars
-    for p in ax.patches:
-        ax.annotate(
-            format(p.get_height(), ".1f"),
-            (p.get_x() + p.get_width() / 2.0, p.get_height()),
-            ha="center",
-            va="center",
-            xytext=(0, 10),
-            textcoords="offset points",
-        )
-
-    plt.show()
-
-    # Plot for Code Smells
-    plt.figure(figsize=(10, 6))
-
-    # Calculate means for each column in partial_code_smell_df_sorted
-    mean_values = partial_code_smell_df_sorted.mean()
-
-    # Ensure mean_values is a Series
-    if not isinstance(mean_values, pd.Series):
-        raise ValueError("Mean values should be a pandas Series.")
-
-    ax = sns.barplot(
-        x=mean_values.index,
-        y=mean_values.values,
-        palette="viridis",
-    )
-    plt.xlabel("Code Smells")
-    plt.ylabel("Mean Number of Occurrences")
-    plt.title("Mean Occurrences of Code Smells Across Projects")
-    plt.xticks(rotation=45)
-
-    # Add values on top of the bars
-    for p in ax.patches:
-        ax.annotate(
-            format(p.get_height(), ".1f"),
-            (p.get_x() + p.get_width() / 2.0, p.get_height()),
-            ha="center",
-            va="center",
-            xytext=(0, 10),
-            textcoords="offset points",
-        )
-
-    plt.show()
-
-    # Plot for Percentages
-    percentages_df = pd.DataFrame(
-        {
-            "Category": ["Total Classes", "Total Code Smells"],
-            "Percentage": [class_counter, code_smell_counter],
-        }
-    )
-    plt.figure(figsize=(10, 6))
-    ax = sns.barplot(
-        x=percentages_df["Category"], y=percentages_df["Percentage"], palette="viridis"
-    )
-    plt.xlabel("Category")
-    plt.ylabel("Count")
-    plt.title("Total Number of Classes and Code Smells")
-    plt.xticks(rotation=45)
-
-    # Add values on top of the bars
-    for p in ax.patches:
-        ax.annotate(
-            format(p.get_height(), ".1f"),
-            (p.get_x() + p.get_width() / 2.0, p.get_height()),
-            ha="center",
-            va="center",
-            xytext=(0, 10),
-            textcoords="offset points",
-        )
+    """
+    Show the summary figures, or render them to ``output_dir`` when set.
+
+    :param per_project: ``(project, display name, design smell counts,
+                        occurrence matrix)`` tuples whose figures are also
+                        rendered in headless mode.
+    :param formats: File formats of the rendered figures.
+    :param jobs: Number of worker processes rendering figures.
+    """
+    figures = corpus_figures(
+        design_smell_analysis, partial_code_smell_df, class_counter, code_smell_counter
+    )
+    if output_dir is None:
+        show_figures(figures)
+        return
 
-    plt.show()
+    for project in per_project:
+        figures += project_figures(*project)
+    paths = render_figures(figures, output_dir, formats, jobs)
+    print(f"{len(paths)} figures saved to {output_dir}")
 
 
 def print_design_smell_counts_for_each_project(design_smell_analysis, project_name):
@@ -178,58 +200,259 @@ def print_design_smell_counts_for_each_project(design_smell_analysis, project_na
     print("\n")
 
 
-def main():
-
-    dictionary_list = []
-
-    tomcat_dict = {
-        "get_smells_input_csv": "tomcat/tomcat9.csv",
-        "semgrep_input_csv": "tomcat/tomcat_results_9.csv",
-        "scanned_files": "tomcat/tomcat_scanned.csv",
-    }
-
-    cxf_dict = {
-        "get_smells_input_csv": "cxf/cxf402.csv",
-        "semgrep_input_csv": "cxf/cxf402_results.csv",
-        "scanned_files": "C:cxf/cxf_scanned.csv",
-    }
+def analyze_project(dictionary, profile=False, **analysis_options):
+    """
+    Analyse one project.
+
+    :param profile: Record the stages of the analysis with a ``StageProfiler``.
+    :return: Tuple of the ``data_analysis_visualization`` result and the stage
+             records, None when not profiling.
+    """
+    if analysis_options.get("store") is not None:
+        analysis_options["project"] = dictionary["name"]
+
+    # Projects of the analysis store have no input paths
+    inputs = [dictionary.get(key) for key in INPUT_KEYS]
+    if not profile:
+        return data_analysis_visualization(*inputs, **analysis_options), None
+
+    profiler = StageProfiler()
+    with profiler.activate():
+        result = data_analysis_visualization(*inputs, **analysis_options)
+    return result, profiler.records
+
+
+def analyze_projects(dictionary_list, jobs=1, incremental_dir=None, **analysis_options):
+    """
+    Run ``data_analysis_visualization`` for every project.
+
+    Projects are independent, so with ``jobs > 1`` they are fanned out to a
+    process pool. ``executor.map`` yields results in submission order, which
+    keeps the reduction in ``main`` deterministic whatever the completion order.
+
+    With ``incremental_dir`` only projects whose inputs changed since the last
+    run are analysed; the others are read back from the results manifest.
+    Stage records are never cached: projects read back from the manifest get
+    None, so a profile report never passes old timings off as fresh ones.
+    """
+    if incremental_dir is not None:
+        profile = analysis_options.pop("profile", False)
+        stage_records = {}
+
+        def compute(stale):
+            computed = analyze_projects(
+                stale, jobs, profile=profile, **analysis_options
+            )
+            for dictionary, (_, records) in zip(stale, computed):
+                stage_records[project_key(dictionary)] = records
+            return [result for result, _ in computed]
+
+        results = incremental_results(
+            dictionary_list, incremental_dir, analysis_options, compute
+        )
+        return [
+            (result, stage_records.get(project_key(dictionary)))
+            for dictionary, result in zip(dictionary_list, results)
+        ]
+
+    if jobs > 1 and len(dictionary_list) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(
+                executor.map(
+                    partial(analyze_project, **analysis_options), dictionary_list
+                )
+            )
+    return [
+        analyze_project(dictionary, **analysis_options)
+        for dictionary in dictionary_list
+    ]
 
-    spring_dict = {
-        "get_smells_input_csv": "spring-framework/spring.csv",
-        "semgrep_input_csv": "spring-framework/spring_results.csv",
-        "scanned_files": "spring-framework/spring_scanned.csv",
-    }
 
-    kafka_dict = {
-        "get_smells_input_csv": "kafka/kafka.csv",
-        "semgrep_input_csv": "kafka/kafka_results.csv",
-        "scanned_files": "kafka/kafka_scanned.csv",
-    }
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Design smell and code smell analysis across projects."
+    )
+    parser.add_argument(
+        "--manifest",
+        default=PROJECT_MANIFEST,
+        help="Project manifest; projects are discovered from the "
+        "<dir>/*_scanned.csv convention when it does not exist.",
+    )
+    parser.add_argument(
+        "--project",
+        action="append",
+        help="Analyse only this project (repeatable); all projects by default.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to analyse projects in parallel.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        nargs="?",
+        const=".frame_cache",
+        default=None,
+        help="Directory for cached normalized frames (default: .frame_cache); "
+        "caching is disabled when omitted.",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Read GetSmells exports in blocks of this many rows, keeping only "
+        "the per-class maxima in memory.",
+    )
+    parser.add_argument(
+        "--resolve-names",
+        action="store_true",
+        help="Join on fully-qualified class names, resolving Semgrep and scanned "
+        "paths by longest package suffix, instead of the package.Class key.",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Render figures to --figures-dir with a non-interactive backend "
+        "instead of opening windows.",
+    )
+    parser.add_argument(
+        "--figures-dir",
+        default="figures",
+        help="Output directory for figures in headless mode.",
+    )
+    parser.add_argument(
+        "--figure-formats",
+        nargs="+",
+        choices=FIGURE_FORMATS,
+        default=["png"],
+        help="File formats of the figures rendered in headless mode.",
+    )
+    parser.add_argument(
+        "--figure-jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes rendering figures in headless mode.",
+    )
+    parser.add_argument(
+        "--no-plots",
+        action="store_true",
+        help="Skip plotting entirely; the plotting stack is never imported.",
+    )
+    parser.add_argument(
+        "--incremental",
+        nargs="?",
+        const=".results_manifest",
+        default=None,
+        help="Directory of the per-project results manifest (default: "
+        ".results_manifest); only projects whose inputs changed are recomputed.",
+    )
+    parser.add_argument(
+        "--test",
+        choices=["chi2", "permutation"],
+        default="chi2",
+        help="Statistical test for each design smell x code smell pair; "
+        "permutation falls back to exact Fisher tests for small tables.",
+    )
+    parser.add_argument(
+        "--permutations",
+        type=int,
+        default=10000,
+        help="Number of label shuffles per pair in permutation mode.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed for the permutation tests."
+    )
+    parser.add_argument(
+        "--permutation-jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes sharing the permutations of a project.",
+    )
+    parser.add_argument(
+        "--count-jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes counting the contingency tables of a "
+        "project over row blocks of its class table, shared with them in "
+        "shared memory.",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        help="Number of bootstrap replicates for confidence intervals of the "
+        "headline percentages (resampling classes, and projects across "
+        "projects); disabled when 0.",
+    )
+    parser.add_argument(
+        "--bootstrap-jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes sharing the bootstrap replicates.",
+    )
+    parser.add_argument(
+        "--meta-output",
+        default=None,
+        help="Save the cross-project meta-analysis of every pair to this CSV.",
+    )
+    parser.add_argument(
+        "--pooled",
+        action="store_true",
+        help="Also analyse all projects as one corpus: size-weighted percentages "
+        "and Cochran-Mantel-Haenszel tests with projects as strata.",
+    )
+    parser.add_argument(
+        "--pooled-output",
+        default=None,
+        help="Save the pooled analysis to this CSV (with --pooled).",
+    )
+    parser.add_argument(
+        "--store",
+        nargs="?",
+        const=ANALYSIS_STORE,
+        default=None,
+        help="Analyse the projects of this SQLite store, filled by "
+        "'analysis_store.py ingest' (default: analysis.sqlite), instead of "
+        "reading and merging the CSVs of the manifest.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile_report.json",
+        default=None,
+        help="Write per-project stage timings, CPU time, peak memory and row "
+        "counts to this JSON report (default: profile_report.json).",
+    )
+    args = parser.parse_args(argv)
 
-    solr_dict = {
-        "get_smells_input_csv": "solr/solr.csv",
-        "semgrep_input_csv": "solr/solr_results.csv",
-        "scanned_files": "solr/solr_scanned.csv",
+    # How the CSVs are read and keyed is fixed when the store is ingested
+    ingest_options = {
+        "--resolve-names": args.resolve_names,
+        "--chunksize": args.chunksize is not None,
+        "--cache-dir": args.cache_dir is not None,
     }
+    given = [option for option, used in ingest_options.items() if used]
+    if args.store is not None and given:
+        parser.error(
+            f"{', '.join(given)} cannot be combined with --store; pass them to "
+            "'analysis_store.py ingest' instead"
+        )
+    return args
 
-    junit_dict = {
-        "get_smells_input_csv": "junit/junit.csv",
-        "semgrep_input_csv": "junit/junit_results.csv",
-        "scanned_files": "junit/junit_scanned.csv",
-    }
 
-    jenkins_dict = {
-        "get_smells_input_csv": "jenkins/jenkins.csv",
-        "semgrep_input_csv": "jenkins/jenkins_results.csv",
-        "scanned_files": "jenkins/jenkins_scanned.csv",
-    }
+def main(argv=None):
+    args = parse_args(argv)
 
-    dictionary_list.append(tomcat_dict)
-    dictionary_list.append(cxf_dict)
-    dictionary_list.append(spring_dict)
-    dictionary_list.append(kafka_dict)
-    dictionary_list.append(solr_dict)
-    dictionary_list.append(jenkins_dict)
+    if args.store is not None:
+        # The projects and their data come from the store; no CSV is read
+        dictionary_list = select_projects(stored_projects(args.store), args.project)
+    else:
+        # Only the selected projects are validated; their CSVs are read lazily
+        # by data_analysis_visualization
+        dictionary_list = validate_projects(
+            select_projects(load_registry(args.manifest), args.project)
+        )
 
     design_smell_analysis = pd.DataFrame(
         columns=["Design Smell", "Número de Ocorrências"]
@@ -251,6 +474,11 @@ def main():
     counter = 0
     class_counter = 0
     code_smell_counter = 0
+    # Percentages weighted by project size, for the pooled report
+    pooled_vulnerable_classes = 0
+    pooled_flawed_classes = 0
+    pooled_vulnerable_flawed_classes = 0
+    project_percentages = []
 
     design_smells = [
         "God_Class",
@@ -261,12 +489,53 @@ def main():
         "Brain_Class",
     ]
 
-    all_p_values = {}
-    project_names = ["Tomcat", "CXF", "Spring", "Kafka", "Solr", "Jenkins"]
+    project_p_values = {}
+    project_names = [dictionary["display_name"] for dictionary in dictionary_list]
     design_smell_analysis_list = []
+    project_figure_data = []
+    pooled_frames = []
+
+    project_results = analyze_projects(
+        dictionary_list,
+        args.jobs,
+        incremental_dir=args.incremental,
+        cache_dir=args.cache_dir,
+        test=args.test,
+        chunksize=args.chunksize,
+        store=args.store,
+        resolve_names=args.resolve_names,
+        count_jobs=args.count_jobs,
+        pooled=args.pooled,
+        bootstrap_options=(
+            {
+                "replicates": args.bootstrap,
+                "seed": args.seed,
+                "jobs": args.bootstrap_jobs,
+            }
+            if args.bootstrap
+            else None
+        ),
+        profile=args.profile is not None,
+        permutation_options={
+            "permutations": args.permutations,
+            "seed": args.seed,
+            "jobs": args.permutation_jobs,
+        },
+    )
 
-    for idx, dictionary in enumerate(dictionary_list):
-        # Call the data_analysis_visualization function
+    if args.profile is not None:
+        write_profile_report(
+            args.profile,
+            {
+                dictionary["name"]: stage_records
+                for dictionary, (_, stage_records) in zip(
+                    dictionary_list, project_results
+                )
+            },
+        )
+        print(f"Stage profile saved to {args.profile}")
+
+    for idx, (result, _) in enumerate(project_results):
         (
             analysis_df,
             code_smell_df,
@@ -276,30 +545,52 @@ def main():
             number_of_classes,
             number_of_code_smells,
             chi_squared_result_p_values,
-        ) = data_analysis_visualization(
-            dictionary["get_smells_input_csv"],
-            dictionary["semgrep_input_csv"],
-            dictionary["scanned_files"],
-        )
-        for cs_ds_pair, p_val in chi_squared_result_p_values.items():
-            if cs_ds_pair not in all_p_values:
-                all_p_values[cs_ds_pair] = []
-            all_p_values[cs_ds_pair].append(p_val)
+            pooled_df,
+        ) = result
+        project_p_values[project_names[idx]] = chi_squared_result_p_values
+        if pooled_df is not None:
+            pooled_frames.append(pooled_df)
 
         # Store the analysis_df for this project
         design_smell_analysis_list.append(analysis_df)
+        project_figure_data.append(
+            (
+                dictionary_list[idx]["name"],
+                project_names[idx],
+                analysis_df,
+                code_smell_df,
+            )
+        )
 
         # Print the design smell counts for this project
         print_design_smell_counts_for_each_project(analysis_df, project_names[idx])
 
+        project_percentages.append(
+            [
+                individual_vulnerable_classes_percentage,
+                individual_flawed_classes_percentage,
+                individual_vulnerable_flawed_classes_percentage,
+            ]
+        )
         class_counter = class_counter + number_of_classes
         code_smell_counter = code_smell_counter + number_of_code_smells
+        pooled_vulnerable_classes += (
+            individual_vulnerable_classes_percentage * number_of_classes
+        )
+        pooled_flawed_classes += (
+            individual_flawed_classes_percentage * number_of_classes
+        )
+        pooled_vulnerable_flawed_classes += (
+            individual_vulnerable_flawed_classes_percentage * number_of_code_smells
+        )
 
         if counter == 0:
             partial_code_smell_df = code_smell_df
             counter = counter + 1
         else:
-            partial_code_smell_df = partial_code_smell_df + code_smell_df
+            partial_code_smell_df = partial_code_smell_df.add(
+                code_smell_df, fill_value=0
+            )
         design_smell_analysis[["Número de Ocorrências"]] = (
             analysis_df[["Número de Ocorrências"]]
             + design_smell_analysis[["Número de Ocorrências"]]
@@ -326,6 +617,16 @@ def main():
     print(
         f"Percentual medio de classes vulneráveis com design smells: {vulnerable_flawed_classes_percentage/len(dictionary_list)}"
     )
+    if args.bootstrap and len(dictionary_list) > 1:
+        print("Intervalos de confiança entre projetos (bootstrap):")
+        print(
+            project_level_intervals(
+                project_percentages,
+                replicates=args.bootstrap,
+                seed=args.seed,
+                jobs=args.bootstrap_jobs,
+            )
+        )
     design_smell_analysis[["Número de Ocorrências"]] = design_smell_analysis[
         ["Número de Ocorrências"]
     ]
@@ -334,9 +635,50 @@ def main():
     print(f"Code Smell Analysis {partial_code_smell_df}")
     print(f"Number of Classes Analyzed {class_counter}")
     print(f"Total Number of Code Smells {code_smell_counter}")
-    plot_graphs(
-        design_smell_analysis, partial_code_smell_df, class_counter, code_smell_counter
-    )
+
+    # Combine each design smell x code smell pair across projects, corrected
+    # for the number of pairs tested
+    meta_results = meta_analysis(p_value_matrix(project_p_values))
+    print("Meta-analysis across projects")
+    print(meta_results)
+    if args.meta_output is not None:
+        meta_results.to_csv(args.meta_output, sep=";")
+        print(f"Meta-analysis saved to {args.meta_output}")
+
+    if args.pooled:
+        print(
+            f"Percentual agregado de classes vulneráveis: {pooled_vulnerable_classes/class_counter}"
+        )
+        print(
+            f"Percentual agregado de classes com design smells: {pooled_flawed_classes/class_counter}"
+        )
+        print(
+            f"Percentual agregado de classes vulneráveis com design smells: {pooled_vulnerable_flawed_classes/code_smell_counter}"
+        )
+
+        # One stratified pass over the frames the per-project analyses kept,
+        # projects as strata
+        pooled_results = pooled_cmh_analysis(
+            pooled_frame(
+                pooled_frames, [dictionary["name"] for dictionary in dictionary_list]
+            )
+        )
+        print("Pooled Cochran-Mantel-Haenszel analysis")
+        print(pooled_results)
+        if args.pooled_output is not None:
+            pooled_results.to_csv(args.pooled_output, sep=";", index=False)
+            print(f"Pooled analysis saved to {args.pooled_output}")
+    if not args.no_plots:
+        plot_graphs(
+            design_smell_analysis,
+            partial_code_smell_df,
+            class_counter,
+            code_smell_counter,
+            args.figures_dir if args.headless else None,
+            project_figure_data,
+            args.figure_formats,
+            args.figure_jobs,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,267 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import pandas as pd
+from class_index import load_class_index
+from project_registry import (
+    PROJECT_MANIFEST,
+    load_registry,
+    select_projects,
+    validate_projects,
+)
+
+ANALYSIS_STORE = "analysis.sqlite"
+
+# Bookkeeping columns of the stored tables, dropped when frames are read back
+KEY_COLUMNS = ["project", "position"]
+
+INDEXES = {
+    "smells": ["project", "Name"],
+    "findings": ["project", "Name"],
+    "scanned": ["project", "Name"],
+    "classes": ["project", "position"],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project TEXT PRIMARY KEY,
+    display_name TEXT,
+    revision TEXT
+);
+CREATE TABLE IF NOT EXISTS column_types (
+    project TEXT,
+    table_name TEXT,
+    column_name TEXT,
+    dtype TEXT,
+    PRIMARY KEY (project, table_name, column_name)
+);
+"""
+
+
+def connect(db_path=ANALYSIS_STORE):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    # Stores created before projects had a revision
+    if "revision" not in _table_columns(conn, "projects"):
+        conn.execute("ALTER TABLE projects ADD COLUMN revision TEXT")
+    return conn
+
+
+def _table_columns(conn, table):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def _append(conn, table, df, project):
+    """Append ``df`` to ``table``, adding any column the table lacks."""
+    df = df.copy()
+    df.insert(0, "position", range(len(df)))
+    df.insert(0, "project", project)
+
+    existing = _table_columns(conn, table)
+    if existing:
+        for column in df.columns.difference(existing, sort=False):
+            conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}"')
+    df.to_sql(table, conn, if_exists="append", index=False)
+
+    columns = INDEXES[table]
+    conn.execute(
+        f'CREATE INDEX IF NOT EXISTS "idx_{table}_{"_".join(columns)}" '
+        f'ON "{table}" ({", ".join(columns)})'
+    )
+    conn.executemany(
+        "INSERT OR REPLACE INTO column_types VALUES (?, ?, ?, ?)",
+        [
+            (project, table, column, str(dtype))
+            for column, dtype in df.dtypes.items()
+            if column not in KEY_COLUMNS
+        ],
+    )
+
+
+def delete_project(conn, project):
+    for table in list(INDEXES) + ["projects", "column_types"]:
+        if _table_columns(conn, table):
+            conn.execute(f'DELETE FROM "{table}" WHERE project = ?', (project,))
+
+
+def content_revision(*frames):
+    """Digest of the contents of ``frames``, a revision of what was stored."""
+    digest = hashlib.sha256()
+    for df in frames:
+        digest.update(",".join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def ingest_project(
+    conn, dictionary, cache_dir=None, chunksize=None, resolve_names=False
+):
+    """
+    Store the normalized frames of one project, replacing any earlier copy.
+
+    Besides the ``smells``, ``findings`` and ``scanned`` tables, the merged
+    class table of the analysis is materialized in ``classes`` so analyses read
+    it back with one indexed query instead of redoing the joins. The project
+    keeps its position among the stored projects and gets the
+    ``content_revision`` of its class table and findings.
+    """
+    class_index, _ = load_class_index(
+        dictionary["get_smells_input_csv"],
+        dictionary["semgrep_input_csv"],
+        dictionary["scanned_files"],
+        cache_dir,
+        chunksize,
+        resolve_names=resolve_names,
+    )
+    project = dictionary["name"]
+    class_table = class_index.class_table(class_index.scanned_class_ids())
+    position = conn.execute(
+        "SELECT rowid FROM projects WHERE project = ?", (project,)
+    ).fetchone()
+
+    with conn:
+        delete_project(conn, project)
+        conn.execute(
+            "INSERT INTO projects (rowid, project, display_name, revision) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                position[0] if position else None,
+                project,
+                dictionary.get("display_name", project),
+                content_revision(class_table, class_index.semgrep_df),
+            ),
+        )
+        _append(conn, "smells", class_index.get_smells_df, project)
+        _append(conn, "findings", class_index.semgrep_df, project)
+        _append(
+            conn,
+            "scanned",
+            pd.DataFrame({"Name": class_index.names[class_index.scanned_ids]}),
+            project,
+        )
+        _append(conn, "classes", class_table, project)
+
+
+def ingest_projects(
+    db_path, dictionary_list, cache_dir=None, chunksize=None, resolve_names=False
+):
+    conn = connect(db_path)
+    try:
+        for dictionary in dictionary_list:
+            ingest_project(conn, dictionary, cache_dir, chunksize, resolve_names)
+            print(f"Ingested {dictionary['name']} into {db_path}")
+    finally:
+        conn.close()
+
+
+def stored_projects(db_path=ANALYSIS_STORE):
+    """
+    Registry entries of the projects of a store, in ingestion order.
+
+    The entries carry no input paths, only the ``store_revision`` of the
+    stored data, so analyses of the store never need the original CSVs.
+
+    :raises FileNotFoundError: If the store does not exist.
+    """
+    if not os.path.isfile(db_path):
+        raise FileNotFoundError(
+            f"Analysis store {db_path} not found; run 'analysis_store.py ingest' first"
+        )
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT project, display_name, revision FROM projects ORDER BY rowid"
+        ).fetchall()
+    finally:
+        conn.close()
+    return [
+        {"name": project, "display_name": display_name, "store_revision": revision}
+        for project, display_name, revision in rows
+    ]
+
+
+def read_table(conn, table, project, columns=None):
+    """
+    Rows of ``project`` in ``table``, in their original order and dtypes.
+
+    :param columns: Columns to read, all of them by default; selecting only
+                    the ones a computation needs keeps the query narrow.
+    """
+    selected = "*" if columns is None else ", ".join(f'"{c}"' for c in columns)
+    df = pd.read_sql_query(
+        f'SELECT {selected} FROM "{table}" WHERE project = ? ORDER BY position',
+        conn,
+        params=(project,),
+    )
+    df = df.drop(columns=[c for c in KEY_COLUMNS if c in df])
+
+    dtypes = dict(
+        conn.execute(
+            "SELECT column_name, dtype FROM column_types "
+            "WHERE project = ? AND table_name = ?",
+            (project, table),
+        ).fetchall()
+    )
+    return df.astype({column: dtypes[column] for column in df if column in dtypes})
+
+
+def load_class_table(conn, project, columns=None):
+    """The ``ClassIndex.class_table`` of ``project``."""
+    return read_table(conn, "classes", project, columns)
+
+
+def finding_totals(conn, project):
+    """Number of findings and of distinct classes with findings of ``project``."""
+    return conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT Name) FROM findings WHERE project = ?",
+        (project,),
+    ).fetchone()
+
+
+def query(conn, sql, params=()):
+    """Run an ad-hoc SQL query and return the result as a DataFrame."""
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load the normalized project data into a SQLite store and query it."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Ingest projects")
+    ingest_parser.add_argument("--db", default=ANALYSIS_STORE)
+    ingest_parser.add_argument("--manifest", default=PROJECT_MANIFEST)
+    ingest_parser.add_argument("--project", action="append")
+    ingest_parser.add_argument("--cache-dir", default=None)
+    ingest_parser.add_argument("--chunksize", type=int, default=None)
+    ingest_parser.add_argument("--resolve-names", action="store_true")
+
+    query_parser = subparsers.add_parser("query", help="Run an SQL query")
+    query_parser.add_argument("sql")
+    query_parser.add_argument("--db", default=ANALYSIS_STORE)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        dictionary_list = validate_projects(
+            select_projects(load_registry(args.manifest), args.project)
+        )
+        ingest_projects(
+            args.db,
+            dictionary_list,
+            args.cache_dir,
+            args.chunksize,
+            args.resolve_names,
+        )
+    else:
+        conn = connect(args.db)
+        try:
+            print(query(conn, args.sql).to_string())
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import time
+import pandas as pd
+from data_manipulation import (
+    normalize_get_smells_names,
+    normalize_java_class_names,
+    normalize_semgrep_paths,
+)
+
+# Row-wise reference implementations, as they were before the vectorized
+# normalization, kept to check that both produce identical Name keys
+
+
+def legacy_get_smells_names(names):
+    def get_correct_segments(name_parts):
+        if len(name_parts) > 1 and name_parts[-2][0].isupper():
+            return ".".join(name_parts[-3:-1])
+        else:
+            return ".".join(name_parts[-2:])
+
+    return names.str.split(".").apply(get_correct_segments)
+
+
+def legacy_java_class_names(names):
+    def get_correct_segments(name_parts):
+        return ".".join(name_parts[-3:-1])
+
+    return names.str.split(".").apply(get_correct_segments)
+
+
+def legacy_semgrep_paths(paths):
+    path_list = paths.str.split(".").str[-2].str.split("/")
+
+    def join_segments(name_parts):
+        if isinstance(name_parts, list) and len(name_parts) >= 2:
+            return ".".join(name_parts[-2:])
+        else:
+            return str(name_parts) if pd.notna(name_parts) else ""
+
+    return path_list.apply(join_segments)
+
+
+PROJECTS = [
+    ("tomcat/tomcat9.csv", "tomcat/tomcat_results_9.csv", "tomcat/tomcat_scanned.csv"),
+    ("cxf/cxf402.csv", "cxf/cxf402_results.csv", "cxf/cxf_scanned.csv"),
+    (
+        "spring-framework/spring.csv",
+        "spring-framework/spring_results.csv",
+        "spring-framework/spring_scanned.csv",
+    ),
+    ("kafka/kafka.csv", "kafka/kafka_results.csv", "kafka/kafka_scanned.csv"),
+    ("solr/solr.csv", "solr/solr_results.csv", "solr/solr_scanned.csv"),
+    (
+        "jenkins/jenkins.csv",
+        "jenkins/jenkins_results.csv",
+        "jenkins/jenkins_scanned.csv",
+    ),
+]
+
+
+def load_inputs():
+    names = []
+    paths = []
+    for get_smells_csv, semgrep_csv, scanned_csv in PROJECTS:
+        names.append(pd.read_csv(get_smells_csv, delimiter=";")["Name"].dropna())
+        paths.append(pd.read_csv(semgrep_csv, delimiter=";")["path"])
+        paths.append(pd.read_csv(scanned_csv, delimiter=";")["path"])
+    names = pd.concat(names, ignore_index=True)
+    paths = pd.concat(paths, ignore_index=True)
+
+    # Edge cases: no package, nested classes, root files, missing extension
+    names = pd.concat(
+        [names, pd.Series(["Main", "a.B", "A.b", "x.Outer.Inner", "x.y.z"])],
+        ignore_index=True,
+    )
+    paths = pd.concat(
+        [paths, pd.Series(["Main.java", "src/A", "/A.java", "a.b/c/D.java", None])],
+        ignore_index=True,
+    )
+    return names, paths
+
+
+def check_identical(names, paths):
+    pairs = [
+        (legacy_get_smells_names, normalize_get_smells_names, names),
+        (legacy_java_class_names, normalize_java_class_names, names),
+        (legacy_semgrep_paths, normalize_semgrep_paths, paths),
+    ]
+    for legacy, vectorized, values in pairs:
+        expected = legacy(values).tolist()
+        actual = vectorized(values).tolist()
+        if expected != actual:
+            mismatches = [
+                (value, e, a) for value, e, a in zip(values, expected, actual) if e != a
+            ]
+            raise AssertionError(
+                f"{vectorized.__name__} differs from the legacy implementation: "
+                f"{mismatches[:5]}"
+            )
+    print("Vectorized normalization matches the legacy Name keys.")
+
+
+def time_call(func, values, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(values)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark row-wise against vectorized class-name normalization."
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=1_000_000,
+        help="Number of rows to benchmark, built by repeating the project data.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    names, paths = load_inputs()
+    check_identical(names, paths)
+
+    names = pd.Series(names.tolist() * (args.rows // len(names) + 1))[: args.rows]
+    paths = pd.Series(paths.tolist() * (args.rows // len(paths) + 1))[: args.rows]
+
+    pairs = [
+        ("GetSmells names", legacy_get_smells_names, normalize_get_smells_names, names),
+        (
+            "Java class names",
+            legacy_java_class_names,
+            normalize_java_class_names,
+            names,
+        ),
+        ("Semgrep paths", legacy_semgrep_paths, normalize_semgrep_paths, paths),
+    ]
+    print(f"Rows: {args.rows}")
+    for label, legacy, vectorized, values in pairs:
+        legacy_time = time_call(legacy, values, args.repeat)
+        vectorized_time = time_call(vectorized, values, args.repeat)
+        print(
+            f"{label}: legacy {legacy_time:.3f}s, vectorized {vectorized_time:.3f}s, "
+            f"speedup {legacy_time / vectorized_time:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
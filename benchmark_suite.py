@@ -0,0 +1,250 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from class_index import ClassIndex
+from chi_squared_test_by_design_smell import chi_square_test_analysis
+from data_manipulation import (
+    get_smells_result_manipulation,
+    semgrep_result_manipulation,
+)
+from ocurrence_analysis import analyze_occurrence
+from synthetic_corpus import generate_corpus
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RESULTS_DIR = "benchmark_results"
+
+
+def _merge_stage(state):
+    class_index = ClassIndex(
+        state["get_smells_df"], state["semgrep_df"], state["scanned_df"]
+    )
+    return class_index.merged_frame(class_index.scanned_class_ids())
+
+
+# (stage name, callable on the shared state, state key receiving the result,
+#  state key whose length is the stage input)
+STAGES = [
+    (
+        "get_smells_result_manipulation",
+        lambda state: get_smells_result_manipulation(
+            state["project"]["get_smells_input_csv"]
+        ),
+        "get_smells_df",
+        None,
+    ),
+    (
+        "semgrep_result_manipulation",
+        lambda state: semgrep_result_manipulation(
+            state["project"]["semgrep_input_csv"]
+        )[0],
+        "semgrep_df",
+        None,
+    ),
+    (
+        "scanned_manipulation",
+        lambda state: semgrep_result_manipulation(state["project"]["scanned_files"])[0],
+        "scanned_df",
+        None,
+    ),
+    ("merges", _merge_stage, "merged", "scanned_df"),
+    (
+        "analyze_occurrence",
+        lambda state: analyze_occurrence(state["merged"]),
+        None,
+        "merged",
+    ),
+    (
+        "chi_square_test_analysis",
+        lambda state: chi_square_test_analysis(state["merged"]),
+        None,
+        "merged",
+    ),
+]
+
+
+def _run_quietly(func, state):
+    # The analysis functions print their tables; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(state)
+
+
+def time_stage(func, state, repeat=1):
+    """Best wall-clock time of ``repeat`` runs, and the result of the last one."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = _run_quietly(func, state)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory(func, state):
+    """Peak traced allocation of one run, in MiB."""
+    tracemalloc.start()
+    try:
+        _run_quietly(func, state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+
+def benchmark_size(project, classes, repeat=1, memory=True):
+    """
+    Run every stage on one generated corpus.
+
+    Stages run in pipeline order and share their outputs, so each stage is
+    measured on the same inputs ``data_analysis_visualization`` would give it.
+    Memory is measured in a separate run, tracemalloc slows the timed one down.
+    """
+    state = {"project": project}
+    records = []
+    for stage, func, output_key, input_key in STAGES:
+        seconds, result = time_stage(func, state, repeat)
+        record = {
+            "classes": classes,
+            "stage": stage,
+            "seconds": seconds,
+            "peak_mib": peak_memory(func, state) if memory else None,
+            "rows_in": len(state[input_key]) if input_key else None,
+            "rows_out": len(result) if hasattr(result, "__len__") else None,
+        }
+        if output_key:
+            state[output_key] = result
+        records.append(record)
+        peak = "-" if record["peak_mib"] is None else f"{record['peak_mib']:.1f}"
+        print(f"{classes:>10} {stage:<32} {seconds:>9.3f}s {peak:>9} MiB")
+    return records
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare_results(baseline, current, threshold=1.2):
+    """
+    Print the time and memory ratios of ``current`` over ``baseline``.
+
+    :return: Number of (size, stage) pairs slower than ``threshold`` times the
+             baseline.
+    """
+    previous = {(r["classes"], r["stage"]): r for r in baseline["results"]}
+    regressions = 0
+    print(f"Comparing with {baseline['environment'].get('commit')}")
+    for record in current["results"]:
+        old = previous.get((record["classes"], record["stage"]))
+        if old is None:
+            continue
+        time_ratio = record["seconds"] / old["seconds"]
+        memory_ratio = (
+            record["peak_mib"] / old["peak_mib"]
+            if record["peak_mib"] and old["peak_mib"]
+            else float("nan")
+        )
+        flag = ""
+        if time_ratio > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(
+            f"{record['classes']:>10} {record['stage']:<32} "
+            f"time x{time_ratio:.2f}  memory x{memory_ratio:.2f}{flag}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time and trace memory of every pipeline stage on synthetic corpora."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Class counts to benchmark, e.g. 10000 1000000 10000000",
+    )
+    parser.add_argument("--smell-density", type=float, default=0.1)
+    parser.add_argument("--finding-density", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the tracemalloc runs"
+    )
+    parser.add_argument(
+        "--data-dir",
+        help="Keep the generated corpora here instead of a temporary directory",
+    )
+    parser.add_argument("--output", help="JSON results file")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    report = {
+        "environment": environment(),
+        "parameters": {
+            "smell_density": args.smell_density,
+            "finding_density": args.finding_density,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        for classes in args.sizes:
+            project = generate_corpus(
+                os.path.join(data_dir, str(classes)),
+                classes,
+                smell_density=args.smell_density,
+                finding_density=args.finding_density,
+                seed=args.seed,
+            )
+            report["results"].extend(
+                benchmark_size(project, classes, args.repeat, not args.no_memory)
+            )
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as of:
+        json.dump(report, of, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare, "r") as cf:
+            baseline = json.load(cf)
+        if compare_results(baseline, report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from utils import run_seeded_chunks
+
+# Percentages printed by data_analysis_visualization, in that order
+HEADLINE_METRICS = [
+    "classes_code_smells_percentage",
+    "flawed_classes_percentage",
+    "vulnerable_flawed_classes_percentage",
+]
+
+
+def _ratio_chunk(size, seed_sequence, types, weights, offsets, metrics):
+    """
+    Ratio-of-sums statistics of ``size`` bootstrap replicates.
+
+    Resampling n rows with replacement only changes how many copies of each
+    distinct row a replicate holds, and those copy counts follow a multinomial
+    distribution over the distinct rows. Drawing them directly replaces an
+    n-long index array per replicate by one row of counts.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    rows = weights.sum()
+    counts = rng.multinomial(rows, weights / rows, size=size)
+    sums = counts @ types + offsets
+    numerators, denominators = sums[:, :metrics], sums[:, metrics:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return numerators / denominators
+
+
+def bootstrap_ratios(
+    numerators,
+    denominators,
+    numerator_offsets=0,
+    denominator_offsets=0,
+    replicates=10000,
+    confidence=0.95,
+    seed=0,
+    jobs=1,
+    chunk_size=1000,
+):
+    """
+    Percentile bootstrap intervals for statistics that are ratios of sums.
+
+    Each statistic ``j`` is ``(sum(numerators[:, j]) + numerator_offsets[j]) /
+    (sum(denominators[:, j]) + denominator_offsets[j])`` over the rows, which
+    covers both class-level percentages and averages over projects. Rows are
+    resampled with replacement; the offsets are held fixed.
+
+    Replicates are drawn in chunks of ``chunk_size`` with seeds spawned from
+    ``seed`` and may run on ``jobs`` processes; the result does not depend on
+    ``jobs``.
+
+    :param numerators: Array of shape (rows, statistics).
+    :param denominators: Array of the same shape.
+    :return: Tuple of arrays ``(estimate, lower, upper)``.
+    """
+    numerators = np.asarray(numerators, dtype=float)
+    denominators = np.asarray(denominators, dtype=float)
+    metrics = numerators.shape[1]
+    offsets = np.concatenate(
+        [
+            np.broadcast_to(np.asarray(numerator_offsets, dtype=float), metrics),
+            np.broadcast_to(np.asarray(denominator_offsets, dtype=float), metrics),
+        ]
+    )
+
+    # Classes only differ through a handful of values, so the multinomial runs
+    # over the distinct rows rather than over every class
+    types, weights = np.unique(
+        np.hstack([numerators, denominators]), axis=0, return_counts=True
+    )
+    sums = weights @ types + offsets
+    with np.errstate(divide="ignore", invalid="ignore"):
+        estimate = sums[:metrics] / sums[metrics:]
+
+    replicate_estimates = np.vstack(
+        run_seeded_chunks(
+            _ratio_chunk,
+            replicates,
+            chunk_size,
+            seed,
+            jobs,
+            args=(types, weights, offsets, metrics),
+        )
+    )
+    tail = (1 - confidence) / 2 * 100
+    lower, upper = np.nanpercentile(replicate_estimates, [tail, 100 - tail], axis=0)
+    return estimate, lower, upper
+
+
+def confidence_table(names, estimate, lower, upper, scale=1):
+    """DataFrame of the estimate and interval of each statistic."""
+    return pd.DataFrame(
+        {
+            "Estimate": estimate * scale,
+            "CI Lower": lower * scale,
+            "CI Upper": upper * scale,
+        },
+        index=names,
+    )
+
+
+def class_level_intervals(
+    vulnerable, flawed, findings, vulnerable_classes, total_findings, **options
+):
+    """
+    Intervals of the three headline percentages of one project by resampling
+    its classes.
+
+    :param vulnerable: Per scanned class, 1 if it has a Semgrep finding.
+    :param flawed: Per scanned class, 1 if it has a design smell.
+    :param findings: Per scanned class, its number of Semgrep findings.
+    :param vulnerable_classes: Number of distinct classes with findings,
+                               including those outside the scanned classes.
+    :param total_findings: Number of findings, including those outside the
+                           scanned classes.
+    :param options: Keyword arguments for ``bootstrap_ratios``.
+    """
+    vulnerable = np.asarray(vulnerable, dtype=float)
+    flawed = np.asarray(flawed, dtype=float)
+    findings = np.asarray(findings, dtype=float)
+    ones = np.ones_like(vulnerable)
+
+    # Classes and findings outside the scanned classes are not resampled
+    estimate, lower, upper = bootstrap_ratios(
+        np.column_stack([vulnerable, flawed, findings * flawed]),
+        np.column_stack([ones, ones, findings]),
+        numerator_offsets=[vulnerable_classes - vulnerable.sum(), 0, 0],
+        denominator_offsets=[0, 0, total_findings - findings.sum()],
+        **options,
+    )
+    return confidence_table(HEADLINE_METRICS, estimate, lower, upper, scale=100)
+
+
+def project_level_intervals(percentages, **options):
+    """
+    Intervals of the per-project average of each headline percentage by
+    resampling projects.
+
+    :param percentages: Array of shape (projects, metrics) of per-project
+                        percentages.
+    """
+    percentages = np.asarray(percentages, dtype=float)
+    estimate, lower, upper = bootstrap_ratios(
+        percentages, np.ones_like(percentages), **options
+    )
+    return confidence_table(HEADLINE_METRICS, estimate, lower, upper)
@@ -1,82 +1,289 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import pandas as pd
 import scipy.stats as stats
-from scipy.stats import combine_pvalues
-import matplotlib.pyplot as plt
 import numpy as np
+from data_manipulation import DESIGN_SMELLS, VULNERABILITY_CLASS_COLUMN
+from meta_analysis import fisher_combination
+from shared_table import SharedTable, attach_table, row_blocks, table_categories
+from smell_flags import FLAG_COLUMNS, frame_flags, smell_presence
 
 
-def chi_square_test_analysis(merged_df):
-    code_smells_dummies = pd.get_dummies(
-        merged_df["extra.metadata.vulnerability_class.0"], prefix="Code_Smell"
+def contingency_counts(merged_df, design_smells, code_smells_dummies):
+    """
+    Count the cells of every design smell x code smell 2x2 table at once.
+
+    Design smells are read as present or absent from the packed smell flags
+    of the rows, and rows where the smell is missing are left out, as
+    ``pd.crosstab`` would do. With the smell indicators and the code smell
+    indicators stacked as matrices, a single matrix product gives the
+    co-occurrence counts of all pairs.
+
+    :return: Arrays ``a, b, c, d`` of shape (design smells, code smells) holding
+             the (1, 1), (1, 0), (0, 1) and (0, 0) cells respectively.
+    """
+    present, absent = (
+        indicator.astype(float)
+        for indicator in smell_presence(
+            *frame_flags(merged_df, design_smells), design_smells
+        )
     )
+    indicators = code_smells_dummies.to_numpy(dtype=float)
 
-    merged_df = pd.concat([merged_df, code_smells_dummies], axis=1)
+    a = present.T @ indicators
+    c = absent.T @ indicators
+    b = present.sum(axis=0)[:, None] - a
+    d = absent.sum(axis=0)[:, None] - c
 
-    def chi_square_test(design_smell, code_smell):
-        # Ensure there are both 0s and 1s for the design smell and code smell
-        if (
-            merged_df[design_smell].nunique() > 1
-            and merged_df[code_smell].nunique() > 1
-        ):
-            contingency_table = pd.crosstab(
-                merged_df[design_smell], merged_df[code_smell]
-            )
-            if contingency_table.shape == (2, 2):
-                chi2, p, dof, ef = stats.chi2_contingency(contingency_table)
-                return chi2, p
-            else:
-                print(
-                    f"Invalid contingency table shape for {design_smell} and {code_smell}"
+    return a, b, c, d
+
+
+def _contingency_block(handle, design_smells, code_column, start, stop):
+    table = attach_table(handle)
+    flags, missing = (table[column][start:stop] for column in FLAG_COLUMNS)
+    codes = table[code_column][start:stop]
+
+    with_finding = codes >= 0
+    indicators = np.zeros((stop - start, len(table_categories(handle, code_column))))
+    indicators[np.flatnonzero(with_finding), codes[with_finding]] = 1
+
+    present, absent = (
+        indicator.astype(float)
+        for indicator in smell_presence(flags, missing, design_smells)
+    )
+    return (
+        present.T @ indicators,
+        absent.T @ indicators,
+        present.sum(axis=0),
+        absent.sum(axis=0),
+        indicators.sum(axis=0),
+    )
+
+
+def parallel_contingency_counts(merged_df, design_smells, jobs):
+    """
+    ``contingency_counts`` over row blocks counted in ``jobs`` processes.
+
+    The packed smell flags and the vulnerability class are published once as
+    a ``SharedTable``; every worker attaches to it and counts its own block,
+    so the frame is never pickled and the workers share a single copy of it,
+    eight bytes per row for the smells whatever their number. The
+    vulnerability class always travels as category codes, as
+    ``pd.get_dummies`` would encode it whatever its dtype. All counts are sums
+    over rows, so the block results simply add up.
+
+    :return: Tuple of the code smell names, the cells ``a, b, c, d`` and the
+             number of rows of each code smell.
+    """
+    flags, missing = frame_flags(merged_df, design_smells)
+    shared_df = pd.DataFrame(
+        {
+            FLAG_COLUMNS[0]: flags,
+            FLAG_COLUMNS[1]: missing,
+            VULNERABILITY_CLASS_COLUMN: merged_df[
+                VULNERABILITY_CLASS_COLUMN
+            ].to_numpy(),
+        }
+    )
+    with SharedTable(shared_df, categorical=[VULNERABILITY_CLASS_COLUMN]) as table:
+        blocks = row_blocks(len(merged_df), jobs)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(
+                executor.map(
+                    _contingency_block,
+                    repeat(table.handle),
+                    repeat(list(design_smells)),
+                    repeat(VULNERABILITY_CLASS_COLUMN),
+                    *zip(*blocks),
                 )
-                return None, None
-        else:
-            print(
-                f"Skipping Chi-Square test for {design_smell} and {code_smell} due to insufficient data"
             )
-            return None, None
+        classes = table_categories(table.handle, VULNERABILITY_CLASS_COLUMN)
+
+    a, c, present_total, absent_total, code_smell_counts = (
+        np.sum(parts, axis=0) for parts in zip(*results)
+    )
+    return (
+        [f"Code_Smell_{cls}" for cls in classes],
+        a,
+        present_total[:, None] - a,
+        c,
+        absent_total[:, None] - c,
+        code_smell_counts,
+    )
+
+
+def chi_square_from_counts(a, b, c, d, correction=True):
+    """
+    Vectorized equivalent of ``stats.chi2_contingency`` for arrays of 2x2 tables.
+
+    Applies the same Yates continuity correction SciPy uses for one degree of
+    freedom. Tables with an empty row or column yield NaN.
+    """
+    a, b, c, d = (np.asarray(cell, dtype=float) for cell in (a, b, c, d))
+    n = a + b + c + d
+    row_present = a + b
+    row_absent = c + d
+    col_present = a + c
+    col_absent = b + d
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = [
+            row_present * col_present / n,
+            row_present * col_absent / n,
+            row_absent * col_present / n,
+            row_absent * col_absent / n,
+        ]
+        chi2 = np.zeros_like(n)
+        for observed, expected_cell in zip((a, b, c, d), expected):
+            deviation = np.abs(observed - expected_cell)
+            if correction:
+                deviation = deviation - np.minimum(0.5, deviation)
+            chi2 = chi2 + deviation**2 / expected_cell
+
+    valid = (np.minimum(row_present, row_absent) > 0) & (
+        np.minimum(col_present, col_absent) > 0
+    )
+    chi2 = np.where(valid, chi2, np.nan)
+    p = stats.chi2.sf(chi2, 1)
+
+    return chi2, p
+
 
-    design_smells = [
-        "God_Class",
-        "Complex_Class",
-        "Large_Class",
-        "Data_Class",
-        "Feature_Envy",
-        "Brain_Class",
-    ]
+def chi_square_all_pairs(merged_df, design_smells=None, jobs=1):
+    """
+    Run the chi-square test for every design smell x code smell pair in one step.
 
+    :param merged_df: Class-level frame with design smell flags and the
+                      vulnerability class of each class.
+    :param design_smells: Design smell columns to test, the six classic ones by default.
+    :param jobs: Number of processes counting the tables over row blocks of
+                 ``merged_df``, see ``parallel_contingency_counts``.
+    :return: DataFrame with one row per pair holding the table cells, ``Chi2``,
+             ``p-value`` and a ``Status`` of "ok", "insufficient data" or
+             "invalid shape".
+    """
+    if design_smells is None:
+        design_smells = DESIGN_SMELLS
+
+    if jobs > 1 and len(merged_df) > 1:
+        code_smells, a, b, c, d, code_smell_counts = parallel_contingency_counts(
+            merged_df, design_smells, jobs
+        )
+        return pair_results_from_counts(
+            design_smells, code_smells, a, b, c, d, code_smell_counts, len(merged_df)
+        )
+
+    code_smells_dummies = pd.get_dummies(
+        merged_df[VULNERABILITY_CLASS_COLUMN], prefix="Code_Smell"
+    )
     code_smells = code_smells_dummies.columns.tolist()
 
+    a, b, c, d = contingency_counts(merged_df, design_smells, code_smells_dummies)
+    return pair_results_from_counts(
+        design_smells,
+        code_smells,
+        a,
+        b,
+        c,
+        d,
+        code_smells_dummies.to_numpy().sum(axis=0),
+        len(merged_df),
+    )
+
+
+def pair_results_from_counts(
+    design_smells, code_smells, a, b, c, d, code_smell_counts, rows
+):
+    """
+    Chi-square results of every pair from its 2x2 table cells.
+
+    :param code_smell_counts: Number of rows of each code smell.
+    :param rows: Number of rows the tables were counted over.
+    :return: DataFrame in the layout of ``chi_square_all_pairs``.
+    """
+    chi2, p = chi_square_from_counts(a, b, c, d)
+
+    # Both variables need both levels over the whole frame, as nunique() checked
+    ds_varies = (a + b > 0) & (c + d > 0)
+    cs_count = np.asarray(code_smell_counts)
+    cs_varies = (cs_count > 0) & (cs_count < rows)
+    sufficient = ds_varies & cs_varies[None, :]
+
+    status = np.where(
+        ~sufficient,
+        "insufficient data",
+        np.where(np.isnan(chi2), "invalid shape", "ok"),
+    )
+
+    return pd.DataFrame(
+        {
+            "Design Smell": np.repeat(design_smells, len(code_smells)),
+            "Code Smell": np.tile(code_smells, len(design_smells)),
+            "a": a.ravel(),
+            "b": b.ravel(),
+            "c": c.ravel(),
+            "d": d.ravel(),
+            "Chi2": np.where(status == "ok", chi2, np.nan).ravel(),
+            "p-value": np.where(status == "ok", p, np.nan).ravel(),
+            "Status": status.ravel(),
+        }
+    )
+
+
+def chi_square_test_analysis(
+    merged_df, design_smells=None, test="chi2", count_jobs=1, **permutation_options
+):
+    """
+    Print and return the p-values of every design smell x code smell pair.
+
+    :return: Dictionary mapping each tested ``(design smell, code smell)`` pair
+             to its p-value.
+
+    :param test: "chi2" for the asymptotic chi-square test, or "permutation" for
+                 Monte Carlo permutation tests with exact Fisher fallback.
+    :param count_jobs: Number of processes counting the contingency tables.
+    :param permutation_options: Keyword arguments for
+                                ``permutation_test.permutation_test_all_pairs``.
+    """
+    if design_smells is None:
+        design_smells = DESIGN_SMELLS
+
+    if test == "permutation":
+        # Imported here as permutation_test builds on this module
+        from permutation_test import permutation_test_all_pairs
+
+        all_pairs = permutation_test_all_pairs(
+            merged_df, design_smells, count_jobs=count_jobs, **permutation_options
+        )
+    else:
+        all_pairs = chi_square_all_pairs(merged_df, design_smells, count_jobs)
+
     p_values = {}
 
-    for ds in design_smells:
-        results = []
-        chi2_values = []
-        p_values[ds] = []
-        for cs in code_smells:
-            chi2, p = chi_square_test(ds, cs)
-            if chi2 is not None and p is not None:
-                chi2_values.append((cs, chi2))
-                p_values[ds].append(p)
-                if p < 0.05:
-                    results.append(
-                        {
-                            "Code Smell": cs,
-                            "Chi2": chi2,
-                            "p-value": p,
-                            "Significant": "Yes",
-                        }
-                    )
-                else:
-                    results.append(
-                        {
-                            "Code Smell": cs,
-                            "Chi2": chi2,
-                            "p-value": p,
-                            "Significant": "No",
-                        }
-                    )
-
-        results_df = pd.DataFrame(results)
+    for ds, pairs in all_pairs.groupby("Design Smell", sort=False):
+        for cs, status in zip(pairs["Code Smell"], pairs["Status"]):
+            if status == "insufficient data":
+                print(
+                    f"Skipping Chi-Square test for {ds} and {cs} due to insufficient data"
+                )
+            elif status == "invalid shape":
+                print(f"Invalid contingency table shape for {ds} and {cs}")
+
+        tested = pairs[pairs["Status"] == "ok"]
+        p_values.update(
+            zip(zip(tested["Design Smell"], tested["Code Smell"]), tested["p-value"])
+        )
+
+        results_df = pd.DataFrame(
+            {
+                "Code Smell": tested["Code Smell"],
+                "Chi2": tested["Chi2"],
+                "p-value": tested["p-value"],
+                "Significant": np.where(tested["p-value"] < 0.05, "Yes", "No"),
+            }
+        ).reset_index(drop=True)
+        if "Method" in tested:
+            results_df["Method"] = tested["Method"].to_numpy()
         print(f"Results for Design Smell: {ds}")
         print(results_df)
         print("\n")
@@ -85,20 +292,10 @@ def chi_square_test_analysis(merged_df):
 
 
 def combine_p_values(p_values):
-    """Combine p-values using Fisher's method."""
-    p_values = np.array(p_values)
-
-    # Debug: Print out p-values to identify any non-scalar values
-    for i, p in enumerate(p_values):
-        if not np.isscalar(p):
-            print(f"Non-scalar p-value detected at index {i}: {p}")
-
-    # Check if all p-values are scalars, not arrays
-    if not all(np.isscalar(p) for p in p_values):
+    """Combine p-values using Fisher's method; NaN entries are skipped."""
+    p_values = np.asarray(p_values, dtype=float)
+    if p_values.ndim != 1:
         raise ValueError("All p-values should be scalar values.")
 
-    # Apply Fisher's method
-    chi2_statistic = -2 * np.sum(np.log(p_values))
-    combined_p_value = stats.chi2.sf(chi2_statistic, 2 * len(p_values))
-
-    return combined_p_value
+    _, combined_p_value, _ = fisher_combination(p_values[None, :])
+    return combined_p_value[0]
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+from data_manipulation import (
+    DESIGN_SMELLS,
+    NORMALIZATION_VERSION,
+    get_smells_result_manipulation,
+    semgrep_result_manipulation,
+)
+from class_resolver import print_resolution_summary, resolved_frames
+from frame_cache import cached_call
+from profiling import stage
+from semgrep_loader import is_semgrep_json, semgrep_json_manipulation
+from smell_flags import (
+    FLAG_COLUMNS,
+    compact_smell_counts,
+    has_any,
+    pack_smell_flags,
+)
+
+# Per-class columns class_table adds to the merged frame
+CLASS_TABLE_COLUMNS = ["finding_count", "flawed", "first_row"]
+
+
+class ClassIndex:
+    """
+    Dense integer ids for the normalized class Names of one project.
+
+    Every ``Name`` from the GetSmells, Semgrep and scanned frames is interned
+    once with ``pd.factorize``. Bit-packed smell flags and finding counts are
+    then kept in arrays aligned on those ids, so the joins of the analysis
+    become array gathers instead of repeated string merges. Once packed, the
+    smell columns only serve occurrence totals and are kept as small unsigned
+    counts instead of floats, next to the ``FLAG_COLUMNS`` of every row.
+    """
+
+    def __init__(self, get_smells_df, semgrep_df, scanned_df):
+        smells_names = get_smells_df["Name"].to_numpy(dtype=object)
+        semgrep_names = semgrep_df["Name"].to_numpy(dtype=object)
+        scanned_names = scanned_df["Name"].to_numpy(dtype=object)
+
+        codes, self.names = pd.factorize(
+            np.concatenate([smells_names, semgrep_names, scanned_names])
+        )
+        smells_ids, semgrep_ids, self.scanned_ids = np.split(
+            codes, np.cumsum([len(smells_names), len(semgrep_names)])
+        )
+        number_of_ids = len(self.names)
+
+        self.semgrep_df = semgrep_df.reset_index(drop=True)
+
+        # GetSmells frames are grouped by Name, so each id has at most one row
+        self.smells_row = np.full(number_of_ids, -1)
+        self.smells_row[smells_ids] = np.arange(len(smells_ids))
+
+        get_smells_df = get_smells_df.reset_index(drop=True)
+        flags, missing = pack_smell_flags(get_smells_df)
+        self.get_smells_df = compact_smell_counts(get_smells_df).assign(
+            **dict(zip(FLAG_COLUMNS, (flags, missing)))
+        )
+        self.smell_flags = np.zeros(number_of_ids, dtype=np.uint32)
+        self.smell_flags[smells_ids] = flags
+        self.missing_smells = np.zeros(number_of_ids, dtype=np.uint32)
+        self.missing_smells[smells_ids] = missing
+
+        self.finding_counts = np.bincount(semgrep_ids, minlength=number_of_ids)
+
+        # Assigning in reverse leaves the first finding of every id, matching
+        # drop_duplicates(subset="Name")
+        self.first_finding_row = np.full(number_of_ids, -1)
+        self.first_finding_row[semgrep_ids[::-1]] = np.arange(len(semgrep_ids))[::-1]
+
+    def __len__(self):
+        return len(self.names)
+
+    def has_smells(self):
+        return self.smells_row >= 0
+
+    def scanned_class_ids(self):
+        """Ids of the scanned rows known to GetSmells, in scanned order."""
+        return self.scanned_ids[self.has_smells()[self.scanned_ids]]
+
+    def mask(self, ids):
+        """Id-aligned membership mask of ``ids``."""
+        membership = np.zeros(len(self), dtype=bool)
+        membership[ids] = True
+        return membership
+
+    def flawed(self, design_smells=None):
+        """Id-aligned mask of classes with at least one of ``design_smells``."""
+        if design_smells is None:
+            design_smells = DESIGN_SMELLS
+        return has_any(self.smell_flags, design_smells)
+
+    def merged_frame(self, ids):
+        """
+        Rows of ``ids`` with their smell columns and first Semgrep finding.
+
+        Equivalent to merging the scanned rows with the GetSmells frame and then
+        left-merging the deduplicated Semgrep frame, without any string join.
+        Smells are read from the packed ``FLAG_COLUMNS``; blank smell cells
+        read 0 in the count columns.
+        """
+        smells = self.get_smells_df.take(self.smells_row[ids]).reset_index(drop=True)
+        findings = (
+            self.semgrep_df.drop(columns="Name")
+            .reindex(self.first_finding_row[ids])
+            .reset_index(drop=True)
+        )
+        return pd.concat([smells, findings], axis=1)
+
+    def class_table(self, ids):
+        """
+        ``merged_frame(ids)`` with the per-class columns of ``CLASS_TABLE_COLUMNS``.
+
+        ``finding_count`` is the number of Semgrep findings of the class,
+        ``flawed`` whether it has a design smell and ``first_row`` marks the
+        first row of each class, so totals over classes count duplicated
+        scanned rows once.
+        """
+        table = self.merged_frame(ids)
+        first_row = np.zeros(len(ids), dtype=bool)
+        first_row[np.unique(ids, return_index=True)[1]] = True
+        table["finding_count"] = self.finding_counts[ids]
+        table["flawed"] = self.flawed()[ids]
+        table["first_row"] = first_row
+        return table
+
+
+def load_class_index(
+    get_smells_input_csv,
+    semgrep_input_csv,
+    scanned_files,
+    cache_dir=None,
+    chunksize=None,
+    get_smells_df=None,
+    resolve_names=False,
+):
+    """
+    Read and normalize the three inputs of a project into a ``ClassIndex``.
+
+    :param cache_dir: Directory of cached normalized frames, see ``cached_call``.
+    :param chunksize: Block size for reading the GetSmells export.
+    :param semgrep_input_csv: Semgrep results CSV, or the Semgrep JSON output;
+                              ``scanned_files`` may then name the same JSON.
+    :param get_smells_df: Already normalized GetSmells frame, used instead of
+                          reading ``get_smells_input_csv``.
+    :param resolve_names: Key classes on their fully-qualified name, resolving
+                          Semgrep and scanned paths with
+                          ``class_resolver.resolved_frames``, instead of the
+                          ``package.Class`` key. Resolved frames are not cached.
+    :return: Tuple of the index and the Semgrep frame without duplicate classes.
+    """
+    if resolve_names:
+        with stage("resolve_names"):
+            (
+                get_smells_df,
+                semgrep_df,
+                semgrep_df_without_duplicates,
+                scanned_df,
+                report,
+            ) = resolved_frames(get_smells_input_csv, semgrep_input_csv, scanned_files)
+        print_resolution_summary(report)
+        return (
+            _build_class_index(get_smells_df, semgrep_df, scanned_df),
+            semgrep_df_without_duplicates,
+        )
+
+    if get_smells_df is None:
+        with stage("get_smells"):
+            get_smells_df = cached_call(
+                get_smells_result_manipulation,
+                get_smells_input_csv,
+                cache_dir,
+                NORMALIZATION_VERSION,
+                chunksize=chunksize,
+            )
+
+    json_scanned_df = None
+    with stage("semgrep_results"):
+        if is_semgrep_json(semgrep_input_csv):
+            semgrep_df, semgrep_df_without_duplicates, json_scanned_df = cached_call(
+                semgrep_json_manipulation,
+                semgrep_input_csv,
+                cache_dir,
+                NORMALIZATION_VERSION,
+            )
+        else:
+            semgrep_df, semgrep_df_without_duplicates = cached_call(
+                semgrep_result_manipulation,
+                semgrep_input_csv,
+                cache_dir,
+                NORMALIZATION_VERSION,
+            )
+
+    with stage("scanned_files"):
+        # A Semgrep JSON output lists the scanned files itself
+        if json_scanned_df is not None and scanned_files == semgrep_input_csv:
+            scanned_df = json_scanned_df
+        else:
+            scanned_df, _ = cached_call(
+                semgrep_result_manipulation,
+                scanned_files,
+                cache_dir,
+                NORMALIZATION_VERSION,
+            )
+
+    return (
+        _build_class_index(get_smells_df, semgrep_df, scanned_df),
+        semgrep_df_without_duplicates,
+    )
+
+
+def _build_class_index(get_smells_df, semgrep_df, scanned_df):
+    with stage(
+        "class_index", len(get_smells_df) + len(semgrep_df) + len(scanned_df)
+    ) as record:
+        class_index = ClassIndex(get_smells_df, semgrep_df, scanned_df)
+        record["rows_out"] = len(class_index)
+    return class_index
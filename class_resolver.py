@@ -0,0 +1,210 @@
+import argparse
+import pandas as pd
+from semgrep_loader import is_semgrep_json, read_semgrep_json
+from project_registry import (
+    PROJECT_MANIFEST,
+    load_registry,
+    select_projects,
+    validate_projects,
+)
+
+RESOLVED = "resolved"
+AMBIGUOUS = "ambiguous"
+UNRESOLVED = "unresolved"
+
+
+def top_level_names(names):
+    """
+    Map fully-qualified names to their top-level class.
+
+    The first segment starting with an uppercase letter is the top-level class,
+    so ``a.b.Outer.Inner.Deeper`` becomes ``a.b.Outer``; this handles any depth
+    of nesting, unlike the ``package.Class`` key of GetSmells exports.
+    """
+    return names.str.replace(r"^((?:[^.]*\.)*?[A-Z][^.]*)\..*$", r"\1", regex=True)
+
+
+def path_segments(path):
+    """Directories and extension-less file name of a source path."""
+    segments = path.split("/")
+    segments[-1] = segments[-1].rsplit(".", 1)[0]
+    return segments
+
+
+class PackageTrie:
+    """
+    Trie over the reversed segments of fully-qualified class names.
+
+    ``org.example.Foo`` is stored along ``Foo -> example -> org``, so walking
+    a source path from its file name towards the root follows the longest
+    package suffix it shares with any known class, one step per segment.
+    Every node keeps the number of names below it and the name ending there,
+    if any.
+    """
+
+    def __init__(self, names):
+        # node: [children, number of names below, name ending here]
+        self.root = [{}, 0, None]
+        for name in pd.unique(pd.Series(names).dropna()):
+            node = self.root
+            node[1] += 1
+            for segment in reversed(name.split(".")):
+                node = node[0].setdefault(segment, [{}, 0, None])
+                node[1] += 1
+            node[2] = name
+
+    def resolve(self, segments):
+        """
+        Fully-qualified name of the class stored in a path.
+
+        The deepest fully matched name wins. Without one, the walk stops where
+        the path leaves the trie, or runs out of segments, short of any stored
+        name: the path is ambiguous when several names lie below that node,
+        e.g. two ``Util`` classes of different packages, and unresolved
+        otherwise. A single name below the node shares only part of its
+        package with the path, so it is counted as a candidate but never
+        taken as the class of the path.
+
+        :return: Tuple of the name (None when not resolved), the status and the
+                 number of candidate names.
+        """
+        node = self.root
+        match = None
+        for segment in reversed(segments):
+            child = node[0].get(segment)
+            if child is None:
+                break
+            node = child
+            if node[2] is not None:
+                match = node[2]
+
+        if match is not None:
+            return match, RESOLVED, 1
+        if node is self.root:
+            return None, UNRESOLVED, 0
+        if node[1] == 1:
+            return None, UNRESOLVED, 1
+        return None, AMBIGUOUS, node[1]
+
+    def resolve_paths(self, paths):
+        """
+        Resolve every path, each distinct path once.
+
+        Paths that do not resolve keep a key of their own, the dotted path
+        without extension, so they never merge with a known class or with
+        each other; missing paths get an empty key.
+
+        :return: DataFrame aligned with ``paths`` with the ``Name`` key, the
+                 ``Status`` and the number of ``Candidates``.
+        """
+        resolved = {}
+        for path in pd.unique(paths.dropna()):
+            segments = path_segments(path)
+            name, status, candidates = self.resolve(segments)
+            if name is None:
+                name = ".".join(segment for segment in segments if segment)
+            resolved[path] = (name, status, candidates)
+
+        rows = [resolved.get(path, ("", UNRESOLVED, 0)) for path in paths]
+        return pd.DataFrame(
+            rows, columns=["Name", "Status", "Candidates"], index=paths.index
+        )
+
+
+def _resolved_semgrep_frame(df, trie):
+    resolution = trie.resolve_paths(df["path"])
+    report = pd.concat([df["path"], resolution], axis=1)
+    df["path"] = resolution["Name"]
+    df.rename(columns={"path": "Name"}, inplace=True)
+    return df, df.drop_duplicates(subset="Name"), report
+
+
+def resolved_frames(get_smells_input_csv, semgrep_input_csv, scanned_files):
+    """
+    Read the three inputs of a project keyed on resolved fully-qualified names.
+
+    GetSmells rows are collapsed per top-level class; Semgrep and scanned paths
+    are mapped onto those classes with a ``PackageTrie``.
+
+    :return: Tuple of the GetSmells frame, the Semgrep frame, the Semgrep frame
+             without duplicate classes, the scanned frame and the resolution
+             report of every Semgrep and scanned path.
+    """
+    get_smells_df = pd.read_csv(get_smells_input_csv, delimiter=";")
+    get_smells_df = get_smells_df.dropna(how="all")
+    get_smells_df["Name"] = top_level_names(get_smells_df["Name"])
+    get_smells_df = get_smells_df.groupby("Name").max().reset_index()
+
+    trie = PackageTrie(get_smells_df["Name"])
+    json_scanned_df = None
+    if is_semgrep_json(semgrep_input_csv):
+        semgrep_df, json_scanned_df = read_semgrep_json(semgrep_input_csv)
+    else:
+        semgrep_df = pd.read_csv(semgrep_input_csv, delimiter=";")
+    if json_scanned_df is not None and scanned_files == semgrep_input_csv:
+        scanned_df = json_scanned_df
+    else:
+        scanned_df = pd.read_csv(scanned_files, delimiter=";")
+
+    semgrep_df, semgrep_df_without_duplicates, semgrep_report = _resolved_semgrep_frame(
+        semgrep_df, trie
+    )
+    scanned_df, _, scanned_report = _resolved_semgrep_frame(scanned_df, trie)
+
+    report = pd.concat(
+        [
+            semgrep_report.assign(Source="semgrep"),
+            scanned_report.assign(Source="scanned"),
+        ],
+        ignore_index=True,
+    ).drop_duplicates(subset=["Source", "path"])
+    return (
+        get_smells_df,
+        semgrep_df,
+        semgrep_df_without_duplicates,
+        scanned_df,
+        report,
+    )
+
+
+def print_resolution_summary(report):
+    counts = report.groupby(["Source", "Status"]).size().unstack(fill_value=0)
+    print("Resolução de caminhos para classes:")
+    print(counts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Report how Semgrep and scanned paths resolve to GetSmells classes."
+    )
+    parser.add_argument("--manifest", default=PROJECT_MANIFEST)
+    parser.add_argument("--project", action="append")
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Save the ambiguous and unresolved paths to this CSV.",
+    )
+    args = parser.parse_args(argv)
+
+    dictionary_list = validate_projects(
+        select_projects(load_registry(args.manifest), args.project)
+    )
+    reports = []
+    for dictionary in dictionary_list:
+        *_, report = resolved_frames(
+            dictionary["get_smells_input_csv"],
+            dictionary["semgrep_input_csv"],
+            dictionary["scanned_files"],
+        )
+        print(dictionary["display_name"])
+        print_resolution_summary(report)
+        reports.append(report.assign(Project=dictionary["name"]))
+
+    if args.output is not None:
+        report = pd.concat(reports, ignore_index=True)
+        report[report["Status"] != RESOLVED].to_csv(args.output, sep=";", index=False)
+        print(f"Unresolved paths saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,298 @@
 import pandas as pd
-import scipy.stats as stats
-import seaborn as sns
-import matplotlib.pyplot as plt
 import numpy as np
+from profiling import stage
+
+# Bump whenever the normalized frames change shape or content, to invalidate
+# any cached copies of them
+NORMALIZATION_VERSION = 2
+
+DESIGN_SMELLS = [
+    "God_Class",
+    "Complex_Class",
+    "Large_Class",
+    "Data_Class",
+    "Feature_Envy",
+    "Brain_Class",
+]
+
+# Every smell column of a GetSmells export, in file order
+GET_SMELLS_COLUMNS = [
+    "God_Class",
+    "Lazy_Class",
+    "Complex_Class",
+    "Large_Class",
+    "Refused_Request",
+    "Data_Class",
+    "Feature_Envy",
+    "Brain_Class",
+    "Hub_Like_Dependency",
+    "Class_Cyclic_Dependency",
+    "Unhealthy_Inheritance_Hierarchy",
+    "Long_Method",
+    "Long_Parameter_List",
+    "Shotgun_Surgery",
+    "Brain_Method",
+    "Unstable_Dependency",
+    "Package_Cyclic_Dependency",
+]
+
+VULNERABILITY_CLASS_COLUMN = "extra.metadata.vulnerability_class.0"
+
+
+def _pack_strings(values):
+    """
+    Pack strings into a single UTF-8 buffer.
 
+    Returns the buffer as a uint8 array together with the start and end byte
+    offsets of every string, so that name segments can be located with NumPy
+    instead of splitting each name into a Python list.
+    """
+    values = pd.Series(values).fillna("").to_numpy(dtype=object)
+    buffer = np.frombuffer("\n".join(values).encode("utf-8"), dtype=np.uint8)
 
-def get_smells_result_manipulation(input_csv):
-    df = pd.read_csv(input_csv, delimiter=";")
-    df = df.dropna(how="all")
+    newlines = np.flatnonzero(buffer == ord("\n"))
+    if len(newlines) != max(len(values) - 1, 0):
+        raise ValueError("Names and paths must not contain line breaks.")
 
-    segments = df["Name"].str.split(".")
+    starts = np.concatenate(([0], newlines + 1)).astype(np.int64)
+    ends = np.append(newlines, len(buffer)).astype(np.int64)
+    return buffer, starts[: len(values)], ends[: len(values)]
 
-    def get_correct_segments(name_parts):
-        if len(name_parts) > 1 and name_parts[-2][0].isupper():
-            return ".".join(name_parts[-3:-1])
-        else:
-            return ".".join(name_parts[-2:])
 
-    df["Name"] = segments.apply(get_correct_segments)
+def _unpack_strings(buffer, starts, ends):
+    """Inverse of ``_pack_strings`` for the byte ranges ``[starts, ends)``."""
+    if len(starts) == 0:
+        return []
 
-    result_df = df.groupby("Name").max().reset_index()
+    lengths = ends - starts
+    sizes = lengths + 1
+    offsets = np.cumsum(sizes) - sizes
 
-    return result_df
+    # Gather every range in one shot, leaving a slot after each for "\n"
+    positions = np.arange(sizes.sum()) - np.repeat(offsets - starts, sizes)
+    packed = buffer[np.minimum(positions, len(buffer) - 1)]
+    packed[offsets + lengths] = ord("\n")
 
+    return packed[:-1].tobytes().decode("utf-8").split("\n")
 
-def java_class_name_manipulation(df):
 
-    segments = df["Name"].str.split(".")
+def _last_before(positions, lower, upper):
+    """
+    Position of the last separator inside each ``[lower, upper)`` range.
+
+    ``positions`` holds the sorted offsets of one separator in the packed
+    buffer; ranges without a separator get ``lower - 1``.
+    """
+    if len(positions) == 0:
+        return lower - 1
+    index = np.searchsorted(positions, upper) - 1
+    found = positions[np.maximum(index, 0)]
+    return np.where((index >= 0) & (found >= lower), found, lower - 1)
+
+
+def _starts_uppercase(buffer, starts, ends):
+    first = buffer[np.minimum(starts, len(buffer) - 1)]
+    non_empty = starts < ends
+    uppercase = non_empty & (first >= ord("A")) & (first <= ord("Z"))
+
+    # Segments starting with a non-ASCII character are decoded to apply the
+    # Unicode definition of an uppercase letter
+    non_ascii = np.flatnonzero(non_empty & (first >= 0x80))
+    if len(non_ascii):
+        segments = pd.Series(
+            _unpack_strings(buffer, starts[non_ascii], ends[non_ascii]), dtype=object
+        )
+        uppercase[non_ascii] = segments.str[:1].str.isupper().to_numpy(dtype=bool)
+    return uppercase
+
+
+def normalize_get_smells_names(names):
+    """
+    Reduce GetSmells fully-qualified names to the ``package.Class`` key.
+
+    Nested classes (second to last segment starting with an uppercase letter)
+    are mapped to their enclosing class, everything else keeps its last two
+    segments.
+    """
+    buffer, starts, ends = _pack_strings(names)
+    dots = np.flatnonzero(buffer == ord("."))
+
+    last_dot = _last_before(dots, starts, ends)
+    second_dot = _last_before(dots, starts, last_dot)
+    third_dot = _last_before(dots, starts, second_dot)
+
+    has_dot = last_dot >= starts
+    nested = has_dot & _starts_uppercase(buffer, second_dot + 1, last_dot)
+
+    keys = _unpack_strings(
+        buffer,
+        np.where(nested, third_dot + 1, second_dot + 1),
+        np.where(nested, last_dot, ends),
+    )
+    return pd.Series(keys, index=names.index)
+
+
+def normalize_java_class_names(names):
+    """Keep the two segments preceding the last one of each dotted name."""
+    buffer, starts, ends = _pack_strings(names)
+    dots = np.flatnonzero(buffer == ord("."))
+
+    last_dot = _last_before(dots, starts, ends)
+    second_dot = _last_before(dots, starts, last_dot)
+    third_dot = _last_before(dots, starts, second_dot)
+
+    has_dot = last_dot >= starts
+    keys = _unpack_strings(
+        buffer,
+        np.where(has_dot, third_dot + 1, starts),
+        np.where(has_dot, last_dot, starts),
+    )
+    return pd.Series(keys, index=names.index)
+
+
+def normalize_semgrep_paths(paths):
+    """
+    Reduce source file paths to the ``directory.File`` key used by GetSmells.
+
+    Paths without an extension or missing altogether map to an empty name, and
+    a file with no parent directory keeps the ``['File']`` rendering that the
+    original list-based implementation produced.
+    """
+    buffer, starts, ends = _pack_strings(paths)
+    dots = np.flatnonzero(buffer == ord("."))
+    slashes = np.flatnonzero(buffer == ord("/"))
+
+    # The stem is whatever lies between the last two dots of the path
+    stem_end = _last_before(dots, starts, ends)
+    stem_start = _last_before(dots, starts, stem_end) + 1
+    has_stem = paths.notna().to_numpy() & (stem_end >= starts)
+
+    last_slash = _last_before(slashes, stem_start, stem_end)
+    parent_slash = _last_before(slashes, stem_start, last_slash)
+    has_parent = has_stem & (last_slash >= stem_start)
+
+    # "parent/File" becomes "parent.File" by rewriting the slash in place
+    buffer = buffer.copy()
+    buffer[last_slash[has_parent]] = ord(".")
+
+    keys = pd.Series(
+        _unpack_strings(
+            buffer,
+            np.where(has_parent, parent_slash + 1, stem_start),
+            np.where(has_stem, stem_end, stem_start),
+        ),
+        index=paths.index,
+    )
+
+    single_segment = has_stem & ~has_parent
+    keys[single_segment] = "['" + keys[single_segment] + "']"
+    return keys
+
+
+def get_smells_result_manipulation(
+    input_csv, chunksize=None, keys=("Name",), dtype=None
+):
+    """
+    Read a GetSmells export and collapse it to one row per ``package.Class``.
+
+    :param chunksize: Read the CSV in blocks of this many rows, folding each
+                      into a running per-class maximum; memory then grows with
+                      the number of distinct classes instead of the file size.
+                      The whole file is read at once when None.
+    :param keys: Columns the maximum is taken over, ``Name`` first; a
+                 multi-version export adds ``Version``.
+    :param dtype: Column types passed to ``pd.read_csv``.
+    """
+    keys = list(keys)
+    if chunksize is not None:
+        return _chunked_get_smells_result(input_csv, chunksize, keys, dtype)
+
+    with stage("read_csv") as record:
+        df = pd.read_csv(input_csv, delimiter=";", dtype=dtype)
+        df = df.dropna(how="all")
+        record["rows_out"] = len(df)
+
+    with stage("normalize_names", len(df)):
+        df["Name"] = normalize_get_smells_names(df["Name"])
 
-    def get_correct_segments(name_parts):
-        return ".".join(name_parts[-3:-1])
+    with stage("groupby_max", len(df)) as record:
+        result_df = df.groupby(keys).max().reset_index()
+        record["rows_out"] = len(result_df)
 
-    df["Name"] = segments.apply(get_correct_segments)
+    return result_df[_key_first(keys, df.columns)]
+
+
+def _key_first(keys, columns):
+    # Name leads, as after a groupby on it alone; other keys keep their place
+    return ["Name"] + [column for column in columns if column != "Name"]
+
+
+def _fold_max(frames):
+    if len(frames) == 1:
+        return frames[0]
+
+    # A text column such as Version that is blank in a whole chunk is read as
+    # float; give it the type of the chunks holding text, as a single read of
+    # the file would, before comparing values across chunks
+    for column in frames[0].columns:
+        text_dtypes = [
+            df[column].dtype
+            for df in frames
+            if df[column].notna().any()
+            and not pd.api.types.is_numeric_dtype(df[column].dtype)
+        ]
+        if text_dtypes:
+            frames = [
+                df.astype({column: text_dtypes[0]}) if df[column].isna().all() else df
+                for df in frames
+            ]
+    levels = list(range(frames[0].index.nlevels))
+    return pd.concat(frames).groupby(level=levels).max()
+
+
+def _chunked_get_smells_result(input_csv, chunksize, keys, dtype):
+    # The maximum of per-chunk maxima is the overall maximum, and groupby skips
+    # NaN the same way in both folds, so this matches the in-memory path.
+    # Chunk maxima are folded into the running aggregate once they hold as
+    # many rows as it does, which keeps the folding cost linear overall while
+    # memory stays within about twice the number of distinct classes.
+    result_df = None
+    pending = []
+    pending_rows = 0
+    columns = None
+    with stage("read_chunks") as record:
+        rows = 0
+        for chunk in pd.read_csv(
+            input_csv, delimiter=";", chunksize=chunksize, dtype=dtype
+        ):
+            columns = chunk.columns
+            chunk = chunk.dropna(how="all")
+            rows += len(chunk)
+            chunk["Name"] = normalize_get_smells_names(chunk["Name"])
+            pending.append(chunk.groupby(keys).max())
+            pending_rows += len(pending[-1])
+
+            running_rows = 0 if result_df is None else len(result_df)
+            if pending_rows >= max(running_rows, chunksize):
+                result_df = _fold_max(
+                    pending if result_df is None else [result_df] + pending
+                )
+                pending = []
+                pending_rows = 0
+        record["rows_out"] = rows
+
+    if pending:
+        result_df = _fold_max(pending if result_df is None else [result_df] + pending)
+    if result_df is None:
+        return get_smells_result_manipulation(input_csv, keys=keys, dtype=dtype)
+
+    result_df.index.names = keys
+    return result_df.reset_index()[_key_first(keys, columns)]
+
+
+def java_class_name_manipulation(df):
+
+    df["Name"] = normalize_java_class_names(df["Name"])
 
     result_df = df.groupby("Name").max().reset_index()
 
@@ -41,41 +302,50 @@ def java_class_name_manipulation(df):
 
 
 def semgrep_result_manipulation(input_csv):
-    df = pd.read_csv(input_csv, delimiter=";")
+    with stage("read_csv") as record:
+        df = pd.read_csv(input_csv, delimiter=";")
+        record["rows_out"] = len(df)
 
-    df["path"] = df["path"].str.split(".").str[-2]
-    path_list = df["path"].str.split("/")
+    return normalize_semgrep_frame(df)
 
-    def join_segments(name_parts):
-        if isinstance(name_parts, list) and len(name_parts) >= 2:
-            return ".".join(name_parts[-2:])
-        else:
-            return str(name_parts) if pd.notna(name_parts) else ""
 
-    df["path"] = path_list.apply(join_segments)
+def normalize_semgrep_frame(df):
+    """
+    Key a frame of Semgrep findings or scanned files on its class ``Name``.
+
+    :return: Tuple of the frame and the frame without duplicate classes.
+    """
+    with stage("normalize_paths", len(df)):
+        df["path"] = normalize_semgrep_paths(df["path"])
     df.rename(columns={"path": "Name"}, inplace=True)
-    df_without_duplicates = df.drop_duplicates(subset="Name")
+
+    with stage("drop_duplicates", len(df)) as record:
+        df_without_duplicates = df.drop_duplicates(subset="Name")
+        record["rows_out"] = len(df_without_duplicates)
 
     return df, df_without_duplicates
 
 
-def get_design_smells_related_to_vulnerabilities(df):
-    rows_with_one = df[
-        [
-            "God_Class",
-            "Complex_Class",
-            "Large_Class",
-            "Data_Class",
-            "Feature_Envy",
-            "Brain_Class",
-        ]
-    ].any(axis=1)
+def get_design_smells_related_to_vulnerabilities(df, flags=None):
+    """
+    Rows of ``df`` with at least one design smell, and their number.
+
+    :param flags: Packed smell flags of the rows of ``df``, such as
+                  ``ClassIndex.smell_flags[ids]``, packed once per project;
+                  when None they are read with ``smell_flags.frame_flags``.
+    """
+    # Imported here as smell_flags builds on the constants of this module
+    from smell_flags import frame_flags, has_any
+
+    if flags is None:
+        flags, _ = frame_flags(df, DESIGN_SMELLS)
+    rows_with_one = has_any(flags, DESIGN_SMELLS)
 
     # Filter the original DataFrame to get the rows with at least one design smell = 1
     df_with_design_smells = df[rows_with_one]
 
-    # Return the filtered DataFrame and the sum of rows with any design smell = 1
-    return df_with_design_smells, rows_with_one.sum()
+    # Return the filtered DataFrame and the number of rows with any design smell = 1
+    return df_with_design_smells, np.count_nonzero(rows_with_one)
 
 
 def get_design_smells_not_related_to_vulnerabilities(df):
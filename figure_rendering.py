@@ -0,0 +1,178 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+FIGURE_FORMATS = ["png", "svg", "pdf"]
+
+
+def load_plotting(headless=False):
+    """
+    Import the plotting stack on demand.
+
+    Stats-only runs never pay for matplotlib and seaborn; headless runs select
+    the non-interactive Agg backend before pyplot is imported.
+    """
+    import matplotlib
+
+    if headless:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    return plt, sns
+
+
+def _annotate_bars(ax):
+    """Write the height of every bar above it."""
+    for p in ax.patches:
+        ax.annotate(
+            format(p.get_height(), ".1f"),
+            (p.get_x() + p.get_width() / 2.0, p.get_height()),
+            ha="center",
+            va="center",
+            xytext=(0, 10),
+            textcoords="offset points",
+        )
+
+
+def _bar_figure(plt, sns, x, y, xlabel, ylabel, title):
+    plt.figure(figsize=(10, 6))
+    ax = sns.barplot(x=x, y=y, palette="viridis")
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    plt.xticks(rotation=45)
+    _annotate_bars(ax)
+
+
+def design_smell_figure(plt, sns, design_smell_analysis, title_suffix=""):
+    _bar_figure(
+        plt,
+        sns,
+        design_smell_analysis["Design Smell"],
+        design_smell_analysis["Número de Ocorrências"],
+        "Design Smells",
+        "Number of Occurrences",
+        f"Total Occurrences of Design Smells{title_suffix}",
+    )
+
+
+def code_smell_figure(plt, sns, code_smell_df, title_suffix=""):
+    # Mean of each smell column over the vulnerability classes
+    mean_values = code_smell_df.sort_index(ascending=False).mean()
+    if not isinstance(mean_values, pd.Series):
+        raise ValueError("Mean values should be a pandas Series.")
+
+    _bar_figure(
+        plt,
+        sns,
+        mean_values.index,
+        mean_values.values,
+        "Code Smells",
+        "Mean Number of Occurrences",
+        f"Mean Occurrences of Code Smells{title_suffix}",
+    )
+
+
+def totals_figure(plt, sns, totals, title_suffix=""):
+    class_counter, code_smell_counter = totals
+    _bar_figure(
+        plt,
+        sns,
+        ["Total Classes", "Total Code Smells"],
+        [class_counter, code_smell_counter],
+        "Category",
+        "Count",
+        f"Total Number of Classes and Code Smells{title_suffix}",
+    )
+
+
+def occurrence_heatmap(plt, sns, code_smell_df, title_suffix=""):
+    """Vulnerability class x smell matrix of ``analyze_occurrence``."""
+    plt.figure(
+        figsize=(1.5 * len(code_smell_df.columns) + 4, 0.45 * len(code_smell_df) + 2)
+    )
+    sns.heatmap(code_smell_df, annot=True, fmt=".0f", cmap="viridis")
+    plt.xlabel("Design Smells")
+    plt.ylabel("Vulnerability Class")
+    plt.title(f"Design Smells x Vulnerability Classes{title_suffix}")
+    plt.xticks(rotation=45)
+
+
+FIGURES = {
+    "design_smells": design_smell_figure,
+    "code_smells": code_smell_figure,
+    "totals": totals_figure,
+    "occurrence_heatmap": occurrence_heatmap,
+}
+
+
+def corpus_figures(
+    design_smell_analysis, code_smell_df, class_counter, code_smell_counter
+):
+    """Figure specifications of the aggregates over all projects."""
+    return [
+        ("design_smells", "design_smells", design_smell_analysis, ""),
+        ("code_smells", "code_smells", code_smell_df, " Across Projects"),
+        ("totals", "totals", (class_counter, code_smell_counter), ""),
+        ("occurrence_heatmap", "occurrence_heatmap", code_smell_df, ""),
+    ]
+
+
+def project_figures(project, display_name, design_smell_analysis, code_smell_df):
+    """Figure specifications of one project, written under ``<project>/``."""
+    suffix = f" ({display_name})"
+    return [
+        (f"{project}/design_smells", "design_smells", design_smell_analysis, suffix),
+        (f"{project}/code_smells", "code_smells", code_smell_df, suffix),
+        (f"{project}/occurrence_heatmap", "occurrence_heatmap", code_smell_df, suffix),
+    ]
+
+
+def _render_batch(figures, output_dir, formats):
+    plt, sns = load_plotting(headless=True)
+    paths = []
+    for name, kind, data, title_suffix in figures:
+        FIGURES[kind](plt, sns, data, title_suffix)
+        for figure_format in formats:
+            path = os.path.join(output_dir, f"{name}.{figure_format}")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            plt.savefig(path, bbox_inches="tight")
+            paths.append(path)
+        plt.close()
+    return paths
+
+
+def render_figures(figures, output_dir, formats=("png",), jobs=1):
+    """
+    Render figure specifications to files with the headless backend.
+
+    :param figures: List of ``(name, kind, data, title suffix)`` tuples, ``kind``
+                    being a key of ``FIGURES`` and ``name`` the file path
+                    without extension, relative to ``output_dir``.
+    :param formats: File formats written for every figure.
+    :param jobs: Number of worker processes. Figures are dealt round-robin to
+                 one batch per worker, so each worker imports the plotting
+                 stack once.
+    :return: List of the written paths.
+    """
+    if jobs <= 1 or len(figures) <= 1:
+        return _render_batch(figures, output_dir, formats)
+
+    batches = [figures[worker::jobs] for worker in range(min(jobs, len(figures)))]
+    with ProcessPoolExecutor(max_workers=len(batches)) as executor:
+        results = executor.map(
+            _render_batch,
+            batches,
+            [output_dir] * len(batches),
+            [formats] * len(batches),
+        )
+        return [path for paths in results for path in paths]
+
+
+def show_figures(figures):
+    """Draw the figures in interactive windows, one at a time."""
+    plt, sns = load_plotting()
+    for _, kind, data, title_suffix in figures:
+        FIGURES[kind](plt, sns, data, title_suffix)
+        plt.show()
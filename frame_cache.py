@@ -0,0 +1,141 @@
+import ast
+import hashlib
+import inspect
+import json
+import os
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+
+    CACHE_FORMAT = "parquet"
+except ImportError:
+    CACHE_FORMAT = "pickle"
+
+
+def file_fingerprint(path, block_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _local_imports(path):
+    """Modules of the directory of ``path`` that its source imports."""
+    directory = os.path.dirname(path)
+    with open(path, "r") as sf:
+        tree = ast.parse(sf.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            module_path = os.path.join(directory, f"{name.split('.')[0]}.py")
+            if os.path.isfile(module_path):
+                yield module_path
+
+
+def source_fingerprint(func):
+    """
+    Return a digest of the module source that defines ``func`` and of every
+    module of the repository it imports, transitively.
+
+    Any edit to the normalization code therefore yields a new cache key, even
+    when it lives in a helper module such as ``data_manipulation`` or
+    ``json_stream`` and nobody remembers to bump the normalization version.
+    """
+    pending = [os.path.abspath(inspect.getsourcefile(func))]
+    modules = set()
+    while pending:
+        path = pending.pop()
+        if path not in modules:
+            modules.add(path)
+            pending.extend(os.path.abspath(p) for p in _local_imports(path))
+
+    digest = hashlib.sha256()
+    for path in sorted(modules):
+        digest.update(os.path.basename(path).encode())
+        digest.update(file_fingerprint(path).encode())
+    return digest.hexdigest()
+
+
+def cache_key(func, input_csv, version):
+    parts = [
+        f"{func.__module__}.{func.__qualname__}",
+        str(version),
+        source_fingerprint(func),
+        file_fingerprint(input_csv),
+        pd.__version__,
+        CACHE_FORMAT,
+    ]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _frame_path(cache_dir, key, position):
+    return os.path.join(cache_dir, f"{key}.{position}.{CACHE_FORMAT}")
+
+
+def _write_frame(df, path):
+    # Write to a temporary name first so concurrent workers never read a
+    # half-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if CACHE_FORMAT == "parquet":
+        df.to_parquet(tmp_path)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read_frame(path):
+    if CACHE_FORMAT == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def cached_call(func, input_csv, cache_dir=None, version=0, **kwargs):
+    """
+    Call ``func(input_csv)`` through an on-disk cache of its resulting frames.
+
+    :param func: Normalization function returning a DataFrame or a tuple of DataFrames.
+    :param input_csv: Path to the input CSV passed to ``func``.
+    :param cache_dir: Directory holding the cached frames; caching is disabled when None.
+    :param version: Normalization version folded into the cache key.
+    :param kwargs: Extra arguments of ``func``. They are not part of the cache
+                   key, so they must not change its result (e.g. a chunk size).
+    :return: The same value ``func(input_csv)`` would return.
+    """
+    if cache_dir is None:
+        return func(input_csv, **kwargs)
+
+    key = cache_key(func, input_csv, version)
+    manifest_path = os.path.join(cache_dir, f"{key}.json")
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as mf:
+            manifest = json.load(mf)
+        frames = [
+            _read_frame(_frame_path(cache_dir, key, position))
+            for position in range(manifest["frames"])
+        ]
+        return tuple(frames) if manifest["tuple"] else frames[0]
+
+    result = func(input_csv, **kwargs)
+    is_tuple = isinstance(result, tuple)
+    frames = result if is_tuple else (result,)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    for position, df in enumerate(frames):
+        _write_frame(df, _frame_path(cache_dir, key, position))
+
+    # The manifest is written last, so its presence marks a complete entry
+    tmp_manifest_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_manifest_path, "w") as mf:
+        json.dump({"input": input_csv, "frames": len(frames), "tuple": is_tuple}, mf)
+    os.replace(tmp_manifest_path, manifest_path)
+
+    return result
@@ -1,26 +1,24 @@
 import pandas as pd
 import scipy.stats as stats
-import matplotlib.pyplot as plt
 import numpy as np
 import scipy.stats as stat
+from data_manipulation import DESIGN_SMELLS
+from figure_rendering import load_plotting
+from smell_flags import frame_flags, has_any
 
 
-def chi_square_test_any_smell(merged_df):
+def chi_square_test_any_smell(merged_df, flags=None):
+    """
+    Chi-square test of any design smell against any code smell.
+
+    :param flags: Packed smell flags of the rows of ``merged_df``, such as
+                  ``ClassIndex.smell_flags[ids]``, packed once per project;
+                  when None they are read with ``smell_flags.frame_flags``.
+    """
     # Create binary columns indicating the presence of any design smell and any code smell
-    merged_df["Any_Design_Smell"] = (
-        merged_df[
-            [
-                "God_Class",
-                "Complex_Class",
-                "Large_Class",
-                "Data_Class",
-                "Feature_Envy",
-                "Brain_Class",
-            ]
-        ]
-        .any(axis=1)
-        .astype(int)
-    )
+    if flags is None:
+        flags, _ = frame_flags(merged_df, DESIGN_SMELLS)
+    merged_df["Any_Design_Smell"] = has_any(flags, DESIGN_SMELLS).astype(int)
     code_smells_dummies = pd.get_dummies(
         merged_df["extra.metadata.vulnerability_class.0"], prefix="Code_Smell"
     )
@@ -50,6 +48,8 @@ def chi_square_test_any_smell(merged_df):
 
 
 def plot_chi_squared_distribution(chi2_statistic, dof):
+    plt, _ = load_plotting()
+
     # Define the range for the x-axis
     x = np.linspace(0, chi2_statistic + 10, 500)
 
@@ -0,0 +1,135 @@
+import json
+
+_WHITESPACE = " \t\n\r"
+
+
+class _JsonStream:
+    """
+    Minimal incremental reader over a JSON text file.
+
+    Only the containers on the way to the requested arrays are walked by hand;
+    every array item is decoded on its own with ``json.JSONDecoder.raw_decode``,
+    so memory is bounded by the size of the largest single item instead of the
+    size of the whole document.
+    """
+
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        # Drop what has already been consumed before appending the next chunk
+        chunk = self.fp.read(self.chunk_size)
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input.")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(
+                f"Expected '{char}' at offset {self.pos}, found '{self.buffer[self.pos]}'."
+            )
+        self.pos += 1
+
+    def read_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number ending exactly at the buffer boundary may be truncated
+            if end == len(self.buffer) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self):
+        char = self.peek()
+        if char == "{":
+            for _ in self.iter_object_keys():
+                self.skip_value()
+        elif char == "[":
+            for _ in self.iter_array():
+                self.skip_value()
+        else:
+            self.read_value()
+
+    def iter_object_keys(self):
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def iter_array(self):
+        """Yield once per element; the caller must consume the element."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def _walk(stream, prefix, array_keys):
+    for key in stream.iter_object_keys():
+        path = f"{prefix}{key}"
+        if path in array_keys and stream.peek() == "[":
+            for _ in stream.iter_array():
+                yield path, stream.read_value()
+        elif stream.peek() == "{" and any(
+            array_key.startswith(f"{path}.") for array_key in array_keys
+        ):
+            yield from _walk(stream, f"{path}.", array_keys)
+        else:
+            stream.skip_value()
+
+
+def iter_json_arrays(json_file, array_keys, chunk_size=1 << 20):
+    """
+    Stream the items of one or more arrays out of a JSON document in a single pass.
+
+    :param json_file: Path to the input JSON file.
+    :param array_keys: Dotted paths of the arrays to stream, e.g. ``"results"``
+                       and ``"paths.scanned"``.
+    :param chunk_size: Number of characters read from disk at a time.
+    :return: Generator of ``(array_key, item)`` tuples in document order.
+    """
+    array_keys = set(array_keys)
+    with open(json_file, "r") as jf:
+        stream = _JsonStream(jf, chunk_size)
+        if stream.peek() != "{":
+            raise ValueError("The JSON document must be an object at the top level.")
+        yield from _walk(stream, "", array_keys)
@@ -1,5 +1,6 @@
 import json
 import csv
+from json_stream import iter_json_arrays
 
 
 def get_nested_value(data, keys):
@@ -99,6 +100,60 @@ def extract_scanned_to_csv(json_file, csv_file):
         print(f"Error: {e}")
 
 
+def stream_semgrep_json_to_csv(
+    json_file, csv_file, scanned_csv_file, fields, array_key="results", batch_size=1000
+):
+    """
+    Convert a Semgrep JSON output to the results and scanned CSVs in a single pass.
+
+    Unlike ``json_to_csv`` and ``extract_scanned_to_csv`` the document is never
+    fully loaded: the items of ``array_key`` and ``paths.scanned`` are streamed
+    one by one and written out in batches, so peak memory stays flat regardless
+    of the size of the input.
+
+    :param json_file: Path to the input JSON file.
+    :param csv_file: Path to the output CSV file for the results array.
+    :param scanned_csv_file: Path to the output CSV file for the scanned paths.
+    :param fields: List of fields to include in the CSV, in the same dot notation
+                   accepted by ``json_to_csv``.
+    :param array_key: Key of the results array in the JSON object.
+    :param batch_size: Number of rows buffered before each write.
+    """
+    field_keys = [field.split(".") for field in fields]
+    try:
+        with open(csv_file, "w", newline="") as cf, open(
+            scanned_csv_file, "w", newline=""
+        ) as sf:
+            writer = csv.writer(cf)
+            scanned_writer = csv.writer(sf)
+            writer.writerow(fields)
+            scanned_writer.writerow(["path"])
+
+            batches = {array_key: [], "paths.scanned": []}
+            writers = {array_key: writer, "paths.scanned": scanned_writer}
+
+            for key, item in iter_json_arrays(json_file, batches.keys()):
+                if key == array_key:
+                    row_values = [
+                        str(get_nested_value(item, keys)).strip() for keys in field_keys
+                    ]
+                else:
+                    row_values = [item]
+
+                batch = batches[key]
+                batch.append(row_values)
+                if len(batch) >= batch_size:
+                    writers[key].writerows(batch)
+                    batch.clear()
+
+            for key, batch in batches.items():
+                writers[key].writerows(batch)
+
+        print(f"CSV files '{csv_file}' and '{scanned_csv_file}' created successfully.")
+    except Exception as e:
+        print(f"Error: {e}")
+
+
 if __name__ == "__main__":
     # Specify the path to the JSON file
     json_file = "C:/Users/pedro/OneDrive/Documentos/Computacao/Faculdade/TCC/codigos/analise/jenkins/jenkins_output.json"
@@ -118,6 +173,5 @@ if __name__ == "__main__":
         "extra.metadata.vulnerability_class.0",
     ]  # Replace with your actual fields
 
-    # Convert JSON to CSV
-    json_to_csv(json_file, csv_file, fields, "results")
-    extract_scanned_to_csv(json_file, csv_scanned_file)
+    # Convert JSON to both CSVs in a single streaming pass
+    stream_semgrep_json_to_csv(json_file, csv_file, csv_scanned_file, fields, "results")
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import scipy.special as special
+import scipy.stats as stats
+
+PAIR_INDEX_NAMES = ["Design Smell", "Code Smell"]
+
+
+def p_value_matrix(project_p_values):
+    """
+    Stack per-project p-values into a pairs x projects matrix.
+
+    :param project_p_values: Mapping of project name to a ``{(design smell,
+                             code smell): p-value}`` dictionary.
+    :return: DataFrame indexed by (design smell, code smell) with one column
+             per project; NaN where the pair was not tested in that project.
+             Without any tested pair the frame is empty.
+    """
+    matrix = pd.DataFrame(
+        {
+            project: pd.Series(p_values, dtype=float)
+            for project, p_values in project_p_values.items()
+        }
+    )
+    if matrix.empty:
+        return pd.DataFrame(
+            columns=list(project_p_values),
+            index=pd.MultiIndex.from_arrays([[], []], names=PAIR_INDEX_NAMES),
+            dtype=float,
+        )
+    matrix.index = pd.MultiIndex.from_tuples(matrix.index, names=PAIR_INDEX_NAMES)
+    return matrix.sort_index()
+
+
+def fisher_combination(p_matrix):
+    """
+    Fisher's method along the rows of ``p_matrix``, skipping NaN.
+
+    :return: Arrays ``(statistic, p, k)``, k being the number of p-values
+             combined per row; rows without any p-value get NaN.
+    """
+    p_matrix = np.asarray(p_matrix, dtype=float)
+    tested = ~np.isnan(p_matrix)
+    k = tested.sum(axis=1)
+    log_p = np.zeros_like(p_matrix)
+    with np.errstate(divide="ignore"):
+        log_p[tested] = np.log(p_matrix[tested])
+    # Adding 0.0 turns the -0.0 of rows where every p-value is 1 into 0.0
+    statistic = -2 * log_p.sum(axis=1) + 0.0
+    statistic = np.where(k > 0, statistic, np.nan)
+    return statistic, stats.chi2.sf(statistic, 2 * k), k
+
+
+def stouffer_combination(p_matrix, weights=None):
+    """
+    Stouffer's Z method along the rows of ``p_matrix``, skipping NaN.
+
+    The p-values come from non-directional tests, so a p-value near 1 is no
+    evidence in the opposite direction; Yates-corrected tests of sparse tables
+    even return p = 1 exactly, whose Z of -inf would wipe out every other
+    project of the row. Each row is therefore capped at ``1 - 1 / (2k)``, k
+    being its number of tested p-values, about the largest of k uniform
+    p-values, before the inverse normal.
+
+    :param weights: Optional weight per column (project), e.g. the square root
+                    of its number of classes; equal weights by default.
+    :return: Arrays ``(z, p)``; rows without any p-value get NaN.
+    """
+    p_matrix = np.asarray(p_matrix, dtype=float)
+    if weights is None:
+        weights = np.ones(p_matrix.shape[1])
+    weights = np.broadcast_to(np.asarray(weights, dtype=float), p_matrix.shape)
+
+    tested = ~np.isnan(p_matrix)
+    weights = np.where(tested, weights, 0)
+    k = tested.sum(axis=1, keepdims=True)
+    ceiling = np.broadcast_to(1 - 1 / (2 * np.maximum(k, 1)), p_matrix.shape)
+    # norm.isf(p) is -ndtri(p); calling ndtri on the tested cells only skips
+    # the distribution machinery and the NaN cells
+    z_scores = np.zeros_like(p_matrix)
+    z_scores[tested] = -special.ndtri(
+        np.clip(p_matrix[tested], np.finfo(float).tiny, ceiling[tested])
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (weights * z_scores).sum(axis=1) / np.sqrt((weights**2).sum(axis=1))
+    z = np.where(tested.any(axis=1), z, np.nan)
+    return z, stats.norm.sf(z)
+
+
+def _sorted_by_column(p_values):
+    # np.sort places NaN last, so the tested p-values of every column come
+    # first in ascending order
+    p_values = np.asarray(p_values, dtype=float)
+    squeeze = p_values.ndim == 1
+    if squeeze:
+        p_values = p_values[:, None]
+    order = np.argsort(p_values, axis=0)
+    sorted_p = np.take_along_axis(p_values, order, axis=0)
+    m = (~np.isnan(p_values)).sum(axis=0)
+    rank = np.arange(1, len(p_values) + 1)[:, None]
+    return p_values, order, sorted_p, m, rank, squeeze
+
+
+def _unsort(p_values, order, adjusted_sorted, squeeze):
+    adjusted = np.empty_like(adjusted_sorted)
+    np.put_along_axis(adjusted, order, adjusted_sorted, axis=0)
+    adjusted = np.where(np.isnan(p_values), np.nan, np.minimum(adjusted, 1))
+    return adjusted[:, 0] if squeeze else adjusted
+
+
+def benjamini_hochberg(p_values):
+    """
+    Benjamini-Hochberg adjusted p-values, per column for 2-D input.
+
+    NaN entries are left out of the number of tests and stay NaN.
+    """
+    p_values, order, sorted_p, m, rank, squeeze = _sorted_by_column(p_values)
+    scaled = sorted_p * m / rank
+    # Running minimum from the largest p-value down; fmin skips the NaN tail
+    adjusted_sorted = np.fmin.accumulate(scaled[::-1], axis=0)[::-1]
+    return _unsort(p_values, order, adjusted_sorted, squeeze)
+
+
+def holm(p_values):
+    """
+    Holm step-down adjusted p-values, per column for 2-D input.
+
+    NaN entries are left out of the number of tests and stay NaN.
+    """
+    p_values, order, sorted_p, m, rank, squeeze = _sorted_by_column(p_values)
+    scaled = sorted_p * (m - rank + 1)
+    adjusted_sorted = np.fmax.accumulate(scaled, axis=0)
+    return _unsort(p_values, order, adjusted_sorted, squeeze)
+
+
+def meta_analysis(p_matrix, weights=None, alpha=0.05):
+    """
+    Combine the p-values of every pair across projects and correct for the
+    number of pairs tested.
+
+    :param p_matrix: Pairs x projects DataFrame from ``p_value_matrix``.
+    :param weights: Optional Stouffer weight per project.
+    :return: DataFrame with the number of projects, Fisher and Stouffer
+             combinations and the BH and Holm adjusted Fisher p-values of each
+             pair; ``Significant`` uses the BH p-value.
+    """
+    fisher_statistic, fisher_p, k = fisher_combination(p_matrix)
+    stouffer_z, stouffer_p = stouffer_combination(p_matrix, weights)
+    fisher_bh = benjamini_hochberg(fisher_p)
+
+    return pd.DataFrame(
+        {
+            "Projects": k,
+            "Fisher Chi2": fisher_statistic,
+            "Fisher p-value": fisher_p,
+            "Stouffer Z": stouffer_z,
+            "Stouffer p-value": stouffer_p,
+            "Fisher p-value BH": fisher_bh,
+            "Fisher p-value Holm": holm(fisher_p),
+            "Significant": np.where(fisher_bh < alpha, "Yes", "No"),
+        },
+        index=p_matrix.index,
+    )
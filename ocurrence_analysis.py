@@ -1,63 +1,83 @@
 import pandas as pd
-import scipy.stats as stats
-import seaborn as sns
-import matplotlib.pyplot as plt
 import numpy as np
+from data_manipulation import DESIGN_SMELLS, VULNERABILITY_CLASS_COLUMN
+from smell_flags import frame_flags, smell_presence
 
+# Vulnerability classes always reported, even when a project has no finding
+# of them, so per-project tables line up
+VULNERABILITY_CLASSES = [
+    "Active Debug Code",
+    "Cookie Security",
+    "Cross-Site Request Forgery (CSRF)",
+    "Cross-Site-Scripting (XSS)",
+    "Cryptographic Issues",
+    "Hard-coded Secrets",
+    "Improper Validation",
+    "Insecure Hashing Algorithm",
+    "Mishandled Sensitive Information",
+    "Path Traversal",
+    "SQL Injection",
+    "XML Injection",
+]
 
-def analyze_occurrence(merged_df):
 
-    vulnerability_counts = {}
+def occurrence_matrix(merged_df, smells=None, vulnerability_classes=None):
+    """
+    Count, for every smell and vulnerability class, the classes having both.
 
-    index = [
-        "Active Debug Code",
-        "Cookie Security",
-        "Cross-Site Request Forgery (CSRF)",
-        "Cross-Site-Scripting (XSS)",
-        "Cryptographic Issues",
-        "Hard-coded Secrets",
-        "Improper Validation",
-        "Insecure Hashing Algorithm",
-        "Mishandled Sensitive Information",
-        "Path Traversal",
-        "SQL Injection",
-        "XML Injection",
-    ]
+    The presence of all smells is read from the packed smell flags of the
+    rows, and the counts come from a single product of that matrix with a
+    one-hot encoding of the vulnerability class, restricted to the rows that
+    have a finding.
 
-    design_smells = [
-        "God_Class",
-        "Complex_Class",
-        "Large_Class",
-        "Data_Class",
-        "Feature_Envy",
-        "Brain_Class",
-    ]
+    :param smells: Smell columns to count, the design smells by default.
+    :param vulnerability_classes: Row labels of the matrix. By default the
+                                  known classes plus any other class found in
+                                  ``merged_df``, sorted.
+    :return: DataFrame indexed by vulnerability class with one column per smell.
+    """
+    if smells is None:
+        smells = DESIGN_SMELLS
+    if vulnerability_classes is None:
+        found = merged_df[VULNERABILITY_CLASS_COLUMN].dropna().unique()
+        vulnerability_classes = sorted(set(VULNERABILITY_CLASSES).union(found))
 
-    smell_counts = {}
+    codes = pd.Categorical(
+        merged_df[VULNERABILITY_CLASS_COLUMN], categories=vulnerability_classes
+    ).codes
+    with_finding = codes >= 0
 
-    for column in design_smells:
-        if not column.startswith("Unnamed"):
-            # Filter the dataframe for rows where the design smell is present
-            filtered_df = merged_df[merged_df[column] == 1]
+    flags, missing = frame_flags(merged_df, smells)
+    present, _ = smell_presence(flags[with_finding], missing[with_finding], smells)
+    one_hot = np.zeros((len(present), len(vulnerability_classes)), dtype=np.int64)
+    one_hot[np.arange(len(present)), codes[with_finding]] = 1
+
+    return pd.DataFrame(
+        (one_hot.T @ present.astype(np.int64)).astype(float),
+        index=vulnerability_classes,
+        columns=smells,
+    )
 
-            # Count Ocurrences of each design smell
-            smell_count = filtered_df[column].sum()
-            smell_counts[column] = smell_count
-            counts = filtered_df["extra.metadata.vulnerability_class.0"].value_counts()
 
-            vulnerability_counts[column] = counts
+def analyze_occurrence(merged_df, smells=None, vulnerability_classes=None):
+    """
+    Occurrences of each smell and their distribution over vulnerability classes.
 
-            vulnerability_counts_df = pd.DataFrame(
-                vulnerability_counts, index=index
-            ).fillna(0)
+    :return: Tuple of a DataFrame with the occurrences of each smell and the
+             vulnerability class x smell matrix of ``occurrence_matrix``.
+    """
+    if smells is None:
+        smells = DESIGN_SMELLS
 
-    # Convert the counts dictionary to a DataFrame
     counts_df = pd.DataFrame(
-        list(smell_counts.items()), columns=["Design Smell", "Número de Ocorrências"]
+        {
+            "Design Smell": smells,
+            "Número de Ocorrências": merged_df[smells].sum().to_numpy(),
+        }
+    )
+    vulnerability_counts_df = occurrence_matrix(
+        merged_df, smells, vulnerability_classes
     )
-
-    # Calculate the total number of design smells
-    total_smells = counts_df["Número de Ocorrências"].sum()
 
     print(counts_df)
     print(vulnerability_counts_df)
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+from chi_squared_test_by_design_smell import chi_square_all_pairs
+from data_manipulation import DESIGN_SMELLS
+from utils import run_seeded_chunks
+
+
+def _permutation_chunk(size, seed_sequence, colors, samples, observed_deviation):
+    """
+    Count, for ``size`` label shuffles, how often each pair is at least as extreme.
+
+    Shuffling the vulnerability labels over the rows where a design smell is
+    known leaves both margins of every 2x2 table fixed; the labels that end up
+    on the ``samples[i]`` smelly rows are a draw without replacement from the
+    label multiset ``colors[i]``. Drawing those counts from the multivariate
+    hypergeometric distribution is therefore the same as shuffling the rows,
+    batched over all permutations and vulnerability classes at once.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    exceed = np.zeros(observed_deviation.shape, dtype=np.int64)
+
+    for i in range(len(samples)):
+        total = colors[i].sum()
+        if total == 0:
+            continue
+        draws = rng.multivariate_hypergeometric(colors[i], samples[i], size=size)
+        expected = samples[i] * colors[i, :-1] / total
+
+        # With fixed margins the chi-square statistic grows with |a - E[a]|
+        deviation = np.abs(draws[:, :-1] - expected)
+        exceed[i] = (deviation >= observed_deviation[i] - 1e-9).sum(axis=0)
+
+    return exceed
+
+
+def permutation_test_all_pairs(
+    merged_df,
+    design_smells=None,
+    permutations=10000,
+    seed=0,
+    jobs=1,
+    batch_size=1000,
+    fisher_threshold=5,
+    count_jobs=1,
+):
+    """
+    Test every design smell x code smell pair without relying on asymptotics.
+
+    Pairs whose smallest expected cell count is below ``fisher_threshold`` get
+    an exact Fisher test; the others get a Monte Carlo permutation p-value
+    ``(1 + extreme) / (1 + permutations)``. Permutations run in batches of
+    ``batch_size`` spread over ``jobs`` processes with reproducible seeding.
+
+    :param count_jobs: Number of processes counting the contingency tables.
+    :return: The ``chi_square_all_pairs`` frame with ``p-value`` replaced by the
+             permutation or Fisher p-value and a ``Method`` column added.
+    """
+    if design_smells is None:
+        design_smells = DESIGN_SMELLS
+
+    all_pairs = chi_square_all_pairs(merged_df, design_smells, count_jobs)
+    all_pairs["p-value"] = np.nan
+    all_pairs["Method"] = None
+    if all_pairs.empty:
+        return all_pairs
+
+    shape = (len(design_smells), len(all_pairs) // len(design_smells))
+    a, b, c, d = (all_pairs[cell].to_numpy().reshape(shape) for cell in "abcd")
+    tested = (all_pairs["Status"] == "ok").to_numpy().reshape(shape)
+
+    n = a + b + c + d
+    expected_a = (a + b) * (a + c) / np.where(n > 0, n, 1)
+    min_expected = np.minimum.reduce(
+        [
+            expected_a,
+            (a + b) * (b + d) / np.where(n > 0, n, 1),
+            (c + d) * (a + c) / np.where(n > 0, n, 1),
+            (c + d) * (b + d) / np.where(n > 0, n, 1),
+        ]
+    )
+    use_fisher = tested & (min_expected < fisher_threshold)
+    use_permutation = tested & ~use_fisher
+
+    p_values = np.full(shape, np.nan)
+
+    for i, j in zip(*np.nonzero(use_fisher)):
+        _, p_values[i, j] = stats.fisher_exact([[a[i, j], b[i, j]], [c[i, j], d[i, j]]])
+
+    if use_permutation.any():
+        # Label multiset of each design smell: one color per vulnerability
+        # class plus one for classes without any finding
+        with_class = (a + c).astype(np.int64)
+        without_class = n[:, 0].astype(np.int64) - with_class.sum(axis=1)
+        colors = np.column_stack([with_class, without_class])
+        samples = (a + b)[:, 0].astype(np.int64)
+        observed_deviation = np.abs(a - expected_a)
+
+        chunks = run_seeded_chunks(
+            _permutation_chunk,
+            permutations,
+            batch_size,
+            seed,
+            jobs,
+            (colors, samples, observed_deviation),
+        )
+        exceed = np.sum(chunks, axis=0)
+        p_values = np.where(
+            use_permutation, (1 + exceed) / (1 + permutations), p_values
+        )
+
+    all_pairs["p-value"] = p_values.ravel()
+    all_pairs["Method"] = np.where(
+        use_fisher.ravel(),
+        "fisher",
+        np.where(use_permutation.ravel(), "permutation", None),
+    )
+    return all_pairs
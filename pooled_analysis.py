@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+from data_manipulation import (
+    DESIGN_SMELLS,
+    GET_SMELLS_COLUMNS,
+    VULNERABILITY_CLASS_COLUMN,
+)
+from smell_flags import FLAG_COLUMNS, frame_flags, smell_presence
+
+
+def pooled_columns(merged_df):
+    """
+    The smell columns, packed smell flags and vulnerability class of a merged
+    class frame.
+    """
+    columns = [
+        column for column in GET_SMELLS_COLUMNS + FLAG_COLUMNS if column in merged_df
+    ]
+    return merged_df[columns + [VULNERABILITY_CLASS_COLUMN]]
+
+
+def pooled_frame(frames, names):
+    """
+    Concatenate the merged class frames of every project once.
+
+    :param frames: ``pooled_columns`` of the merged class frame of every
+                   project, as kept by the per-project analysis, so the inputs
+                   are not read and merged a second time.
+    :param names: Project names, in the order of ``frames``; the ``project``
+                  column is a categorical stratum in that order.
+    """
+    pooled_df = pd.concat(frames, ignore_index=True)
+    pooled_df["project"] = pd.Categorical(
+        np.repeat(names, [len(df) for df in frames]), categories=names
+    )
+    return pooled_df
+
+
+def stratified_counts(pooled_df, design_smells=None):
+    """
+    Cells of the 2x2 table of every design smell x vulnerability class pair in
+    every project, from one groupby over (project, vulnerability class).
+
+    Presence and absence of all design smells are stacked as indicator columns
+    and summed per group; the per-project margins are the sums over all
+    vulnerability classes, including rows without a finding.
+
+    :return: Tuple of the vulnerability classes and arrays ``a, b, c, d`` of
+             shape (design smells, vulnerability classes, projects).
+    """
+    if design_smells is None:
+        design_smells = DESIGN_SMELLS
+
+    present, absent = smell_presence(
+        *frame_flags(pooled_df, design_smells), design_smells
+    )
+    indicators = pd.DataFrame(np.hstack([present, absent]).astype(np.int64))
+    strata = pooled_df["project"].cat.codes.to_numpy()
+    vulnerability = pd.Categorical(pooled_df[VULNERABILITY_CLASS_COLUMN])
+    classes = list(vulnerability.categories)
+
+    projects = len(pooled_df["project"].cat.categories)
+    smells = len(design_smells)
+    full_index = pd.MultiIndex.from_product([range(projects), range(-1, len(classes))])
+    grouped = (
+        indicators.groupby([strata, vulnerability.codes])
+        .sum()
+        .reindex(full_index, fill_value=0)
+        .to_numpy()
+        .reshape(projects, len(classes) + 1, 2 * smells)
+    )
+
+    margins = grouped.sum(axis=1)
+    present_total = margins[:, :smells].T[:, None, :]
+    absent_total = margins[:, smells:].T[:, None, :]
+
+    # Drop the "no finding" group and move to (smells, classes, projects)
+    cells = grouped[:, 1:, :].transpose(2, 1, 0)
+    a = cells[:smells]
+    c = cells[smells:]
+    return classes, a, present_total - a, c, absent_total - c
+
+
+def cmh_from_counts(a, b, c, d, correction=True, confidence=0.95):
+    """
+    Cochran-Mantel-Haenszel test and Mantel-Haenszel pooled odds ratio over
+    the last axis (strata) of arrays of 2x2 tables.
+
+    The continuity correction follows R's ``mantelhaen.test``; the confidence
+    interval of the odds ratio uses the Robins-Breslow-Greenland variance.
+    Strata with fewer than two classes carry no information and are ignored.
+
+    :return: Dictionary of arrays ``statistic``, ``p``, ``odds_ratio``,
+             ``ci_lower``, ``ci_upper`` and ``strata``.
+    """
+    a, b, c, d = (np.asarray(cell, dtype=float) for cell in (a, b, c, d))
+    n = a + b + c + d
+    informative = n > 1
+    safe_n = np.where(informative, n, 2)
+
+    expected = np.where(informative, (a + b) * (a + c) / safe_n, 0).sum(axis=-1)
+    variance = np.where(
+        informative,
+        (a + b) * (c + d) * (a + c) * (b + d) / (safe_n**2 * (safe_n - 1)),
+        0,
+    ).sum(axis=-1)
+    observed = np.where(informative, a, 0).sum(axis=-1)
+
+    delta = np.abs(observed - expected)
+    if correction:
+        delta = delta - np.where(delta >= 0.5, 0.5, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = np.where(variance > 0, delta**2 / variance, np.nan)
+    p = stats.chi2.sf(statistic, 1)
+
+    r = np.where(informative, a * d / safe_n, 0)
+    s = np.where(informative, b * c / safe_n, 0)
+    p_weight = np.where(informative, (a + d) / safe_n, 0)
+    q_weight = np.where(informative, (b + c) / safe_n, 0)
+    r_sum = r.sum(axis=-1)
+    s_sum = s.sum(axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        odds_ratio = r_sum / s_sum
+        log_variance = (
+            (p_weight * r).sum(axis=-1) / (2 * r_sum**2)
+            + (p_weight * s + q_weight * r).sum(axis=-1) / (2 * r_sum * s_sum)
+            + (q_weight * s).sum(axis=-1) / (2 * s_sum**2)
+        )
+        margin = stats.norm.isf((1 - confidence) / 2) * np.sqrt(log_variance)
+        ci_lower = np.exp(np.log(odds_ratio) - margin)
+        ci_upper = np.exp(np.log(odds_ratio) + margin)
+
+    finite = (r_sum > 0) & (s_sum > 0)
+    return {
+        "statistic": statistic,
+        "p": p,
+        "odds_ratio": np.where((r_sum > 0) | (s_sum > 0), odds_ratio, np.nan),
+        "ci_lower": np.where(finite, ci_lower, np.nan),
+        "ci_upper": np.where(finite, ci_upper, np.nan),
+        "strata": informative.sum(axis=-1),
+    }
+
+
+def pooled_cmh_analysis(pooled_df, design_smells=None, alpha=0.05):
+    """
+    Stratified test of every design smell x vulnerability class pair over the
+    pooled corpus, with projects as strata.
+
+    :return: DataFrame with one row per pair: pooled cell ``a``, the CMH
+             statistic and p-value, the pooled odds ratio and its confidence
+             interval, and a ``Status`` of "ok" or "insufficient data".
+    """
+    if design_smells is None:
+        design_smells = DESIGN_SMELLS
+
+    classes, a, b, c, d = stratified_counts(pooled_df, design_smells)
+    result = cmh_from_counts(a, b, c, d)
+    status = np.where(np.isnan(result["statistic"]), "insufficient data", "ok")
+
+    return pd.DataFrame(
+        {
+            "Design Smell": np.repeat(design_smells, len(classes)),
+            "Code Smell": np.tile(
+                [f"Code_Smell_{cls}" for cls in classes], len(design_smells)
+            ),
+            "Projects": result["strata"].ravel(),
+            "a": a.sum(axis=-1).ravel(),
+            "CMH": result["statistic"].ravel(),
+            "p-value": result["p"].ravel(),
+            "Odds Ratio": result["odds_ratio"].ravel(),
+            "CI Lower": result["ci_lower"].ravel(),
+            "CI Upper": result["ci_upper"].ravel(),
+            "Significant": np.where(result["p"] < alpha, "Yes", "No").ravel(),
+            "Status": status.ravel(),
+        }
+    )
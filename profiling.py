@@ -0,0 +1,126 @@
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+
+# Profiler of the project being analysed in this process, None when disabled
+_active = None
+
+# Shared no-op context handed out while profiling is disabled; the record it
+# yields absorbs the row counts callers set and is never read
+_DISABLED_STAGE = contextlib.nullcontext({})
+
+
+class StageProfiler:
+    """
+    Wall time, CPU time, peak memory and row counts of named pipeline stages.
+
+    Stages may nest; a nested stage is recorded as ``outer/inner``. Peak memory
+    is the highest traced allocation above the memory in use when the stage
+    started, so it needs tracemalloc, which slows the run down noticeably.
+    """
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._stack = []
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Route the module-level ``stage`` calls of this process to this profiler."""
+        global _active
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        previous, _active = _active, self
+        try:
+            yield self
+        finally:
+            _active = previous
+            if started_tracing:
+                tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def stage(self, name, rows_in=None):
+        record = {
+            "stage": "/".join(
+                [frame["record"]["stage"] for frame in self._stack[-1:]] + [name]
+            ),
+            "rows_in": rows_in,
+            "rows_out": None,
+        }
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        frame = {"record": record, "peak": 0, "start_memory": 0}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], peak)
+            tracemalloc.reset_peak()
+            frame["start_memory"] = current
+
+        self._stack.append(frame)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_s"] = time.perf_counter() - wall_start
+            record["cpu_s"] = time.process_time() - cpu_start
+            self._stack.pop()
+            if tracing:
+                peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                record["peak_mib"] = (peak - frame["start_memory"]) / 2**20
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent["peak"] = max(parent["peak"], peak)
+            else:
+                record["peak_mib"] = None
+            self.records.append(record)
+
+
+def stage(name, rows_in=None):
+    """
+    Profile the enclosed block as stage ``name`` of the active profiler.
+
+    Costs one global lookup when no profiler is active. The yielded record
+    accepts ``rows_out``::
+
+        with stage("read_csv") as record:
+            df = pd.read_csv(path)
+            record["rows_out"] = len(df)
+    """
+    if _active is None:
+        return _DISABLED_STAGE
+    return _active.stage(name, rows_in)
+
+
+def write_profile_report(path, project_profiles):
+    """
+    Write the stage records of every project as JSON.
+
+    :param project_profiles: Mapping of project name to its list of stage
+                             records, in completion order, or None for a
+                             project whose results were read back from the
+                             incremental manifest; it is reported as cached,
+                             without stages.
+    """
+    report = {
+        "projects": [
+            {
+                "name": name,
+                "cached": records is None,
+                "total_wall_s": sum(
+                    record["wall_s"]
+                    for record in records or []
+                    if "/" not in record["stage"]
+                ),
+                "stages": records or [],
+            }
+            for name, records in project_profiles.items()
+        ]
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as rf:
+        json.dump(report, rf, indent=2)
@@ -0,0 +1,109 @@
+import glob
+import json
+import os
+
+PROJECT_MANIFEST = "projects.json"
+
+INPUT_KEYS = ["get_smells_input_csv", "semgrep_input_csv", "scanned_files"]
+
+
+def load_manifest_projects(manifest_path):
+    """
+    Read the project list from a JSON manifest.
+
+    Each entry holds a ``name``, an optional ``display_name`` and the three
+    input paths, relative to the directory of the manifest. A ``semgrep_json``
+    path stands for both the Semgrep results and the scanned files.
+    """
+    with open(manifest_path, "r") as mf:
+        entries = json.load(mf)["projects"]
+
+    base_dir = os.path.dirname(manifest_path)
+    projects = []
+    for entry in entries:
+        project = dict(entry)
+        project.setdefault("display_name", project["name"])
+        semgrep_json = project.pop("semgrep_json", None)
+        if semgrep_json is not None:
+            project.setdefault("semgrep_input_csv", semgrep_json)
+            project.setdefault("scanned_files", semgrep_json)
+        for key in INPUT_KEYS:
+            project[key] = os.path.join(base_dir, project[key])
+        projects.append(project)
+    return projects
+
+
+def discover_projects(root="."):
+    """
+    Find projects by directory convention when there is no manifest.
+
+    A project directory holds one ``*_scanned.csv`` inventory, one Semgrep
+    ``*_results*.csv`` and a single remaining CSV with the GetSmells export.
+    Only directory listings are read, no file is opened.
+    """
+    projects = []
+    for scanned_files in sorted(glob.glob(os.path.join(root, "*", "*_scanned.csv"))):
+        directory = os.path.dirname(scanned_files)
+        csv_files = set(glob.glob(os.path.join(directory, "*.csv")))
+        results = [path for path in csv_files if "_results" in os.path.basename(path)]
+        get_smells = sorted(csv_files - set(results) - {scanned_files})
+
+        if len(results) != 1 or len(get_smells) != 1:
+            print(f"Skipping {directory}: expected one results and one GetSmells CSV")
+            continue
+
+        name = os.path.basename(directory)
+        projects.append(
+            {
+                "name": name,
+                "display_name": name,
+                "get_smells_input_csv": get_smells[0],
+                "semgrep_input_csv": results[0],
+                "scanned_files": scanned_files,
+            }
+        )
+    return projects
+
+
+def load_registry(manifest_path=PROJECT_MANIFEST, root="."):
+    """Projects from ``manifest_path`` if it exists, otherwise discovered under ``root``."""
+    if os.path.exists(manifest_path):
+        return load_manifest_projects(manifest_path)
+    return discover_projects(root)
+
+
+def select_projects(projects, names=None):
+    """
+    Keep the projects named in ``names`` (case-insensitive), in registry order.
+
+    :raises ValueError: If a requested name is not in the registry.
+    """
+    if not names:
+        return list(projects)
+
+    wanted = {name.lower() for name in names}
+    known = {project["name"].lower() for project in projects}
+    unknown = sorted(wanted - known)
+    if unknown:
+        raise ValueError(
+            f"Unknown project(s) {', '.join(unknown)}; "
+            f"available: {', '.join(sorted(known))}"
+        )
+    return [project for project in projects if project["name"].lower() in wanted]
+
+
+def validate_projects(projects):
+    """
+    Check that every input file of ``projects`` exists before any work starts.
+
+    :raises FileNotFoundError: Listing every missing path at once.
+    """
+    missing = [
+        f"{project['name']}: {key} -> {project[key]}"
+        for project in projects
+        for key in INPUT_KEYS
+        if not os.path.isfile(project[key])
+    ]
+    if missing:
+        raise FileNotFoundError("Missing project input files:\n" + "\n".join(missing))
+    return projects
@@ -0,0 +1,134 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+from frame_cache import file_fingerprint
+from project_registry import INPUT_KEYS
+
+MANIFEST_FILE = "manifest.json"
+
+# Options that only change how results are computed, never the results: the
+# frame cache, block reads and the worker counts of counting, permutations
+# and bootstrap replicates, which are seeded per chunk
+EXECUTION_OPTIONS = {"cache_dir", "chunksize", "count_jobs", "jobs"}
+
+
+def code_fingerprint():
+    """Digest of every module of the analysis; any code change invalidates results."""
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(__file__), "*.py"))):
+        digest.update(os.path.basename(path).encode())
+        digest.update(file_fingerprint(path).encode())
+    return digest.hexdigest()
+
+
+def result_options(options):
+    """``options`` without its ``EXECUTION_OPTIONS``, in nested ones too."""
+    if not isinstance(options, dict):
+        return options
+    return {
+        key: result_options(value)
+        for key, value in options.items()
+        if key not in EXECUTION_OPTIONS
+    }
+
+
+def project_key(dictionary):
+    return dictionary.get("name") or "|".join(dictionary[key] for key in INPUT_KEYS)
+
+
+def project_fingerprint(dictionary, analysis_options, code_digest):
+    parts = [code_digest, json.dumps(analysis_options, sort_keys=True, default=str)]
+    if "store_revision" in dictionary:
+        # Projects read from the analysis store are versioned by its contents
+        parts.append(str(dictionary["store_revision"]))
+    else:
+        parts.extend(file_fingerprint(dictionary[key]) for key in INPUT_KEYS)
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def load_manifest(manifest_dir):
+    manifest_path = os.path.join(manifest_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r") as mf:
+        return json.load(mf)
+
+
+def save_manifest(manifest_dir, manifest):
+    os.makedirs(manifest_dir, exist_ok=True)
+    manifest_path = os.path.join(manifest_dir, MANIFEST_FILE)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as mf:
+        json.dump(manifest, mf, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def incremental_results(dictionary_list, manifest_dir, analysis_options, compute):
+    """
+    Return per-project results, recomputing only projects whose inputs changed.
+
+    The manifest records, for every project, a fingerprint of its three input
+    files (or of its ``store_revision`` when read from the analysis store), the
+    analysis options that affect results (see ``result_options``) and the
+    analysis code, together with the file holding its pickled
+    ``data_analysis_visualization`` result. Up-to-date projects are read back
+    from those partials.
+
+    :param compute: Callable receiving the list of stale project dictionaries
+                    and returning their results in the same order.
+    :return: List of results in the order of ``dictionary_list``.
+    """
+    manifest = load_manifest(manifest_dir)
+    code_digest = code_fingerprint()
+    options = result_options(analysis_options)
+
+    fingerprints = [
+        project_fingerprint(dictionary, options, code_digest)
+        for dictionary in dictionary_list
+    ]
+
+    results = [None] * len(dictionary_list)
+    stale = []
+    for position, (dictionary, fingerprint) in enumerate(
+        zip(dictionary_list, fingerprints)
+    ):
+        entry = manifest.get(project_key(dictionary), {})
+        result_path = os.path.join(manifest_dir, entry.get("result", ""))
+        if entry.get("fingerprint") == fingerprint and os.path.isfile(result_path):
+            with open(result_path, "rb") as rf:
+                results[position] = pickle.load(rf)
+        else:
+            stale.append(position)
+
+    print(
+        f"Incremental run: {len(stale)} of {len(dictionary_list)} projects to recompute"
+    )
+    if not stale:
+        return results
+
+    computed = compute([dictionary_list[position] for position in stale])
+
+    os.makedirs(manifest_dir, exist_ok=True)
+    for position, result in zip(stale, computed):
+        result_file = f"{fingerprints[position]}.pkl"
+        with open(os.path.join(manifest_dir, result_file), "wb") as rf:
+            pickle.dump(result, rf)
+
+        key = project_key(dictionary_list[position])
+        previous = manifest.get(key)
+        if previous and previous["result"] != result_file:
+            previous_path = os.path.join(manifest_dir, previous["result"])
+            if os.path.exists(previous_path):
+                os.remove(previous_path)
+
+        manifest[key] = {
+            "fingerprint": fingerprints[position],
+            "result": result_file,
+            "inputs": {k: dictionary_list[position].get(k) for k in INPUT_KEYS},
+        }
+        results[position] = result
+
+    save_manifest(manifest_dir, manifest)
+    return results
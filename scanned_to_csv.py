@@ -0,0 +1,41 @@
+import argparse
+from utils import write_scanned_csv
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build a *_scanned.csv class inventory from a source tree."
+    )
+    parser.add_argument("directory", help="Root of the source tree to scan.")
+    parser.add_argument("csv_file", help="Path to the output CSV file.")
+    parser.add_argument(
+        "--include",
+        action="append",
+        help="Glob of files to list, relative to the root (default: *.java).",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help="Glob of files or directories to skip, e.g. '*/test/*'.",
+    )
+    parser.add_argument(
+        "--relative-to",
+        default=None,
+        help="Directory the written paths are relative to (default: the root).",
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    write_scanned_csv(
+        args.directory,
+        args.csv_file,
+        include=args.include or ["*.java"],
+        exclude=args.exclude,
+        workers=args.workers,
+        relative_to=args.relative_to,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from data_manipulation import normalize_semgrep_frame
+from json_stream import iter_json_arrays
+from json_to_csv import get_nested_value
+from profiling import stage
+
+# Field paths read from every Semgrep result, with the dtype of their column.
+# The first six are the columns of the hand-converted results CSVs.
+SEMGREP_FIELDS = {
+    "path": "object",
+    "extra.metadata.source": "object",
+    "extra.metadata.cwe.0": "object",
+    "extra.metadata.owasp.0": "object",
+    "extra.metadata.references.0": "object",
+    "extra.metadata.vulnerability_class.0": "object",
+    "check_id": "object",
+    "start.line": "Int64",
+    "end.line": "Int64",
+}
+
+
+def is_semgrep_json(path):
+    """Whether ``path`` is a Semgrep JSON output rather than a converted CSV."""
+    return str(path).lower().endswith(".json")
+
+
+def _typed_column(values, dtype):
+    if dtype == "object":
+        # Missing values become NaN, as read_csv leaves them, not "None"
+        return pd.Series(values, dtype=object).fillna(np.nan)
+    return pd.Series(pd.array(values, dtype=dtype))
+
+
+def read_semgrep_json(json_file, fields=None, array_key="results"):
+    """
+    Read a Semgrep JSON output into typed frames in a single streaming pass.
+
+    Each field path is gathered into its own column list while the items of
+    ``array_key`` and ``paths.scanned`` are streamed, then every column is
+    converted once to its dtype; no intermediate CSV is written or parsed.
+
+    :param fields: Mapping of field path, in the dot notation of
+                   ``json_to_csv``, to column dtype; ``SEMGREP_FIELDS`` by
+                   default.
+    :return: Tuple of the results frame, one column per field, and the frame
+             of scanned paths with a single ``path`` column.
+    """
+    if fields is None:
+        fields = SEMGREP_FIELDS
+
+    field_keys = [field.split(".") for field in fields]
+    columns = [[] for _ in fields]
+    scanned = []
+    for key, item in iter_json_arrays(json_file, [array_key, "paths.scanned"]):
+        if key == array_key:
+            for column, keys in zip(columns, field_keys):
+                column.append(get_nested_value(item, keys))
+        else:
+            scanned.append(item)
+
+    results_df = pd.DataFrame(
+        {
+            field: _typed_column(column, dtype)
+            for (field, dtype), column in zip(fields.items(), columns)
+        }
+    )
+    scanned_df = pd.DataFrame({"path": _typed_column(scanned, "object")})
+    return results_df, scanned_df
+
+
+def semgrep_json_manipulation(json_file):
+    """
+    Load and normalize a Semgrep JSON output, the JSON counterpart of
+    ``semgrep_result_manipulation`` for both the results and the scanned files.
+
+    :return: Tuple of the results frame, the results frame without duplicate
+             classes and the scanned frame.
+    """
+    with stage("read_json") as record:
+        results_df, scanned_df = read_semgrep_json(json_file)
+        record["rows_out"] = len(results_df) + len(scanned_df)
+
+    semgrep_df, semgrep_df_without_duplicates = normalize_semgrep_frame(results_df)
+    scanned_df, _ = normalize_semgrep_frame(scanned_df)
+    return semgrep_df, semgrep_df_without_duplicates, scanned_df
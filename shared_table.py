@@ -0,0 +1,119 @@
+from collections import namedtuple
+from multiprocessing import shared_memory, util
+import numpy as np
+import pandas as pd
+
+# What a worker needs to find a published table: the name of the shared
+# memory block, the number of rows and, per column, its name, dtype string,
+# byte offset in the block and categories (None for numeric columns)
+SharedTableHandle = namedtuple("SharedTableHandle", ["name", "rows", "layout"])
+
+# Blocks attached by this process, kept open for the views handed out until
+# detach_tables runs at process exit
+_attached = {}
+
+
+def _column_array(values, categorical=False):
+    if not categorical and (
+        pd.api.types.is_bool_dtype(values.dtype)
+        or pd.api.types.is_numeric_dtype(values.dtype)
+    ):
+        if isinstance(values.dtype, pd.api.extensions.ExtensionDtype):
+            return values.to_numpy(dtype=float, na_value=np.nan), None
+        return values.to_numpy(), None
+
+    # Text columns travel as codes of their sorted categories, -1 when missing,
+    # the order pd.get_dummies gives its columns
+    categorical = pd.Categorical(values)
+    return categorical.codes.astype(np.int32), list(categorical.categories)
+
+
+class SharedTable:
+    """
+    Columns of a DataFrame published once in a shared memory block.
+
+    Numeric and boolean columns are laid out as flat arrays, text columns and
+    the ``categorical`` ones, whatever their dtype, as the int32 codes of
+    their categories, which travel with the handle. Workers
+    get the small picklable ``handle`` instead of the frame and attach with
+    ``attach_table``, receiving NumPy views on the same physical pages, so any
+    number of them cost about one copy of the table.
+
+    Use as a context manager; the block is released on exit.
+    """
+
+    def __init__(self, df, columns=None, categorical=()):
+        if columns is None:
+            columns = list(df.columns)
+
+        arrays = []
+        layout = []
+        offset = 0
+        for column in columns:
+            array, categories = _column_array(df[column], column in categorical)
+            # Keep every column aligned for its dtype
+            offset = -(-offset // 8) * 8
+            arrays.append((array, offset))
+            layout.append((column, array.dtype.str, offset, categories))
+            offset += array.nbytes
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for array, array_offset in arrays:
+            view = np.ndarray(
+                array.shape, dtype=array.dtype, buffer=self.shm.buf, offset=array_offset
+            )
+            view[:] = array
+        self.handle = SharedTableHandle(self.shm.name, len(df), tuple(layout))
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach_table(handle):
+    """
+    Zero-copy views on the columns of a published table.
+
+    :return: Dictionary of column name to array; text columns hold category
+             codes, see ``table_categories``.
+    """
+    shm = _attached.get(handle.name)
+    if shm is None:
+        if not _attached:
+            # Pool workers leave through os._exit under fork, which skips
+            # atexit handlers but still runs the multiprocessing finalizers
+            util.Finalize(None, detach_tables, exitpriority=10)
+        shm = _attached[handle.name] = shared_memory.SharedMemory(name=handle.name)
+    return {
+        column: np.ndarray(
+            (handle.rows,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset
+        )
+        for column, dtype, offset, _ in handle.layout
+    }
+
+
+def detach_tables():
+    """Close the blocks attached by this process; their views must be gone."""
+    while _attached:
+        _, shm = _attached.popitem()
+        shm.close()
+
+
+def table_categories(handle, column):
+    """Categories of a text column of a published table."""
+    for name, _, _, categories in handle.layout:
+        if name == column:
+            return categories
+    raise KeyError(column)
+
+
+def row_blocks(rows, blocks):
+    """``(start, stop)`` bounds splitting ``rows`` into ``blocks`` contiguous blocks."""
+    bounds = np.linspace(0, rows, max(min(blocks, rows), 1) + 1).astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from data_manipulation import GET_SMELLS_COLUMNS
+
+# Fixed bit of every GetSmells smell, so packed flags from different frames
+# and projects can be compared directly
+SMELL_BITS = {smell: bit for bit, smell in enumerate(GET_SMELLS_COLUMNS)}
+
+# Columns of class frames holding the packed flags and missing masks, which
+# the analyses read instead of the smell values
+FLAG_COLUMNS = ["smell_flags", "missing_smells"]
+
+
+def smell_mask(smells):
+    """Bitmask selecting ``smells``."""
+    mask = 0
+    for smell in smells:
+        mask |= 1 << SMELL_BITS[smell]
+    return np.uint32(mask)
+
+
+def pack_smell_flags(df, smells=None):
+    """
+    Pack the smell columns of ``df`` into one 32-bit mask per class.
+
+    A bit is set when the smell value is non-zero, the same truth value
+    ``DataFrame.any`` uses. Blank cells are not set in ``flags`` but recorded
+    in a separate ``missing`` mask.
+
+    :param smells: Smell columns to pack, every GetSmells smell present in
+                   ``df`` by default.
+    :return: Tuple ``(flags, missing)`` of uint32 arrays.
+    """
+    if smells is None:
+        smells = [smell for smell in GET_SMELLS_COLUMNS if smell in df]
+
+    flags = np.zeros(len(df), dtype=np.uint32)
+    missing = np.zeros(len(df), dtype=np.uint32)
+    for smell in smells:
+        values = df[smell].to_numpy(dtype=float)
+        bit = np.uint32(SMELL_BITS[smell])
+        is_missing = np.isnan(values)
+        flags |= ((values != 0) & ~is_missing).astype(np.uint32) << bit
+        missing |= is_missing.astype(np.uint32) << bit
+    return flags, missing
+
+
+def has_any(flags, smells):
+    """Classes with at least one of ``smells``."""
+    return (flags & smell_mask(smells)) != 0
+
+
+def smell_presence(flags, missing, smells):
+    """
+    Present and absent indicators of ``smells``, as (rows, smells) arrays.
+
+    A missing smell is neither present nor absent, so it is left out of any
+    count, as ``pd.crosstab`` leaves out blank cells.
+    """
+    bits = np.array([SMELL_BITS[smell] for smell in smells], dtype=np.uint32)
+    present = ((flags[:, None] >> bits) & 1).astype(bool)
+    is_missing = ((missing[:, None] >> bits) & 1).astype(bool)
+    return present, ~present & ~is_missing
+
+
+def frame_flags(df, smells=None):
+    """
+    Packed ``(flags, missing)`` of the rows of ``df``.
+
+    Class frames of a ``ClassIndex`` carry them in ``FLAG_COLUMNS``; other
+    frames have their smell columns packed with ``pack_smell_flags``.
+    """
+    if all(column in df for column in FLAG_COLUMNS):
+        return tuple(df[column].to_numpy(dtype=np.uint32) for column in FLAG_COLUMNS)
+    return pack_smell_flags(df, smells)
+
+
+def compact_smell_counts(df, smells=None):
+    """
+    ``df`` with its smell columns downcast to the smallest unsigned integer
+    dtype holding their counts.
+
+    Blank cells become 0, so pack the flags and missing masks first; columns
+    that are not non-negative integers keep their dtype.
+    """
+    if smells is None:
+        smells = [smell for smell in GET_SMELLS_COLUMNS if smell in df]
+    return df.assign(
+        **{
+            smell: pd.to_numeric(df[smell].fillna(0), downcast="unsigned")
+            for smell in smells
+        }
+    )
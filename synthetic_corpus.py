@@ -0,0 +1,242 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from data_manipulation import GET_SMELLS_COLUMNS
+
+# Smells GetSmells reports as counts rather than 0/1 flags
+COUNT_SMELLS = [
+    "Long_Method",
+    "Long_Parameter_List",
+    "Shotgun_Surgery",
+    "Brain_Method",
+    "Unstable_Dependency",
+]
+
+# Vulnerability classes with the metadata Semgrep attaches to them
+VULNERABILITY_METADATA = [
+    (
+        "Active Debug Code",
+        "CWE-489: Active Debug Code",
+        "A10:2004 - Insecure Configuration Management",
+    ),
+    (
+        "Cookie Security",
+        "CWE-1004: Sensitive Cookie Without 'HttpOnly' Flag",
+        "A05:2021 - Security Misconfiguration",
+    ),
+    (
+        "Cross-Site Request Forgery (CSRF)",
+        "CWE-352: Cross-Site Request Forgery (CSRF)",
+        "A01:2021 - Broken Access Control",
+    ),
+    (
+        "Cross-Site-Scripting (XSS)",
+        "CWE-79: Improper Neutralization of Input During Web Page Generation ('Cross-site Scripting')",
+        "A03:2021 - Injection",
+    ),
+    (
+        "Cryptographic Issues",
+        "CWE-327: Use of a Broken or Risky Cryptographic Algorithm",
+        "A02:2021 - Cryptographic Failures",
+    ),
+    (
+        "Hard-coded Secrets",
+        "CWE-798: Use of Hard-coded Credentials",
+        "A07:2021 - Identification and Authentication Failures",
+    ),
+    (
+        "Improper Validation",
+        "CWE-20: Improper Input Validation",
+        "A03:2021 - Injection",
+    ),
+    (
+        "Insecure Hashing Algorithm",
+        "CWE-328: Use of Weak Hash",
+        "A02:2021 - Cryptographic Failures",
+    ),
+    (
+        "Mishandled Sensitive Information",
+        "CWE-532: Insertion of Sensitive Information into Log File",
+        "A09:2021 - Security Logging and Monitoring Failures",
+    ),
+    (
+        "Path Traversal",
+        "CWE-22: Improper Limitation of a Pathname to a Restricted Directory ('Path Traversal')",
+        "A01:2021 - Broken Access Control",
+    ),
+    (
+        "SQL Injection",
+        "CWE-89: Improper Neutralization of Special Elements used in an SQL Command ('SQL Injection')",
+        "A03:2021 - Injection",
+    ),
+    (
+        "XML Injection",
+        "CWE-611: Improper Restriction of XML External Entity Reference",
+        "A04:2021 - Insecure Design",
+    ),
+]
+
+SEMGREP_COLUMNS = [
+    "path",
+    "extra.metadata.source",
+    "extra.metadata.cwe.0",
+    "extra.metadata.owasp.0",
+    "extra.metadata.references.0",
+    "extra.metadata.vulnerability_class.0",
+]
+
+
+def _class_paths(class_ids, modules, packages):
+    module = (class_ids % modules).astype(str)
+    package = (class_ids % packages).astype(str)
+    names = class_ids.astype(str)
+    return (
+        pd.Series(np.char.add("module", module), dtype=object)
+        + "/src/main/java/org/synthetic/pkg"
+        + package
+        + "/Class"
+        + names
+    )
+
+
+def _write_chunk(df, path, first_chunk):
+    df.to_csv(
+        path, sep=";", index=False, header=first_chunk, mode="w" if first_chunk else "a"
+    )
+
+
+def generate_corpus(
+    output_dir,
+    classes,
+    smell_density=0.1,
+    finding_density=0.02,
+    nested_fraction=0.1,
+    seed=0,
+    project="synthetic",
+    chunk_size=500_000,
+):
+    """
+    Write a GetSmells export, a Semgrep results CSV and a scanned inventory.
+
+    The files follow the formats of the project directories (``;``-delimited,
+    same headers), so they can be fed straight to the pipeline. Every class
+    lives in ``module{m}/.../pkg{p}/Class{i}.java``; a ``nested_fraction`` of
+    them also gets a nested class row in the GetSmells export.
+
+    :param classes: Number of top-level classes.
+    :param smell_density: Probability of each 0/1 smell being set, and mean of
+                          the count-valued smells.
+    :param finding_density: Probability of a class having Semgrep findings.
+    :return: Project dictionary with the three generated paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    project_dict = {
+        "name": project,
+        "display_name": project,
+        "get_smells_input_csv": os.path.join(output_dir, f"{project}.csv"),
+        "semgrep_input_csv": os.path.join(output_dir, f"{project}_results.csv"),
+        "scanned_files": os.path.join(output_dir, f"{project}_scanned.csv"),
+    }
+    rng = np.random.default_rng(seed)
+    modules = max(1, int(np.sqrt(classes) // 10))
+    packages = max(1, classes // 50)
+
+    for start in range(0, classes, chunk_size):
+        first_chunk = start == 0
+        class_ids = np.arange(start, min(start + chunk_size, classes))
+        paths = _class_paths(class_ids, modules, packages)
+
+        # Scanned inventory: every class file
+        _write_chunk(
+            pd.DataFrame({"path": paths + ".java"}),
+            project_dict["scanned_files"],
+            first_chunk,
+        )
+
+        # GetSmells export: top-level classes plus some nested ones
+        nested_ids = class_ids[rng.random(len(class_ids)) < nested_fraction]
+        names = pd.concat(
+            [
+                "org.synthetic.pkg"
+                + pd.Series((class_ids % packages).astype(str), dtype=object)
+                + ".Class"
+                + pd.Series(class_ids.astype(str), dtype=object),
+                "org.synthetic.pkg"
+                + pd.Series((nested_ids % packages).astype(str), dtype=object)
+                + ".Class"
+                + pd.Series(nested_ids.astype(str), dtype=object)
+                + ".Inner",
+            ],
+            ignore_index=True,
+        )
+        rows = len(names)
+        smells = {}
+        for smell in GET_SMELLS_COLUMNS:
+            if smell in COUNT_SMELLS:
+                smells[smell] = rng.poisson(smell_density, rows)
+            else:
+                smells[smell] = (rng.random(rows) < smell_density).astype(np.int64)
+        smells_df = pd.DataFrame(smells)
+        get_smells_df = pd.concat(
+            [
+                pd.DataFrame({"Name": names, "Version": np.nan}),
+                smells_df,
+                pd.DataFrame(
+                    {
+                        "Total": smells_df.sum(axis=1),
+                        "Distinct_Count": (smells_df > 0).sum(axis=1),
+                    }
+                ),
+            ],
+            axis=1,
+        )
+        _write_chunk(get_smells_df, project_dict["get_smells_input_csv"], first_chunk)
+
+        # Semgrep results: flawed classes get one or more findings
+        with_findings = rng.random(len(class_ids)) < finding_density
+        findings_per_class = rng.geometric(0.5, with_findings.sum())
+        finding_rows = np.repeat(np.flatnonzero(with_findings), findings_per_class)
+        vulnerability = rng.integers(0, len(VULNERABILITY_METADATA), len(finding_rows))
+        metadata = np.array(VULNERABILITY_METADATA, dtype=object)[vulnerability]
+        semgrep_df = pd.DataFrame(
+            {
+                "path": paths.to_numpy()[finding_rows] + ".java",
+                "extra.metadata.source": "https://semgrep.dev/r/synthetic",
+                "extra.metadata.cwe.0": metadata[:, 1],
+                "extra.metadata.owasp.0": metadata[:, 2],
+                "extra.metadata.references.0": "https://cwe.mitre.org/",
+                "extra.metadata.vulnerability_class.0": metadata[:, 0],
+            },
+            columns=SEMGREP_COLUMNS,
+        )
+        _write_chunk(semgrep_df, project_dict["semgrep_input_csv"], first_chunk)
+
+    return project_dict
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic GetSmells/Semgrep/scanned corpus."
+    )
+    parser.add_argument("output_dir")
+    parser.add_argument("--classes", type=int, default=100_000)
+    parser.add_argument("--smell-density", type=float, default=0.1)
+    parser.add_argument("--finding-density", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--project", default="synthetic")
+    args = parser.parse_args(argv)
+
+    project = generate_corpus(
+        args.output_dir,
+        args.classes,
+        smell_density=args.smell_density,
+        finding_density=args.finding_density,
+        seed=args.seed,
+        project=args.project,
+    )
+    print(f"Synthetic corpus written: {project}")
+
+
+if __name__ == "__main__":
+    main()
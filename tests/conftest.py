@@ -0,0 +1,37 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# The analysis modules live flat at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_manipulation import VULNERABILITY_CLASS_COLUMN
+
+
+def _vulnerability_labels(rng, rows):
+    return rng.choice(["Injection", "XSS", None], rows, p=[0.3, 0.2, 0.5])
+
+
+@pytest.fixture
+def class_frame():
+    """
+    Factory of merged class frames: a 0/1 ``God_Class``, a ``Data_Class``
+    count with blank cells, an all-zero ``Brain_Class`` and a vulnerability
+    class drawn by ``vulnerability_class(rng, rows)``.
+    """
+
+    def make(rows=120, seed=8, vulnerability_class=_vulnerability_labels):
+        rng = np.random.default_rng(seed)
+        return pd.DataFrame(
+            {
+                "God_Class": rng.integers(0, 2, rows).astype(float),
+                "Data_Class": np.where(
+                    rng.random(rows) < 0.1, np.nan, rng.integers(0, 3, rows)
+                ),
+                "Brain_Class": np.zeros(rows),
+                VULNERABILITY_CLASS_COLUMN: vulnerability_class(rng, rows),
+            }
+        )
+
+    return make
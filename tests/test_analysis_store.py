@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from analise_classes import analyze_project, parse_args
+from analysis_store import connect, ingest_projects, load_class_table, stored_projects
+from synthetic_corpus import generate_corpus
+
+
+@pytest.fixture
+def projects(tmp_path):
+    return [
+        generate_corpus(
+            str(tmp_path / name),
+            classes,
+            smell_density=0.3,
+            finding_density=0.2,
+            seed=seed,
+            project=name,
+        )
+        for name, classes, seed in [("alpha", 300, 1), ("beta", 200, 2)]
+    ]
+
+
+def assert_same_result(expected, observed):
+    for fresh, stored in zip(expected, observed):
+        if isinstance(fresh, pd.DataFrame):
+            pd.testing.assert_frame_equal(fresh, stored, check_dtype=False)
+        elif isinstance(fresh, dict):
+            assert fresh.keys() == stored.keys()
+            np.testing.assert_allclose(list(fresh.values()), list(stored.values()))
+        else:
+            assert fresh == pytest.approx(stored)
+
+
+def test_store_analysis_matches_the_csv_analysis(projects, tmp_path):
+    db_path = str(tmp_path / "analysis.sqlite")
+    ingest_projects(db_path, projects)
+
+    stored = stored_projects(db_path)
+    assert [project["name"] for project in stored] == ["alpha", "beta"]
+    assert "get_smells_input_csv" not in stored[0]
+
+    for dictionary, stored_dictionary in zip(projects, stored):
+        expected, _ = analyze_project(dictionary, pooled=True)
+        observed, _ = analyze_project(stored_dictionary, store=db_path, pooled=True)
+        assert_same_result(expected, observed)
+
+
+def test_reingestion_keeps_position_and_tracks_contents(projects, tmp_path):
+    db_path = str(tmp_path / "analysis.sqlite")
+    ingest_projects(db_path, projects)
+    before = {p["name"]: p["store_revision"] for p in stored_projects(db_path)}
+
+    ingest_projects(db_path, projects[:1])
+    after = stored_projects(db_path)
+    assert [project["name"] for project in after] == ["alpha", "beta"]
+    assert {p["name"]: p["store_revision"] for p in after} == before
+
+    generate_corpus(
+        str(tmp_path / "alpha"), 300, smell_density=0.5, seed=9, project="alpha"
+    )
+    ingest_projects(db_path, projects[:1])
+    changed = {p["name"]: p["store_revision"] for p in stored_projects(db_path)}
+    assert changed["alpha"] != before["alpha"]
+    assert changed["beta"] == before["beta"]
+
+    conn = connect(db_path)
+    try:
+        assert len(load_class_table(conn, "beta")) > 0
+    finally:
+        conn.close()
+
+
+def test_missing_store_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError, match="ingest"):
+        stored_projects(str(tmp_path / "missing.sqlite"))
+
+
+@pytest.mark.parametrize(
+    "option", [["--resolve-names"], ["--chunksize", "100"], ["--cache-dir"]]
+)
+def test_ingest_options_are_rejected_with_store(option):
+    with pytest.raises(SystemExit) as excinfo:
+        parse_args(["--store", "analysis.sqlite"] + option)
+    assert excinfo.value.code == 2
+    assert parse_args(option).store is None
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import scipy.stats as stats
+from bootstrap import (
+    HEADLINE_METRICS,
+    bootstrap_ratios,
+    class_level_intervals,
+    project_level_intervals,
+)
+
+
+def test_mean_interval_matches_scipy_percentile_bootstrap():
+    rng = np.random.default_rng(12)
+    values = rng.gamma(2.0, 10.0, 40)
+    estimate, lower, upper = bootstrap_ratios(
+        values[:, None], np.ones((40, 1)), replicates=40000, seed=3
+    )
+    reference = stats.bootstrap(
+        (values,), np.mean, n_resamples=40000, method="percentile", random_state=3
+    )
+    assert estimate[0] == pytest.approx(values.mean())
+    width = upper[0] - lower[0]
+    assert lower[0] == pytest.approx(
+        reference.confidence_interval.low, abs=0.03 * width
+    )
+    assert upper[0] == pytest.approx(
+        reference.confidence_interval.high, abs=0.03 * width
+    )
+
+
+def test_intervals_do_not_depend_on_jobs():
+    rng = np.random.default_rng(1)
+    percentages = rng.uniform(0, 100, (12, 3))
+    serial = project_level_intervals(percentages, replicates=3000, seed=4)
+    parallel = project_level_intervals(percentages, replicates=3000, seed=4, jobs=2)
+    assert serial.equals(parallel)
+    assert list(serial.index) == HEADLINE_METRICS
+    np.testing.assert_allclose(serial["Estimate"], percentages.mean(axis=0))
+
+
+def test_class_level_estimates_are_the_headline_percentages():
+    rng = np.random.default_rng(6)
+    findings = np.where(rng.random(500) < 0.1, rng.integers(1, 5, 500), 0)
+    flawed = rng.random(500) < 0.6
+    # Findings and vulnerable classes outside the scanned classes are fixed
+    intervals = class_level_intervals(
+        findings > 0,
+        flawed,
+        findings,
+        (findings > 0).sum() + 4,
+        findings.sum() + 7,
+        replicates=2000,
+        seed=0,
+    )
+    expected = [
+        ((findings > 0).sum() + 4) / 500 * 100,
+        flawed.mean() * 100,
+        findings[flawed].sum() / (findings.sum() + 7) * 100,
+    ]
+    np.testing.assert_allclose(intervals["Estimate"], expected)
+    assert (intervals["CI Lower"] <= intervals["Estimate"]).all()
+    assert (intervals["Estimate"] <= intervals["CI Upper"]).all()
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats as stats
+from chi_squared_test_by_design_smell import (
+    chi_square_all_pairs,
+    chi_square_from_counts,
+    chi_square_test_analysis,
+    combine_p_values,
+)
+
+SMELLS = ["God_Class", "Data_Class", "Brain_Class"]
+VULNERABILITY = "extra.metadata.vulnerability_class.0"
+
+
+@pytest.mark.parametrize("correction", [True, False])
+def test_vectorized_chi_square_matches_scipy(correction):
+    tables = np.array([[12, 30, 8, 50], [5, 20, 6, 41], [1, 0, 3, 9], [40, 2, 3, 35]])
+    chi2, p = chi_square_from_counts(*tables.T, correction=correction)
+    for table, statistic, p_value in zip(tables, chi2, p):
+        expected = stats.chi2_contingency(table.reshape(2, 2), correction=correction)
+        assert statistic == pytest.approx(expected.statistic)
+        assert p_value == pytest.approx(expected.pvalue)
+
+
+def test_empty_margin_gives_nan():
+    chi2, p = chi_square_from_counts([0], [0], [3], [4])
+    assert np.isnan(chi2[0]) and np.isnan(p[0])
+
+
+def test_all_pairs_match_per_pair_crosstabs(class_frame):
+    merged_df = class_frame()
+    results = chi_square_all_pairs(merged_df, SMELLS).set_index(
+        ["Design Smell", "Code Smell"]
+    )
+    dummies = pd.get_dummies(merged_df[VULNERABILITY], prefix="Code_Smell")
+    for smell in SMELLS:
+        for code_smell in dummies.columns:
+            row = results.loc[(smell, code_smell)]
+            if merged_df[smell].nunique() < 2:
+                assert row["Status"] == "insufficient data"
+                continue
+            # Rows where the smell is missing are left out of its tables
+            known = merged_df[smell].notna()
+            table = pd.crosstab(merged_df[smell][known] > 0, dummies[code_smell][known])
+            expected = stats.chi2_contingency(table)
+            assert row["Status"] == "ok"
+            assert row["Chi2"] == pytest.approx(expected.statistic)
+            assert row["p-value"] == pytest.approx(expected.pvalue)
+
+
+def test_analysis_returns_the_tested_p_values(class_frame, capsys):
+    merged_df = class_frame()
+    p_values = chi_square_test_analysis(merged_df, SMELLS)
+    results = chi_square_all_pairs(merged_df, SMELLS)
+    tested = results[results["Status"] == "ok"]
+    assert p_values == dict(
+        zip(zip(tested["Design Smell"], tested["Code Smell"]), tested["p-value"])
+    )
+    assert "Skipping Chi-Square test for Brain_Class" in capsys.readouterr().out
+
+
+def test_combined_p_value_matches_scipy():
+    expected = stats.combine_pvalues([0.01, 0.3, 0.6], method="fisher")
+    assert combine_p_values([0.01, np.nan, 0.3, 0.6]) == pytest.approx(expected.pvalue)
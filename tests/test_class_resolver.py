@@ -0,0 +1,48 @@
+import pandas as pd
+from class_resolver import (
+    AMBIGUOUS,
+    RESOLVED,
+    UNRESOLVED,
+    PackageTrie,
+    path_segments,
+    top_level_names,
+)
+
+TRIE = PackageTrie(["org.a.Util", "org.b.Util", "org.a.Parser", "com.c.Server"])
+
+
+def resolve(path):
+    return TRIE.resolve(path_segments(path))
+
+
+def test_full_package_suffix_resolves():
+    assert resolve("src/main/java/org/a/Util.java") == ("org.a.Util", RESOLVED, 1)
+    assert resolve("src/main/java/org/b/Util.java") == ("org.b.Util", RESOLVED, 1)
+
+
+def test_shared_simple_name_in_other_package_is_ambiguous():
+    assert resolve("src/main/java/net/d/Util.java") == (None, AMBIGUOUS, 2)
+    assert resolve("Util.java") == (None, AMBIGUOUS, 2)
+
+
+def test_single_candidate_in_other_package_is_not_resolved():
+    assert resolve("src/net/d/Server.java") == (None, UNRESOLVED, 1)
+    assert resolve("src/org/c/Server.java") == (None, UNRESOLVED, 1)
+    assert resolve("Parser.java") == (None, UNRESOLVED, 1)
+
+
+def test_unknown_file_name_is_unresolved():
+    assert resolve("src/org/a/Missing.java") == (None, UNRESOLVED, 0)
+
+
+def test_resolve_paths_keys_unresolved_paths_on_their_own():
+    paths = pd.Series(["src/org/a/Util.java", "x/Util.java", None, "y/Gone.java"])
+    resolution = TRIE.resolve_paths(paths)
+    assert list(resolution["Name"]) == ["org.a.Util", "x.Util", "", "y.Gone"]
+    assert list(resolution["Status"]) == [RESOLVED, AMBIGUOUS, UNRESOLVED, UNRESOLVED]
+    assert list(resolution["Candidates"]) == [1, 2, 0, 0]
+
+
+def test_top_level_names_strip_nested_classes():
+    names = pd.Series(["a.b.Outer.Inner.Deeper", "a.b.Outer", "Plain"])
+    assert list(top_level_names(names)) == ["a.b.Outer", "a.b.Outer", "Plain"]
@@ -0,0 +1,46 @@
+import importlib
+import sys
+import pandas as pd
+from frame_cache import cached_call, source_fingerprint
+
+
+def test_fingerprint_follows_local_imports(tmp_path, monkeypatch):
+    (tmp_path / "helper_normalization.py").write_text("SCALE = 1\n")
+    (tmp_path / "reader_normalization.py").write_text(
+        "from helper_normalization import SCALE\n\n\n"
+        "def read(path):\n    return SCALE\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    reader = importlib.import_module("reader_normalization")
+    try:
+        before = source_fingerprint(reader.read)
+        (tmp_path / "helper_normalization.py").write_text("SCALE = 2\n")
+        assert source_fingerprint(reader.read) != before
+    finally:
+        sys.modules.pop("reader_normalization", None)
+        sys.modules.pop("helper_normalization", None)
+
+
+calls = []
+
+
+def normalize(input_csv):
+    calls.append(input_csv)
+    df = pd.read_csv(input_csv, delimiter=";")
+    return df, df.drop_duplicates()
+
+
+def test_cached_call_round_trip(tmp_path):
+    input_csv = tmp_path / "input.csv"
+    input_csv.write_text("Name;God_Class\na.B;1\na.B;1\nc.D;0\n")
+    cache_dir = str(tmp_path / "cache")
+
+    first = cached_call(normalize, str(input_csv), cache_dir)
+    second = cached_call(normalize, str(input_csv), cache_dir)
+    assert len(calls) == 1
+    for fresh, cached in zip(first, second):
+        pd.testing.assert_frame_equal(fresh, cached)
+
+    input_csv.write_text("Name;God_Class\ne.F;1\n")
+    assert len(cached_call(normalize, str(input_csv), cache_dir)[0]) == 1
+    assert len(calls) == 2
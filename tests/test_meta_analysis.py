@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+import scipy.stats as stats
+from meta_analysis import (
+    benjamini_hochberg,
+    fisher_combination,
+    holm,
+    meta_analysis,
+    p_value_matrix,
+    stouffer_combination,
+)
+
+P_MATRIX = np.array(
+    [
+        [0.01, 0.20, 0.03],
+        [0.50, np.nan, 0.90],
+        [np.nan, np.nan, np.nan],
+        [0.04, 0.001, 0.70],
+    ]
+)
+
+
+def test_fisher_combination_matches_scipy():
+    statistic, p, k = fisher_combination(P_MATRIX)
+    for row in [0, 1, 3]:
+        tested = P_MATRIX[row][~np.isnan(P_MATRIX[row])]
+        expected = stats.combine_pvalues(tested, method="fisher")
+        assert statistic[row] == pytest.approx(expected.statistic)
+        assert p[row] == pytest.approx(expected.pvalue)
+        assert k[row] == len(tested)
+    assert np.isnan(statistic[2]) and np.isnan(p[2]) and k[2] == 0
+
+
+def test_stouffer_combination_matches_scipy():
+    weights = np.array([1.0, 2.0, 3.0])
+    z, p = stouffer_combination(P_MATRIX, weights)
+    for row in [0, 1, 3]:
+        tested = ~np.isnan(P_MATRIX[row])
+        ceiling = 1 - 1 / (2 * tested.sum())
+        expected = stats.combine_pvalues(
+            np.minimum(P_MATRIX[row][tested], ceiling),
+            method="stouffer",
+            weights=weights[tested],
+        )
+        assert z[row] == pytest.approx(expected.statistic)
+        assert p[row] == pytest.approx(expected.pvalue)
+    assert np.isnan(z[2]) and np.isnan(p[2])
+
+
+def test_stouffer_combination_keeps_evidence_next_to_p_of_one():
+    # Yates-corrected tests give p = 1 exactly, e.g. for
+    # (Complex_Class, Active Debug Code) in one project
+    z, p = stouffer_combination(np.array([[1.0, 0.001, 0.15], [0.0, 1.0, 0.5]]))
+    assert np.all(np.isfinite(z))
+    assert p[0] < 1
+    assert z[0] > -stats.norm.isf(0.001)
+    assert not np.isnan(p[1])
+
+
+def test_stouffer_combination_is_smooth_as_p_approaches_one():
+    rows = np.array([[1e-6, p] for p in [0.5, 0.7, 0.9, 0.99, 0.9999, 1 - 1e-12, 1.0]])
+    z, p = stouffer_combination(rows)
+    assert np.all(np.diff(p) >= 0)
+    assert p[-1] - p[4] < 1e-9
+    # A p-value of 1 does not outweigh strong evidence in the other project
+    assert p[-1] < 0.01
+
+
+def test_multiple_testing_corrections_match_statsmodels():
+    multitest = pytest.importorskip("statsmodels.stats.multitest")
+    p_values = np.array([0.01, 0.04, 0.03, 0.005, 0.2, 0.8, 0.04])
+    np.testing.assert_allclose(
+        benjamini_hochberg(p_values),
+        multitest.multipletests(p_values, method="fdr_bh")[1],
+    )
+    np.testing.assert_allclose(
+        holm(p_values), multitest.multipletests(p_values, method="holm")[1]
+    )
+
+
+def test_corrections_leave_nan_out_per_column():
+    columns = np.array([[0.01, np.nan], [0.04, 0.02], [np.nan, 0.03], [0.03, 0.5]])
+    bh = benjamini_hochberg(columns)
+    for column in range(columns.shape[1]):
+        tested = ~np.isnan(columns[:, column])
+        np.testing.assert_allclose(
+            bh[tested, column], stats.false_discovery_control(columns[tested, column])
+        )
+        assert np.isnan(bh[~tested, column]).all()
+        assert np.isnan(holm(columns)[~tested, column]).all()
+
+
+def test_meta_analysis_of_project_p_values():
+    matrix = p_value_matrix(
+        {
+            "a": {("God_Class", "Injection"): 0.01, ("Data_Class", "Injection"): 1.0},
+            "b": {("God_Class", "Injection"): 0.02},
+        }
+    )
+    assert list(matrix.index.names) == ["Design Smell", "Code Smell"]
+    results = meta_analysis(matrix)
+    assert results.loc[("God_Class", "Injection"), "Projects"] == 2
+    assert results.loc[("Data_Class", "Injection"), "Stouffer p-value"] < 1
+    assert np.isfinite(results["Stouffer Z"]).all()
+
+
+def test_p_value_matrix_without_tested_pairs():
+    matrix = p_value_matrix({"a": {}, "b": {}})
+    assert matrix.empty
+    assert list(matrix.columns) == ["a", "b"]
+    assert meta_analysis(matrix).empty
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats as stats
+from permutation_test import permutation_test_all_pairs
+
+VULNERABILITY = "extra.metadata.vulnerability_class.0"
+
+
+def class_frame(rows, seed):
+    rng = np.random.default_rng(seed)
+    god_class = rng.integers(0, 2, rows).astype(float)
+    # Injection findings lean towards God classes, XSS findings are rare
+    vulnerability = np.where(
+        rng.random(rows) < 0.2 + 0.06 * god_class,
+        "Injection",
+        np.where(rng.random(rows) < 0.03, "XSS", None),
+    )
+    return pd.DataFrame({"God_Class": god_class, VULNERABILITY: vulnerability})
+
+
+def exact_permutation_p(a, b, c, d):
+    # Under label shuffling a follows a hypergeometric distribution; the test
+    # counts tables at least as far from the expected a as the observed one
+    total, present, with_class = a + b + c + d, a + b, a + c
+    support = np.arange(
+        max(0, present + with_class - total), min(present, with_class) + 1
+    )
+    expected = present * with_class / total
+    extreme = np.abs(support - expected) >= abs(a - expected) - 1e-9
+    return stats.hypergeom.pmf(support[extreme], total, with_class, present).sum()
+
+
+def test_permutation_and_fisher_p_values_match_references():
+    merged_df = class_frame(400, seed=2)
+    results = permutation_test_all_pairs(
+        merged_df, ["God_Class"], permutations=20000, seed=1
+    ).set_index("Code Smell")
+
+    injection = results.loc["Code_Smell_Injection"]
+    assert injection["Method"] == "permutation"
+    cells = [int(injection[cell]) for cell in "abcd"]
+    exact = exact_permutation_p(*cells)
+    standard_error = np.sqrt(exact * (1 - exact) / 20000) + 1 / 20000
+    assert abs(injection["p-value"] - exact) < 4 * standard_error
+
+    xss = results.loc["Code_Smell_XSS"]
+    assert xss["Method"] == "fisher"
+    _, fisher_p = stats.fisher_exact([[xss["a"], xss["b"]], [xss["c"], xss["d"]]])
+    assert xss["p-value"] == pytest.approx(fisher_p)
+
+
+def test_permutation_p_values_do_not_depend_on_jobs():
+    merged_df = class_frame(300, seed=5)
+    serial = permutation_test_all_pairs(
+        merged_df, ["God_Class"], permutations=3000, seed=7, batch_size=500
+    )
+    parallel = permutation_test_all_pairs(
+        merged_df, ["God_Class"], permutations=3000, seed=7, batch_size=500, jobs=2
+    )
+    pd.testing.assert_frame_equal(serial, parallel)
+    tested = serial["p-value"].dropna()
+    assert ((tested >= 1 / 3001) & (tested <= 1)).all()
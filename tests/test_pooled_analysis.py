@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pooled_analysis import (
+    cmh_from_counts,
+    pooled_cmh_analysis,
+    pooled_columns,
+    pooled_frame,
+    stratified_counts,
+)
+
+# 2x2 tables [[a, b], [c, d]] of three strata
+TABLES = np.array(
+    [
+        [[12, 30], [8, 50]],
+        [[5, 20], [6, 41]],
+        [[9, 14], [3, 22]],
+    ]
+)
+
+
+def test_cmh_matches_statsmodels():
+    contingency_tables = pytest.importorskip("statsmodels.stats.contingency_tables")
+    reference = contingency_tables.StratifiedTable(TABLES.transpose(1, 2, 0))
+    test = reference.test_null_odds(correction=True)
+    lower, upper = reference.oddsratio_pooled_confint()
+
+    result = cmh_from_counts(*(TABLES[:, i, j] for i in (0, 1) for j in (0, 1)))
+    assert result["statistic"] == pytest.approx(test.statistic)
+    assert result["p"] == pytest.approx(test.pvalue)
+    assert result["odds_ratio"] == pytest.approx(reference.oddsratio_pooled)
+    assert result["ci_lower"] == pytest.approx(lower)
+    assert result["ci_upper"] == pytest.approx(upper)
+    assert result["strata"] == 3
+
+
+def test_cmh_ignores_uninformative_strata():
+    a, b, c, d = (TABLES[:, i, j] for i in (0, 1) for j in (0, 1))
+    with_empty = cmh_from_counts(
+        np.append(a, 0), np.append(b, 1), np.append(c, 0), np.append(d, 0)
+    )
+    result = cmh_from_counts(a, b, c, d)
+    assert with_empty["statistic"] == pytest.approx(result["statistic"])
+    assert with_empty["strata"] == 3
+
+
+def test_cmh_without_variance_is_insufficient_data():
+    pooled_df = pooled_frame(
+        [
+            pd.DataFrame(
+                {
+                    "God_Class": [1, 1],
+                    "Data_Class": [0, 1],
+                    "extra.metadata.vulnerability_class.0": ["Injection", np.nan],
+                }
+            )
+        ],
+        ["a"],
+    )
+    results = pooled_cmh_analysis(pooled_df, ["God_Class", "Data_Class"])
+    assert list(results["Status"]) == ["insufficient data", "ok"]
+
+
+def test_stratified_counts_match_crosstabs():
+    rng = np.random.default_rng(3)
+    frames = []
+    for rows in [40, 25]:
+        merged_df = pd.DataFrame(
+            {
+                "God_Class": rng.integers(0, 2, rows),
+                "Data_Class": rng.integers(0, 3, rows),
+                "extra.metadata.vulnerability_class.0": rng.choice(
+                    ["Injection", "XSS", None], rows
+                ),
+                "path": "unused",
+            }
+        )
+        frames.append(pooled_columns(merged_df))
+    pooled_df = pooled_frame(frames, ["a", "b"])
+    assert "path" not in pooled_df
+
+    classes, a, b, c, d = stratified_counts(pooled_df, ["God_Class", "Data_Class"])
+    for stratum, frame in enumerate(frames):
+        for smell_position, smell in enumerate(["God_Class", "Data_Class"]):
+            present = frame[smell] > 0
+            for class_position, cls in enumerate(classes):
+                vulnerable = frame["extra.metadata.vulnerability_class.0"] == cls
+                cells = a, b, c, d
+                expected = [
+                    (present & vulnerable).sum(),
+                    (present & ~vulnerable).sum(),
+                    (~present & vulnerable).sum(),
+                    (~present & ~vulnerable).sum(),
+                ]
+                observed = [
+                    cell[smell_position, class_position, stratum] for cell in cells
+                ]
+                assert observed == expected
@@ -0,0 +1,36 @@
+import json
+from profiling import StageProfiler, stage, write_profile_report
+
+
+def test_nested_stages_are_recorded():
+    profiler = StageProfiler(trace_memory=False)
+    with profiler.activate():
+        with stage("load", 10) as record:
+            with stage("parse"):
+                pass
+            record["rows_out"] = 7
+    assert [record["stage"] for record in profiler.records] == ["load/parse", "load"]
+    assert profiler.records[1]["rows_in"] == 10
+    assert profiler.records[1]["rows_out"] == 7
+
+
+def test_cached_projects_are_reported_without_stages(tmp_path):
+    path = tmp_path / "profile.json"
+    records = [
+        {"stage": "load", "wall_s": 2.0},
+        {"stage": "load/parse", "wall_s": 1.5},
+    ]
+    write_profile_report(str(path), {"fresh": records, "cached": None})
+    projects = json.loads(path.read_text())["projects"]
+    assert projects[0] == {
+        "name": "fresh",
+        "cached": False,
+        "total_wall_s": 2.0,
+        "stages": records,
+    }
+    assert projects[1] == {
+        "name": "cached",
+        "cached": True,
+        "total_wall_s": 0,
+        "stages": [],
+    }
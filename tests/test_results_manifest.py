@@ -0,0 +1,44 @@
+from results_manifest import incremental_results, project_fingerprint, result_options
+
+OPTIONS = {
+    "test": "permutation",
+    "cache_dir": ".frame_cache",
+    "chunksize": None,
+    "count_jobs": 1,
+    "permutation_options": {"permutations": 100, "seed": 0, "jobs": 1},
+}
+PROJECT = {"name": "alpha", "store_revision": "r1"}
+
+
+def test_execution_options_leave_the_fingerprint_unchanged():
+    parallel = dict(
+        OPTIONS,
+        cache_dir=None,
+        chunksize=5000,
+        count_jobs=4,
+        permutation_options={"permutations": 100, "seed": 0, "jobs": 8},
+    )
+    assert result_options(parallel) == result_options(OPTIONS)
+    assert project_fingerprint(
+        PROJECT, result_options(parallel), "code"
+    ) == project_fingerprint(PROJECT, result_options(OPTIONS), "code")
+
+    reseeded = dict(OPTIONS, permutation_options={"permutations": 100, "seed": 1})
+    assert result_options(reseeded) != result_options(OPTIONS)
+
+
+def test_changing_jobs_reuses_cached_results(tmp_path):
+    computed = []
+
+    def compute(stale):
+        computed.extend(dictionary["name"] for dictionary in stale)
+        return [dictionary["name"].upper() for dictionary in stale]
+
+    assert incremental_results([PROJECT], str(tmp_path), OPTIONS, compute) == ["ALPHA"]
+    rerun = dict(OPTIONS, count_jobs=4)
+    assert incremental_results([PROJECT], str(tmp_path), rerun, compute) == ["ALPHA"]
+    assert computed == ["alpha"]
+
+    changed = dict(OPTIONS, test="chi2")
+    incremental_results([PROJECT], str(tmp_path), changed, compute)
+    assert computed == ["alpha", "alpha"]
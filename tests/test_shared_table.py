@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from chi_squared_test_by_design_smell import chi_square_all_pairs
+from shared_table import (
+    SharedTable,
+    attach_table,
+    detach_tables,
+    row_blocks,
+    table_categories,
+)
+
+SMELLS = ["God_Class", "Data_Class"]
+
+
+@pytest.mark.parametrize(
+    "vulnerability_class",
+    [
+        lambda rng, rows: rng.choice(["Injection", "XSS", None], rows),
+        lambda rng, rows: np.where(
+            rng.random(rows) < 0.4, np.nan, rng.integers(0, 3, rows)
+        ),
+        lambda rng, rows: np.full(rows, np.nan),
+    ],
+    ids=["text", "numeric", "all-missing"],
+)
+def test_parallel_counts_match_serial(class_frame, vulnerability_class):
+    merged_df = class_frame(60, 5, vulnerability_class)
+    serial = chi_square_all_pairs(merged_df, SMELLS)
+    parallel = chi_square_all_pairs(merged_df, SMELLS, jobs=3)
+    pd.testing.assert_frame_equal(serial, parallel, check_dtype=False)
+
+
+def test_attached_views_share_the_published_columns():
+    df = pd.DataFrame({"count": [3, 1, 2], "label": ["b", None, "a"]})
+    with SharedTable(df, categorical=["count"]) as table:
+        columns = attach_table(table.handle)
+        np.testing.assert_array_equal(columns["label"], [1, -1, 0])
+        assert table_categories(table.handle, "label") == ["a", "b"]
+        assert table_categories(table.handle, "count") == [1, 2, 3]
+        np.testing.assert_array_equal(columns["count"], [2, 0, 1])
+        del columns
+        detach_tables()
+
+
+def test_row_blocks_cover_every_row_once():
+    assert row_blocks(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert row_blocks(2, 5) == [(0, 1), (1, 2)]
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+import generic_chi_squared_test
+import smell_flags
+from chi_squared_test_by_design_smell import chi_square_all_pairs
+from class_index import ClassIndex
+from data_manipulation import (
+    DESIGN_SMELLS,
+    VULNERABILITY_CLASS_COLUMN,
+    get_design_smells_related_to_vulnerabilities,
+)
+from ocurrence_analysis import analyze_occurrence
+from pooled_analysis import pooled_cmh_analysis, pooled_columns, pooled_frame
+from smell_flags import (
+    FLAG_COLUMNS,
+    compact_smell_counts,
+    frame_flags,
+    has_any,
+    pack_smell_flags,
+    smell_presence,
+)
+
+
+@pytest.fixture
+def smells_df():
+    rng = np.random.default_rng(4)
+    values = rng.integers(0, 3, (50, len(DESIGN_SMELLS))).astype(float)
+    values[rng.random(values.shape) < 0.1] = np.nan
+    df = pd.DataFrame(values, columns=DESIGN_SMELLS)
+    df[VULNERABILITY_CLASS_COLUMN] = rng.choice(["Injection", None], 50)
+    return df
+
+
+def test_packed_flags_match_the_columns(smells_df):
+    flags, missing = pack_smell_flags(smells_df, DESIGN_SMELLS)
+    columns = smells_df[DESIGN_SMELLS]
+    np.testing.assert_array_equal(
+        has_any(flags, DESIGN_SMELLS), (columns.fillna(0) != 0).any(axis=1)
+    )
+    np.testing.assert_array_equal(
+        has_any(missing, DESIGN_SMELLS), columns.isna().any(axis=1)
+    )
+    present, absent = smell_presence(flags, missing, DESIGN_SMELLS)
+    np.testing.assert_array_equal(present, columns > 0)
+    np.testing.assert_array_equal(absent, columns == 0)
+
+
+def test_compact_counts_keep_the_totals_and_flag_columns_win(smells_df):
+    compact = compact_smell_counts(smells_df)
+    assert all(compact[smell].dtype == np.uint8 for smell in DESIGN_SMELLS)
+    np.testing.assert_array_equal(
+        compact[DESIGN_SMELLS].sum(), smells_df[DESIGN_SMELLS].sum()
+    )
+
+    flags, missing = pack_smell_flags(smells_df)
+    packed = compact.assign(**dict(zip(FLAG_COLUMNS, (flags, missing))))
+    for expected, actual in zip((flags, missing), frame_flags(packed)):
+        np.testing.assert_array_equal(actual, expected)
+
+
+def test_class_index_frames_analyse_like_the_float_columns(smells_df):
+    smells_df["Name"] = [f"a.C{i}" for i in range(len(smells_df))]
+    findings = smells_df.loc[smells_df[VULNERABILITY_CLASS_COLUMN].notna()]
+    class_index = ClassIndex(
+        smells_df.drop(columns=VULNERABILITY_CLASS_COLUMN),
+        findings[["Name", VULNERABILITY_CLASS_COLUMN]],
+        smells_df[["Name"]],
+    )
+    merged = class_index.merged_frame(class_index.scanned_class_ids())
+    assert all(merged[smell].dtype == np.uint8 for smell in DESIGN_SMELLS)
+
+    reference = smells_df.drop(columns="Name")
+    pd.testing.assert_frame_equal(
+        chi_square_all_pairs(merged), chi_square_all_pairs(reference)
+    )
+    for actual, expected in zip(
+        analyze_occurrence(merged), analyze_occurrence(reference)
+    ):
+        # Sums of the unsigned count columns are unsigned
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    names = ["p", "q"]
+    halves = [merged.iloc[:25], merged.iloc[25:]]
+    reference_halves = [reference.iloc[:25], reference.iloc[25:]]
+    pd.testing.assert_frame_equal(
+        pooled_cmh_analysis(pooled_frame([pooled_columns(df) for df in halves], names)),
+        pooled_cmh_analysis(
+            pooled_frame([pooled_columns(df) for df in reference_halves], names)
+        ),
+    )
+
+
+def test_precomputed_flags_are_not_repacked(smells_df, monkeypatch):
+    flags, _ = pack_smell_flags(smells_df, DESIGN_SMELLS)
+    expected_df, expected_count = get_design_smells_related_to_vulnerabilities(
+        smells_df
+    )
+
+    def fail(*args, **kwargs):
+        raise AssertionError("flags repacked")
+
+    monkeypatch.setattr(smell_flags, "frame_flags", fail)
+    monkeypatch.setattr(generic_chi_squared_test, "frame_flags", fail)
+    df, count = get_design_smells_related_to_vulnerabilities(smells_df, flags)
+    pd.testing.assert_frame_equal(df, expected_df)
+    assert count == expected_count
+    generic_chi_squared_test.chi_square_test_any_smell(smells_df.copy(), flags)
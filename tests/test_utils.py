@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from data_manipulation import normalize_semgrep_paths, semgrep_result_manipulation
+from utils import run_seeded_chunks, scan_source_tree, write_scanned_csv
+
+
+def make_tree(root):
+    for directory in ["b/x", "b/y/test", "a", "a/z"]:
+        (root / directory).mkdir(parents=True, exist_ok=True)
+    for path in [
+        "b/x/B.java",
+        "b/x/A.java",
+        "b/y/test/T.java",
+        "a/C.java",
+        "a/z/D.java",
+    ]:
+        (root / path).write_text("")
+    (root / "a" / "notes.txt").write_text("")
+
+
+def test_scan_order_is_depth_first_and_stable(tmp_path):
+    make_tree(tmp_path)
+    prefix = len(str(tmp_path)) + 1
+    scans = [
+        [path[prefix:] for path in scan_source_tree(str(tmp_path), workers=8)]
+        for _ in range(5)
+    ]
+    assert scans[0] == [
+        "a/C.java",
+        "a/z/D.java",
+        "b/x/A.java",
+        "b/x/B.java",
+        "b/y/test/T.java",
+    ]
+    assert all(scan == scans[0] for scan in scans)
+
+
+def test_excluded_directories_are_not_entered(tmp_path):
+    make_tree(tmp_path)
+    csv_file = tmp_path / "scanned.csv"
+    count = write_scanned_csv(str(tmp_path), str(csv_file), exclude=["*/test"])
+    assert count == 4
+    assert csv_file.read_text().splitlines()[0] == "path"
+    assert "b/y/test/T.java" not in csv_file.read_text()
+
+
+def test_scanned_csv_reads_back_through_the_loader(tmp_path):
+    make_tree(tmp_path)
+    (tmp_path / "b" / "semi;colon").mkdir()
+    (tmp_path / "b" / "semi;colon" / "S.java").write_text("")
+    csv_file = tmp_path / "scanned.csv"
+    write_scanned_csv(str(tmp_path), str(csv_file), relative_to=str(tmp_path.parent))
+
+    scanned_df, _ = semgrep_result_manipulation(str(csv_file))
+    paths = [
+        f"{tmp_path.name}/{path}"
+        for path in [
+            "a/C.java",
+            "a/z/D.java",
+            "b/semi;colon/S.java",
+            "b/x/A.java",
+            "b/x/B.java",
+            "b/y/test/T.java",
+        ]
+    ]
+    assert list(scanned_df.columns) == ["Name"]
+    assert list(scanned_df["Name"]) == list(normalize_semgrep_paths(pd.Series(paths)))
+
+
+def draw(size, seed_sequence):
+    return np.random.default_rng(seed_sequence).random(size)
+
+
+def test_seeded_chunks_do_not_depend_on_jobs():
+    serial = np.concatenate(run_seeded_chunks(draw, 25, 10, seed=7))
+    parallel = np.concatenate(run_seeded_chunks(draw, 25, 10, seed=7, jobs=2))
+    np.testing.assert_array_equal(serial, parallel)
+    assert len(serial) == 25
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from smell_flags import SMELL_BITS
+from version_series import (
+    STATE_COLUMNS,
+    SeriesCounts,
+    apply_delta,
+    get_smells_versions,
+    main,
+    state_delta,
+)
+
+EXPORT = """Name;Version;God_Class;Data_Class
+org.a.Foo;9.0;1;0
+org.a.Foo;9.0;0;1
+org.a.Bar;9.0;0;0
+org.a.Foo;10;0;0
+org.a.Baz;10;1;1
+org.a.Bar;10;2;0
+"""
+
+
+def test_chunked_versions_match_a_single_read(tmp_path):
+    export = tmp_path / "export.csv"
+    export.write_text(EXPORT)
+    whole = get_smells_versions(str(export))
+    chunked = get_smells_versions(str(export), chunksize=2)
+    assert sorted(whole) == ["10", "9.0"]
+    assert sorted(whole) == sorted(chunked)
+    for version in whole:
+        pd.testing.assert_frame_equal(whole[version], chunked[version])
+    foo = whole["9.0"].set_index("Name").loc["a.Foo"]
+    assert (foo["God_Class"], foo["Data_Class"]) == (1, 1)
+
+
+def random_state(rng, names):
+    smells = ["God_Class", "Data_Class", "Large_Class"]
+    flags = [
+        sum(int(rng.random() < 0.4) << SMELL_BITS[smell] for smell in smells)
+        for _ in names
+    ]
+    vulnerable = rng.random(len(names)) < 0.5
+    return pd.DataFrame(
+        {
+            "rows": rng.integers(1, 3, len(names)),
+            "flags": np.array(flags, dtype=np.uint32),
+            "missing": np.zeros(len(names), dtype=np.uint32),
+            "vulnerability_class": np.where(
+                vulnerable, rng.choice(["Injection", "XSS"], len(names)), None
+            ),
+            "finding_count": np.where(vulnerable, rng.integers(1, 4, len(names)), 0),
+        },
+        index=pd.Index(names, name="Name"),
+    )[STATE_COLUMNS]
+
+
+def test_delta_updates_match_a_fresh_count():
+    rng = np.random.default_rng(11)
+    smells = ["God_Class", "Data_Class", "Large_Class"]
+    previous = random_state(rng, [f"C{i}" for i in range(40)])
+    current = random_state(rng, [f"C{i}" for i in range(10, 55)])
+    # Half of the classes kept from the previous release are unchanged
+    unchanged = previous.index[10:30]
+    current = pd.concat([previous.loc[unchanged], current.drop(index=unchanged)])
+
+    delta = state_delta(previous, current)
+    applied = apply_delta(previous, delta)
+    pd.testing.assert_frame_equal(
+        applied.sort_index(), current.sort_index(), check_dtype=False
+    )
+
+    running = SeriesCounts(smells)
+    running.add(previous)
+    running.update(previous, delta)
+    fresh = SeriesCounts(smells)
+    fresh.add(current)
+    pd.testing.assert_frame_equal(running.pair_results(), fresh.pair_results())
+    assert running.rows == fresh.rows
+    assert running.flawed_findings == fresh.flawed_findings
+
+
+def test_unknown_series_names_are_rejected(tmp_path):
+    manifest = tmp_path / "releases.json"
+    manifest.write_text('{"series": [{"name": "tomcat", "releases": []}]}')
+    with pytest.raises(ValueError, match="nope"):
+        main(["--manifest", str(manifest), "--project", "nope"])
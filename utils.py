@@ -1,13 +1,149 @@
+import csv
+import fnmatch
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+import numpy as np
 import pandas as pd
 
 
+def _list_directory(path):
+    files = []
+    subdirectories = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.is_file():
+                    files.append(entry.path)
+    except OSError as e:
+        print(f"Error: {e}")
+    return sorted(files), sorted(subdirectories)
+
+
+def _matches(relative_path, patterns):
+    return any(fnmatch.fnmatchcase(relative_path, pattern) for pattern in patterns)
+
+
+def scan_source_tree(directory, include=("*.java",), exclude=(), workers=8):
+    """
+    Stream the files under ``directory`` that match the include globs.
+
+    Directories are listed with ``os.scandir`` on a thread pool, one task per
+    directory, submitted as soon as their parent has been listed. Files are
+    yielded in a fixed depth-first order, the files of a directory in sorted
+    order before its subdirectories, whatever order the listings complete in,
+    so the inventory of a tree is identical from run to run. Globs are matched
+    against the path relative to ``directory`` with "/" separators; a
+    directory matching an exclude glob is not entered.
+
+    :return: Generator of file paths joined onto ``directory``.
+    """
+    prefix_length = len(os.path.join(directory, ""))
+
+    def relative(path):
+        return path[prefix_length:].replace(os.sep, "/")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = [executor.submit(_list_directory, directory)]
+        while pending:
+            files, subdirectories = pending.pop().result()
+            listings = []
+            for subdirectory in subdirectories:
+                relative_directory = relative(subdirectory)
+                if not _matches(relative_directory, exclude) and not _matches(
+                    f"{relative_directory}/", exclude
+                ):
+                    listings.append(executor.submit(_list_directory, subdirectory))
+            # The stack pops from the end, so subdirectories go in reversed
+            pending.extend(reversed(listings))
+            for path in files:
+                relative_path = relative(path)
+                if _matches(relative_path, include) and not _matches(
+                    relative_path, exclude
+                ):
+                    yield path
+
+
+def write_scanned_csv(
+    directory,
+    csv_file,
+    include=("*.java",),
+    exclude=(),
+    workers=8,
+    relative_to=None,
+    batch_size=1000,
+):
+    """
+    Write a scanned-files inventory without running Semgrep.
+
+    The CSV has the single ``path`` column of the ``*_scanned.csv`` files and
+    their ";" delimiter, so it can be read directly by
+    ``semgrep_result_manipulation``.
+
+    :param relative_to: Directory the written paths are relative to, defaults
+                        to ``directory`` itself.
+    :return: Number of files written.
+    """
+    # Scanned paths all start with directory, so the relative prefix is
+    # computed once instead of calling os.path.relpath per file
+    prefix_length = len(os.path.join(directory, ""))
+    lead = os.path.relpath(directory, relative_to or directory).replace(os.sep, "/")
+    lead = "" if lead == "." else f"{lead}/"
+
+    count = 0
+    with open(csv_file, "w", newline="") as cf:
+        writer = csv.writer(cf, delimiter=";")
+        writer.writerow(["path"])
+        batch = []
+        for path in scan_source_tree(directory, include, exclude, workers):
+            batch.append([lead + path[prefix_length:].replace(os.sep, "/")])
+            if len(batch) >= batch_size:
+                writer.writerows(batch)
+                count += len(batch)
+                batch.clear()
+        writer.writerows(batch)
+        count += len(batch)
+
+    print(f"CSV file '{csv_file}' created successfully with {count} files.")
+    return count
+
+
 def find_java_files(directory):
-    java_files = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith(".java"):
-                java_files.append(os.path.join(root, file))
+    java_files = list(scan_source_tree(directory, include=("*.java",)))
     java_files_df = pd.DataFrame(java_files, columns=["Name"])
-    print(java_files_df["Name"])
     return java_files_df, len(java_files)
+
+
+def run_seeded_chunks(func, total, chunk_size, seed=None, jobs=1, args=()):
+    """
+    Split ``total`` random replicates into chunks and run ``func`` on each.
+
+    Every chunk gets its own child of ``np.random.SeedSequence(seed)`` and the
+    chunking only depends on ``total`` and ``chunk_size``, so results are
+    reproducible for a given seed whatever the number of ``jobs``.
+
+    :param func: Top-level function called as ``func(size, seed_sequence, *args)``.
+    :return: List with the result of every chunk, in chunk order.
+    """
+    sizes = [chunk_size] * (total // chunk_size)
+    if total % chunk_size:
+        sizes.append(total % chunk_size)
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if jobs > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(
+                executor.map(
+                    _call_chunk, repeat(func), sizes, seed_sequences, repeat(args)
+                )
+            )
+    return [
+        func(size, seed_sequence, *args)
+        for size, seed_sequence in zip(sizes, seed_sequences)
+    ]
+
+
+def _call_chunk(func, size, seed_sequence, args):
+    return func(size, seed_sequence, *args)
@@ -0,0 +1,424 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+from analysis_store import ANALYSIS_STORE, connect
+from chi_squared_test_by_design_smell import pair_results_from_counts
+from class_index import load_class_index
+from data_manipulation import (
+    DESIGN_SMELLS,
+    VULNERABILITY_CLASS_COLUMN,
+    get_smells_result_manipulation,
+)
+from ocurrence_analysis import VULNERABILITY_CLASSES
+from project_registry import INPUT_KEYS, select_projects
+from smell_flags import SMELL_BITS, has_any
+
+RELEASE_MANIFEST = "releases.json"
+
+# Per-class state of one release; a class scanned several times has rows > 1
+STATE_COLUMNS = ["rows", "flags", "missing", "vulnerability_class", "finding_count"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    project TEXT,
+    sequence INTEGER,
+    version TEXT,
+    findings INTEGER,
+    vulnerable_classes INTEGER,
+    PRIMARY KEY (project, sequence)
+);
+CREATE TABLE IF NOT EXISTS class_deltas (
+    project TEXT,
+    sequence INTEGER,
+    Name TEXT,
+    rows INTEGER,
+    flags INTEGER,
+    missing INTEGER,
+    vulnerability_class TEXT,
+    finding_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_class_deltas_project_sequence
+    ON class_deltas (project, sequence);
+"""
+
+
+def load_release_manifest(manifest_path=RELEASE_MANIFEST):
+    """
+    Read the release series from a JSON manifest.
+
+    Each series holds a ``name``, an optional ``display_name`` and its
+    ``releases`` in release order. A release has a ``version`` and the three
+    input paths, relative to the directory of the manifest; when its GetSmells
+    export holds several versions, ``get_smells_version`` selects the rows of
+    the release by the ``Version`` column.
+    """
+    with open(manifest_path, "r") as mf:
+        entries = json.load(mf)["series"]
+
+    base_dir = os.path.dirname(manifest_path)
+    series = []
+    for entry in entries:
+        project = dict(entry)
+        project.setdefault("display_name", project["name"])
+        project["releases"] = [
+            {
+                **release,
+                **{key: os.path.join(base_dir, release[key]) for key in INPUT_KEYS},
+            }
+            for release in entry["releases"]
+        ]
+        series.append(project)
+    return series
+
+
+def get_smells_versions(input_csv, chunksize=None):
+    """
+    Read a GetSmells export holding several versions in one pass.
+
+    :param chunksize: Read the export in blocks of this many rows, see
+                      ``get_smells_result_manipulation``.
+    :return: Dictionary of ``Version`` to the frame of that version collapsed to
+             one row per class, as ``get_smells_result_manipulation`` does for
+             a whole file.
+    """
+    df = get_smells_result_manipulation(
+        input_csv, chunksize, keys=["Name", "Version"], dtype={"Version": str}
+    )
+    return {
+        version: frame.reset_index(drop=True)
+        for version, frame in df.groupby("Version", sort=False)
+    }
+
+
+def release_state(release, cache_dir=None, chunksize=None, version_frames=None):
+    """
+    Per-class state of one release.
+
+    :param version_frames: Output of ``get_smells_versions`` for the export of
+                           the release, when it selects a ``get_smells_version``.
+    :return: Tuple of the state, a DataFrame indexed by Name with the
+             ``STATE_COLUMNS``, the number of findings and the number of
+             distinct classes with findings.
+    """
+    get_smells_df = None
+    if release.get("get_smells_version") is not None:
+        get_smells_df = version_frames[str(release["get_smells_version"])]
+
+    class_index, semgrep_df_without_duplicates = load_class_index(
+        release["get_smells_input_csv"],
+        release["semgrep_input_csv"],
+        release["scanned_files"],
+        cache_dir,
+        chunksize,
+        get_smells_df=get_smells_df,
+    )
+
+    ids, rows = np.unique(class_index.scanned_class_ids(), return_counts=True)
+    first_finding = class_index.first_finding_row[ids]
+    vulnerability_class = (
+        class_index.semgrep_df[VULNERABILITY_CLASS_COLUMN]
+        .reindex(first_finding)
+        .to_numpy()
+    )
+    state = pd.DataFrame(
+        {
+            "rows": rows,
+            "flags": class_index.smell_flags[ids],
+            "missing": class_index.missing_smells[ids],
+            "vulnerability_class": vulnerability_class,
+            "finding_count": class_index.finding_counts[ids],
+        },
+        index=pd.Index(class_index.names[ids], name="Name"),
+    )
+    return (
+        state,
+        len(class_index.semgrep_df),
+        len(semgrep_df_without_duplicates),
+    )
+
+
+def state_delta(previous, current):
+    """
+    Classes added, removed or changed between two release states.
+
+    :return: Frame of the current state of added and changed classes, followed
+             by the removed classes with ``rows`` 0.
+    """
+    aligned = previous.reindex(current.index)
+    same = (aligned == current) | (aligned.isna() & current.isna())
+    changed = current[~same.all(axis=1)]
+
+    removed = pd.DataFrame(
+        {"rows": 0, "flags": 0, "missing": 0, "finding_count": 0},
+        index=previous.index.difference(current.index),
+    )
+    removed["vulnerability_class"] = np.nan
+    return pd.concat([changed, removed[STATE_COLUMNS]])
+
+
+def apply_delta(state, delta):
+    """The state reached by applying ``delta`` to ``state``."""
+    kept = state.drop(index=delta.index, errors="ignore")
+    return pd.concat([kept, delta[delta["rows"] > 0]])
+
+
+class SeriesCounts:
+    """
+    Running totals behind the occurrence and chi-square results of a release.
+
+    Every total is a sum over classes weighted by their scanned rows, so a
+    release is reached from the previous one by subtracting the old state of
+    the classes in the delta and adding their new state; classes that did not
+    change are never touched again.
+    """
+
+    def __init__(self, design_smells=None):
+        if design_smells is None:
+            design_smells = DESIGN_SMELLS
+        self.design_smells = list(design_smells)
+        self.vulnerability_classes = sorted(VULNERABILITY_CLASSES)
+
+        smells = len(self.design_smells)
+        classes = len(self.vulnerability_classes)
+        self.present = np.zeros((smells, classes))
+        self.absent = np.zeros((smells, classes))
+        self.present_total = np.zeros(smells)
+        self.absent_total = np.zeros(smells)
+        self.class_rows = np.zeros(classes)
+        self.rows = 0
+        self.flawed_rows = 0
+        self.flawed_findings = 0
+
+    def _add_classes(self, found):
+        new = sorted(set(self.vulnerability_classes).union(found))
+        if len(new) == len(self.vulnerability_classes):
+            return
+        positions = np.searchsorted(new, self.vulnerability_classes)
+        for name in ["present", "absent"]:
+            grown = np.zeros((len(self.design_smells), len(new)))
+            grown[:, positions] = getattr(self, name)
+            setattr(self, name, grown)
+        class_rows = np.zeros(len(new))
+        class_rows[positions] = self.class_rows
+        self.class_rows = class_rows
+        self.vulnerability_classes = new
+
+    def add(self, state, sign=1):
+        """Add (or with ``sign`` -1, subtract) the classes of ``state``."""
+        self._add_classes(state["vulnerability_class"].dropna().unique())
+
+        weights = sign * state["rows"].to_numpy(dtype=float)
+        flags = state["flags"].to_numpy(dtype=np.uint32)
+        missing = state["missing"].to_numpy(dtype=np.uint32)
+        bits = np.array([SMELL_BITS[smell] for smell in self.design_smells])
+        present = ((flags[:, None] >> bits) & 1).astype(float)
+        absent = 1 - present - ((missing[:, None] >> bits) & 1)
+
+        codes = pd.Categorical(
+            state["vulnerability_class"], categories=self.vulnerability_classes
+        ).codes
+        with_finding = codes >= 0
+        one_hot = np.zeros((len(state), len(self.vulnerability_classes)))
+        one_hot[np.flatnonzero(with_finding), codes[with_finding]] = weights[
+            with_finding
+        ]
+
+        self.present += present.T @ one_hot
+        self.absent += absent.T @ one_hot
+        self.present_total += weights @ present
+        self.absent_total += weights @ absent
+        self.class_rows += one_hot.sum(axis=0)
+        self.rows += weights.sum()
+
+        flawed = has_any(flags, DESIGN_SMELLS)
+        self.flawed_rows += weights[flawed].sum()
+        self.flawed_findings += sign * state["finding_count"].to_numpy()[flawed].sum()
+
+    def update(self, state, delta):
+        """Move the totals from ``state`` to ``apply_delta(state, delta)``."""
+        self.add(state.reindex(delta.index.intersection(state.index)), sign=-1)
+        self.add(delta[delta["rows"] > 0])
+
+    def occurrence_matrix(self):
+        """``ocurrence_analysis.occurrence_matrix`` of the current release."""
+        shown = np.isin(self.vulnerability_classes, VULNERABILITY_CLASSES) | (
+            self.class_rows > 0
+        )
+        return pd.DataFrame(
+            self.present.T[shown],
+            index=np.array(self.vulnerability_classes)[shown],
+            columns=self.design_smells,
+        )
+
+    def pair_results(self):
+        """``chi_square_all_pairs`` of the current release."""
+        found = self.class_rows > 0
+        a = self.present[:, found]
+        c = self.absent[:, found]
+        return pair_results_from_counts(
+            self.design_smells,
+            [
+                f"Code_Smell_{cls}"
+                for cls in np.array(self.vulnerability_classes)[found]
+            ],
+            a,
+            self.present_total[:, None] - a,
+            c,
+            self.absent_total[:, None] - c,
+            self.class_rows[found],
+            self.rows,
+        )
+
+
+def stored_versions(conn, project):
+    return [
+        version
+        for (version,) in conn.execute(
+            "SELECT version FROM versions WHERE project = ? ORDER BY sequence",
+            (project,),
+        )
+    ]
+
+
+def read_delta(conn, project, sequence):
+    delta = pd.read_sql_query(
+        "SELECT Name, rows, flags, missing, vulnerability_class, finding_count "
+        "FROM class_deltas WHERE project = ? AND sequence = ?",
+        conn,
+        params=(project, sequence),
+        index_col="Name",
+    )
+    return delta.astype({"flags": np.uint32, "missing": np.uint32})
+
+
+def write_delta(conn, project, sequence, version, delta, findings, vulnerable_classes):
+    with conn:
+        conn.execute(
+            "INSERT INTO versions VALUES (?, ?, ?, ?, ?)",
+            (project, sequence, version, findings, vulnerable_classes),
+        )
+        rows = delta.astype({"flags": np.int64, "missing": np.int64}).reset_index()
+        rows.columns = ["Name"] + STATE_COLUMNS
+        rows.insert(0, "sequence", sequence)
+        rows.insert(0, "project", project)
+        rows.to_sql("class_deltas", conn, if_exists="append", index=False)
+
+
+def analyze_series(conn, series, cache_dir=None, chunksize=None, alpha=0.05):
+    """
+    Per-release results of one series, ingesting only new releases.
+
+    Releases already in the store are replayed from their deltas; every new
+    release is reduced to its delta against the previous one and appended.
+    The totals of ``SeriesCounts`` follow the deltas in both cases.
+
+    :return: Tuple of a DataFrame with one summary row per release and a
+             DataFrame of the chi-square results of every release.
+    """
+    conn.executescript(SCHEMA)
+    project = series["name"]
+    stored = stored_versions(conn, project)
+    versions = [str(release["version"]) for release in series["releases"]]
+    if versions[: len(stored)] != stored:
+        raise ValueError(
+            f"Releases of {project} do not extend the stored series {stored}"
+        )
+
+    state = pd.DataFrame(columns=STATE_COLUMNS, index=pd.Index([], name="Name"))
+    counts = SeriesCounts()
+    version_frames = {}
+    summaries = []
+    pair_frames = []
+
+    for sequence, release in enumerate(series["releases"]):
+        version = versions[sequence]
+        if sequence < len(stored):
+            delta = read_delta(conn, project, sequence)
+            findings, vulnerable_classes = conn.execute(
+                "SELECT findings, vulnerable_classes FROM versions "
+                "WHERE project = ? AND sequence = ?",
+                (project, sequence),
+            ).fetchone()
+        else:
+            export = release["get_smells_input_csv"]
+            if release.get("get_smells_version") is not None:
+                if export not in version_frames:
+                    version_frames[export] = get_smells_versions(export, chunksize)
+            new_state, findings, vulnerable_classes = release_state(
+                release, cache_dir, chunksize, version_frames.get(export)
+            )
+            delta = state_delta(state, new_state)
+            write_delta(
+                conn, project, sequence, version, delta, findings, vulnerable_classes
+            )
+            print(f"Ingested {project} {version}: {len(delta)} classes changed")
+
+        removed = delta["rows"] == 0
+        added = ~removed & ~delta.index.isin(state.index)
+        counts.update(state, delta)
+        state = apply_delta(state, delta)
+
+        pairs = counts.pair_results()
+        tested = pairs[pairs["Status"] == "ok"]
+        summaries.append(
+            {
+                "Version": version,
+                "Classes": int(counts.rows),
+                "Added": int(added.sum()),
+                "Removed": int(removed.sum()),
+                "Changed": int((~removed & ~added).sum()),
+                "Classes vulneraveis (%)": vulnerable_classes / counts.rows * 100,
+                "Classes com design smells (%)": counts.flawed_rows / counts.rows * 100,
+                "Vulnerabilidades em classes com design smells (%)": (
+                    counts.flawed_findings / findings * 100
+                ),
+                "Significant Pairs": int((tested["p-value"] < alpha).sum()),
+            }
+        )
+        pair_frames.append(tested.assign(Version=version))
+
+    return pd.DataFrame(summaries), pd.concat(pair_frames, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Track smells and Semgrep findings across the releases of a project."
+    )
+    parser.add_argument("--manifest", default=RELEASE_MANIFEST)
+    parser.add_argument("--db", default=ANALYSIS_STORE)
+    parser.add_argument("--project", action="append")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument(
+        "--pairs-output",
+        default=None,
+        help="Save the chi-square results of every release to this CSV.",
+    )
+    args = parser.parse_args(argv)
+
+    series_list = select_projects(load_release_manifest(args.manifest), args.project)
+
+    conn = connect(args.db)
+    try:
+        pair_frames = []
+        for series in series_list:
+            summary, pairs = analyze_series(
+                conn, series, args.cache_dir, args.chunksize
+            )
+            print(f"Release series of {series['display_name']}")
+            print(summary.to_string(index=False))
+            pair_frames.append(pairs.assign(Project=series["name"]))
+    finally:
+        conn.close()
+
+    if args.pairs_output is not None and pair_frames:
+        pd.concat(pair_frames, ignore_index=True).to_csv(
+            args.pairs_output, sep=";", index=False
+        )
+        print(f"Per-release pair results saved to {args.pairs_output}")
+
+
+if __name__ == "__main__":
+    main()